@@ -0,0 +1,125 @@
+#!/usr/bin/env python
+# encoding: utf8
+
+# Copyright (C) 2016 by Roy Levien.
+# This file is part of crypto-enigma, an Enigma Machine simulator.
+# released under the BSD-3 License (see LICENSE.txt).
+
+"""
+Benchmarks of the public hot paths of `crypto_enigma.machine` (see run.py).
+
+Encoding is timed for messages of 10 to 10^7 characters; lengths above 10^4 (10^5 for bytes) are run only with the
+full suite, since `enigma_encoding` takes minutes for the longest.
+
+"""
+
+from __future__ import (absolute_import, print_function, division, unicode_literals)
+
+import sys
+
+from crypto_enigma.machine import *
+
+from harness import benchmark
+
+
+_SPEC = 'B-I-III-I EMO UX.MO.AY 13.04.11'
+_SPECS = ['B-I-III-I EMO UX.MO.AY 13.04.11', 'B-I-II-III AAA ~ 01.01.01', 'C-VIII-VII-VI QMJ AB.CD.EF 26.01.13',
+          'b-γ-V-VIII-II LFAP UX.MO.KZ.AY.EF.PL 03.17.04.11', 'c-β-VIII-VII-VI QMLI UX.MO.AY 01.13.04.11',
+          'A-V-IV-II ZZZ ~ 02.03.04', 'B-III-II-I VEQ QW.ER.TY.UI.OP.AS.DF.GH.JK.ZX 09.09.09',
+          'C-I-IV-V KDO MN.BV 21.15.16']
+_TEXT = 'Folgendes ist sofort bekanntzugeben: Ich habe Folgenden Befehl erhalten (1945)! '
+_FORMATS = ['single', 'internal', 'windows', 'config']
+
+_LENGTHS = [10, 100, 1000, 10 ** 4, 10 ** 5, 10 ** 6, 10 ** 7]
+
+
+def _message(length):
+    text = EnigmaConfig.make_message(_TEXT)
+    return (text * (length // len(text) + 1))[:length]
+
+
+class _NullSink(object):
+
+    def write(self, text):
+        pass
+
+    def flush(self):
+        pass
+
+
+def _to_null(func):
+    def call():
+        stdout, sys.stdout = sys.stdout, _NullSink()
+        try:
+            func()
+        finally:
+            sys.stdout = stdout
+    return call
+
+
+@benchmark('config_enigma_from_string', size=len(_SPECS))
+def bench_config_from_string():
+    return lambda: [EnigmaConfig.config_enigma_from_string(spec) for spec in _SPECS]
+
+
+@benchmark('step')
+def bench_step():
+    return EnigmaConfig.config_enigma_from_string(_SPEC).step
+
+
+@benchmark('stepped_configs[1000]', size=1000)
+def bench_stepped_configs():
+    cfg = EnigmaConfig.config_enigma_from_string(_SPEC)
+    return lambda: list(cfg.stepped_configs(999))
+
+
+@benchmark('enigma_mapping')
+def bench_enigma_mapping():
+    # A new configuration each time, since mappings are cached for each configuration
+    cfg = EnigmaConfig.config_enigma_from_string(_SPEC)
+    parts = cfg.components, cfg.positions, cfg.rings
+    return lambda: EnigmaConfig(*parts).enigma_mapping()
+
+
+@benchmark('enigma_mapping[cached]')
+def bench_enigma_mapping_cached():
+    return EnigmaConfig.config_enigma_from_string(_SPEC).enigma_mapping
+
+
+def _register_encodings():
+    for length in _LENGTHS:
+        def bench_encoding(length=length):
+            cfg, message = EnigmaConfig.config_enigma_from_string(_SPEC), _message(length)
+            return lambda: cfg.enigma_encoding(message)
+        benchmark('enigma_encoding[{0}]'.format(length), size=length, full=length > 10 ** 4)(bench_encoding)
+
+    for length in _LENGTHS:
+        def bench_encoding_bytes(length=length):
+            cfg, message = EnigmaConfig.config_enigma_from_string(_SPEC), _message(length).encode('ascii')
+            return lambda: cfg.enigma_encoding_bytes(message)
+        benchmark('enigma_encoding_bytes[{0}]'.format(length), size=length, full=length > 10 ** 5)(
+            bench_encoding_bytes)
+
+_register_encodings()
+
+
+@benchmark('make_message[10000]', size=10 ** 4)
+def bench_make_message():
+    text = (_TEXT * (10 ** 4 // len(_TEXT) + 1))[:10 ** 4]
+    return lambda: EnigmaConfig.make_message(text)
+
+
+def _register_renderings():
+    for fmt in _FORMATS:
+        def bench_config_string(fmt=fmt):
+            cfg = EnigmaConfig.config_enigma_from_string(_SPEC)
+            return lambda: cfg.config_string('X', fmt, show_encoding=True)
+        benchmark('config_string[{0}]'.format(fmt))(bench_config_string)
+
+    for fmt in _FORMATS:
+        def bench_print_operation(fmt=fmt):
+            cfg, message = EnigmaConfig.config_enigma_from_string(_SPEC), _message(100)
+            return _to_null(lambda: cfg.print_operation(message, format=fmt, show_step=True, show_encoding=True))
+        benchmark('print_operation[{0}]'.format(fmt), size=100)(bench_print_operation)
+
+_register_renderings()
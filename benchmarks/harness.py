@@ -0,0 +1,144 @@
+#!/usr/bin/env python
+# encoding: utf8
+
+# Copyright (C) 2016 by Roy Levien.
+# This file is part of crypto-enigma, an Enigma Machine simulator.
+# released under the BSD-3 License (see LICENSE.txt).
+
+"""
+Registration, timing and comparison of benchmarks (see run.py).
+
+A benchmark is a function that prepares its work and returns a callable of no arguments that performs it; only the
+callable is timed. Each is timed, starting with the package's caches empty, in a number of repeats, of enough calls
+to take a minimum time, with garbage collection disabled (as by `timeit`); the best and median time per call are
+reported.
+
+"""
+
+from __future__ import (absolute_import, print_function, division, unicode_literals)
+
+import gc
+import platform
+import re
+import sys
+import timeit
+from collections import namedtuple
+
+import crypto_enigma
+from crypto_enigma import stats
+
+
+#: A registered benchmark: its name, the number of items (e.g., characters) processed by each call, whether it is
+#: run only with the full suite, and the function preparing it.
+Benchmark = namedtuple('Benchmark', ['name', 'size', 'full', 'setup'])
+
+#: A comparison of a result with its baseline: the benchmark's name, the ratio of the new time to the baseline, the
+#: threshold above which this is a regression, and whether it is one.
+Comparison = namedtuple('Comparison', ['name', 'ratio', 'threshold', 'regressed'])
+
+_benchmarks = []
+
+
+def benchmark(name, size=1, full=False):
+    """A decorator registering a benchmark (see above) under `name`."""
+    def register(setup):
+        _benchmarks.append(Benchmark(name, size, full, setup))
+        return setup
+    return register
+
+
+def benchmarks(pattern=None, full=False):
+    """The registered benchmarks with names matching a regular expression, excluding full ones unless `full`."""
+    return [b for b in _benchmarks if (full or not b.full) and (pattern is None or re.search(pattern, b.name))]
+
+
+def _time(func, number):
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        start = timeit.default_timer()
+        for _ in range(number):
+            func()
+        return timeit.default_timer() - start
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+
+def measure(func, repeat=5, min_time=0.1):
+    """Time a function.
+
+    Args:
+        func (callable): The function, of no arguments.
+        repeat (int, optional): The number of timings to take.
+        min_time (float, optional): The least time, in seconds, for each timing; the number of calls in each
+            is calibrated to achieve this.
+
+    Returns:
+        tuple: The number of calls in each timing, and the time per call in each timing, in seconds.
+
+    """
+    number = 1
+    elapsed = _time(func, number)
+    while elapsed < min_time:
+        number *= 10 if elapsed < min_time / 10 else 2
+        elapsed = _time(func, number)
+    times = [elapsed / number] + [_time(func, number) / number for _ in range(repeat - 1)]
+    return number, times
+
+
+def run(selected, repeat=5, min_time=0.1, report=None):
+    """Run benchmarks, returning results suitable for serialization as JSON.
+
+    Args:
+        selected (list of Benchmark): The benchmarks to run.
+        repeat (int, optional): The number of timings of each (see `measure`).
+        min_time (float, optional): The least time for each timing (see `measure`).
+        report (callable, optional): A function called with the name and result of each benchmark as it completes.
+
+    Returns:
+        dict: The environment in which the benchmarks were run, and for each benchmark, by name, the best and median
+            time per call, the time per item, and the number of calls and timings.
+
+    """
+    results = dict()
+    for bench in selected:
+        # Each benchmark starts with empty caches, however many entries earlier ones have left in them
+        stats.clear_caches()
+        gc.collect()
+        number, times = measure(bench.setup(), repeat, min_time)
+        times.sort()
+        result = dict(best=times[0], median=times[len(times) // 2], per_item=times[0] / bench.size,
+                      size=bench.size, number=number, repeat=repeat)
+        results[bench.name] = result
+        if report is not None:
+            report(bench.name, result)
+    return dict(version=crypto_enigma.__version__, python=sys.version.split()[0],
+                implementation=platform.python_implementation(), platform=platform.platform(),
+                machine=platform.machine(), benchmarks=results)
+
+
+def compare(results, baseline, threshold=0.5):
+    """Compare results with a baseline.
+
+    Args:
+        results (dict): Results of `run`.
+        baseline (dict): Results of `run` taken as the baseline, optionally with a dictionary of `'thresholds'`
+            for particular benchmarks.
+        threshold (float, optional): The relative increase in the best time of a benchmark above which it is a
+            regression, for benchmarks without a threshold of their own.
+
+    Returns:
+        list of Comparison: A comparison for each benchmark in both the results and the baseline.
+
+    """
+    thresholds = baseline.get('thresholds', dict())
+    comparisons = []
+    for name, result in sorted(results['benchmarks'].items()):
+        base = baseline['benchmarks'].get(name)
+        if base is None:
+            continue
+        ratio = result['best'] / base['best']
+        limit = thresholds.get(name, threshold)
+        comparisons.append(Comparison(name, ratio, limit, ratio > 1 + limit))
+    return comparisons
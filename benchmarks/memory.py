@@ -0,0 +1,183 @@
+#!/usr/bin/env python
+# encoding: utf8
+
+# Copyright (C) 2016 by Roy Levien.
+# This file is part of crypto-enigma, an Enigma Machine simulator.
+# released under the BSD-3 License (see LICENSE.txt).
+
+"""
+Measure the memory used by common workloads: the peak while each runs, what is retained once it completes, and
+what remains once the package's caches are cleared (see `crypto_enigma.stats.clear_caches`).
+
+Run from the root of the repository, e.g.::
+
+    $ python benchmarks/memory.py --output memory.json
+    $ python benchmarks/memory.py --scale 0.01
+
+At full scale, the `encode` workload (10^6 characters through `enigma_encoding`) takes several minutes.
+
+Each workload runs in a process of its own, so that its peak is not confused with that of any other. Memory is
+measured with `tracemalloc` where it is available (Python 3.4 and later), as the size of the blocks allocated by
+Python, and the peak is the most allocated while the workload ran. Otherwise it is measured as the resident set size
+of the process (so it includes the interpreter's free lists); no peak can be isolated for the workload, so instead the
+maximum resident set size of its process, and the resident set size when the workload started, are reported. The
+number of objects tracked by the garbage collector, which does not depend on how memory is measured, is reported
+too.
+
+"""
+
+from __future__ import (absolute_import, print_function, division, unicode_literals)
+
+import argparse
+import gc
+import json
+import os
+import resource
+import subprocess
+import sys
+from itertools import combinations, permutations
+
+# Run from a checkout, the package is found in the root of the repository, whether or not it is installed (in this
+# process, and in those it starts for each workload, which run this script)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from crypto_enigma import stats
+from crypto_enigma.machine import *
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+
+_SPEC = 'B-I-III-I EMO UX.MO.AY 13.04.11'
+
+
+def _encode(count):
+    # Each encoding steps through new configurations, whatever its starting configuration
+    cfg, message = EnigmaConfig.config_enigma_from_string(_SPEC), 'A' * 1000
+    for _ in range(max(1, count // len(message))):
+        cfg.enigma_encoding(message)
+
+
+def _encode_bytes(count):
+    cfg = EnigmaConfig.config_enigma_from_string(_SPEC)
+    buf = bytearray(b'A' * 10 ** 4)
+    for _ in range(max(1, count // len(buf))):
+        cfg.encode_into(buf, buf)
+
+
+def _step(count):
+    for _ in EnigmaConfig.config_enigma_from_string(_SPEC).stepped_configs(count):
+        pass
+
+
+# Plugboards of three disjoint pairs, each of a letter from the first half of the alphabet and one from the second:
+# the letters of the first half in order, and those they are paired with in any order, so that each is distinct
+_FIRSTS = list(combinations(range(13), 3))
+_SECONDS = list(permutations(range(13, 26), 3))
+
+
+def _plugboards(count):
+    letters = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+    for n in range(count):
+        firsts, seconds = _FIRSTS[n % len(_FIRSTS)], _SECONDS[n // len(_FIRSTS) % len(_SECONDS)]
+        plugs = '.'.join(letters[i] + letters[j] for i, j in zip(firsts, seconds))
+        EnigmaConfig.config_enigma('B-I-II-III', 'AAA', plugs, '01.01.01').enigma_encoding_bytes(b'ABC')
+
+
+#: The workloads measured, by name: a function of the number of items to process, and that number.
+WORKLOADS = dict(encode=(_encode, 10 ** 6),
+                 encode_bytes=(_encode_bytes, 10 ** 6),
+                 step=(_step, 10 ** 6),
+                 plugboards=(_plugboards, 10 ** 5))
+
+
+def _rss():
+    with open('/proc/self/statm') as f:
+        return int(f.read().split()[1]) * resource.getpagesize()
+
+
+def _current():
+    gc.collect()
+    if tracemalloc is not None:
+        return tracemalloc.get_traced_memory()[0]
+    return _rss()
+
+
+def measure(name, count):
+    """Measure the memory used by a workload in the current process.
+
+    Returns:
+        dict: The number of items processed; the memory retained after the workload completed and after the caches
+            were cleared (in bytes above what was in use before it started), along with the corresponding number of
+            objects tracked by the garbage collector; the statistics of the caches on completion; and either the
+            peak memory used while the workload ran (above what was in use before it started), if measured with
+            `tracemalloc`, or the maximum resident set size of the process and its resident set size when the
+            workload started.
+
+    """
+    func, _ = WORKLOADS[name]
+    if tracemalloc is not None:
+        tracemalloc.start()
+    before = _current()
+    objects = len(gc.get_objects())
+    func(count)
+    if tracemalloc is not None:
+        peak = dict(peak=tracemalloc.get_traced_memory()[1] - before)
+    else:
+        # The maximum resident set size is in kilobytes on Linux, bytes on OS X
+        peak = dict(max_rss=resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * (1 if sys.platform == 'darwin'
+                                                                                  else 1024),
+                    start_rss=before)
+    retained, retained_objects = _current(), len(gc.get_objects())
+    caches = stats.snapshot()['caches']
+    stats.clear_caches()
+    cleared, cleared_objects = _current(), len(gc.get_objects())
+    result = dict(count=count, method='tracemalloc' if tracemalloc is not None else 'rss',
+                  retained=retained - before, cleared=cleared - before,
+                  retained_objects=retained_objects - objects, cleared_objects=cleared_objects - objects,
+                  caches=caches)
+    result.update(peak)
+    return result
+
+
+def _peak_string(result):
+    if result['method'] == 'tracemalloc':
+        return 'peak {0:>9.1f} MB'.format(result['peak'] / 2 ** 20)
+    return 'max RSS {0:>7.1f} MB (from {1:.1f} MB)'.format(result['max_rss'] / 2 ** 20, result['start_rss'] / 2 ** 20)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure the memory used by common workloads.')
+    parser.add_argument('workloads', metavar='WORKLOAD', nargs='*',
+                        help='the workloads to measure ({0}); defaults to all'.format(', '.join(sorted(WORKLOADS))))
+    parser.add_argument('--scale', type=float, default=1.0,
+                        help='a factor by which to scale the number of items processed by each workload')
+    parser.add_argument('--output', '-o', metavar='FILE', default=None,
+                        help='write the results as JSON to FILE')
+    parser.add_argument('--measure', metavar='WORKLOAD', default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure is not None:
+        # Measure a single workload, in a process of its own, and write the results for the parent
+        count = max(1, int(WORKLOADS[args.measure][1] * args.scale))
+        json.dump(measure(args.measure, count), sys.stdout)
+        return
+
+    results = dict()
+    for name in args.workloads or sorted(WORKLOADS):
+        output = subprocess.check_output([sys.executable, __file__, '--measure', name, '--scale', str(args.scale)])
+        results[name] = result = json.loads(output.decode('utf-8'))
+        print('{0:<14} {1:>10} items  {2}  retained {3:>9.1f} MB  cleared {4:>9.1f} MB ({5} objects)'.format(
+            name, result['count'], _peak_string(result), result['retained'] / 2 ** 20, result['cleared'] / 2 ** 20,
+            result['cleared_objects']))
+        sys.stdout.flush()
+
+    if args.output is not None:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2, separators=(',', ': '), sort_keys=True)
+
+
+if __name__ == '__main__':
+    main()
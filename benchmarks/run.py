@@ -0,0 +1,96 @@
+#!/usr/bin/env python
+# encoding: utf8
+
+# Copyright (C) 2016 by Roy Levien.
+# This file is part of crypto-enigma, an Enigma Machine simulator.
+# released under the BSD-3 License (see LICENSE.txt).
+
+"""
+Run the benchmark suite, write the results as JSON, and compare them with a baseline.
+
+Run from the root of the repository, e.g.::
+
+    $ python benchmarks/run.py --output results.json
+    $ python benchmarks/run.py --baseline benchmarks/baseline.json
+    $ python benchmarks/run.py --filter enigma_encoding --full --save-baseline benchmarks/baseline.json
+
+The exit status is 1 if any benchmark is slower than its baseline by more than its threshold.
+
+"""
+
+from __future__ import (absolute_import, print_function, division, unicode_literals)
+
+import argparse
+import json
+import os
+import sys
+
+# Run from a checkout, the package is found in the root of the repository, whether or not it is installed
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import bench_machine  # Registers the benchmarks
+from harness import benchmarks, compare, run
+
+
+def _report(name, result):
+    print('{0:<36} {1:>12.3f} us {2:>12.3f} us/item'.format(name, result['best'] * 1e6, result['per_item'] * 1e6))
+    sys.stdout.flush()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run the benchmark suite.')
+    parser.add_argument('--filter', '-k', metavar='PATTERN', default=None,
+                        help='run only benchmarks whose names match the regular expression PATTERN')
+    parser.add_argument('--full', action='store_true',
+                        help='include the longest benchmarks (e.g., encoding 10^7 characters)')
+    parser.add_argument('--repeat', '-r', type=int, default=5,
+                        help='the number of timings of each benchmark; defaults to 5')
+    parser.add_argument('--min-time', type=float, default=0.1,
+                        help='the least time, in seconds, for each timing; defaults to 0.1')
+    parser.add_argument('--output', '-o', metavar='FILE', default=None,
+                        help='write the results as JSON to FILE')
+    parser.add_argument('--baseline', '-b', metavar='FILE', default=None,
+                        help='compare the results with the baseline in FILE')
+    parser.add_argument('--threshold', '-t', type=float, default=0.5,
+                        help='the relative slowdown treated as a regression, for benchmarks without a threshold '
+                             'in the baseline; defaults to 0.5')
+    parser.add_argument('--save-baseline', metavar='FILE', default=None,
+                        help='write the results to FILE as a baseline, keeping any thresholds and other '
+                             'benchmarks already in it')
+    args = parser.parse_args()
+
+    selected = benchmarks(args.filter, args.full)
+    results = run(selected, args.repeat, args.min_time, _report)
+
+    if args.output is not None:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2, separators=(',', ': '), sort_keys=True)
+
+    if args.save_baseline is not None:
+        try:
+            with open(args.save_baseline) as f:
+                baseline = json.load(f)
+        except IOError:
+            baseline = dict(benchmarks=dict())
+        baseline['benchmarks'].update(results['benchmarks'])
+        baseline.update((k, v) for k, v in results.items() if k != 'benchmarks')
+        with open(args.save_baseline, 'w') as f:
+            json.dump(baseline, f, indent=2, separators=(',', ': '), sort_keys=True)
+
+    if args.baseline is not None:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        print()
+        regressions = 0
+        for c in compare(results, baseline, args.threshold):
+            print('{0:<36} {1:>7.2f}x  {2}'.format(c.name, c.ratio,
+                                                  'REGRESSION (> {0:.2f}x)'.format(1 + c.threshold) if c.regressed
+                                                  else 'ok'))
+            regressions += c.regressed
+        if regressions:
+            print('\n{0} regression(s)'.format(regressions))
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,269 @@
+#!/usr/bin/env python
+# encoding: utf8
+
+# Copyright (C) 2016 by Roy Levien.
+# This file is part of crypto-enigma, an Enigma Machine simulator.
+# released under the BSD-3 License (see LICENSE.txt).
+
+"""
+This module supports encoding from applications that must not block: an `AsyncEncoder` accepts requests from any
+number of threads, immediately returning a future for each, coalesces them into small batches, and encodes each
+batch in a pool of worker threads or processes.
+
+Since Python 2.7 has no event loop in its standard library, futures are resolved from worker threads; an
+application with an event loop can wait on them without blocking by scheduling its own completion from
+`EncodingFuture.add_done_callback` (e.g., with the loop's thread-safe call method).
+
+"""
+
+from __future__ import (absolute_import, print_function, division, unicode_literals)
+
+import time
+from Queue import Empty, Full, Queue
+from multiprocessing import Pool
+from multiprocessing.pool import ThreadPool
+from threading import BoundedSemaphore, Condition, Lock, Thread
+
+from .engine import *
+from .machine import *
+from .specs import shared_specs
+
+
+def encode_batch(jobs):
+    """Encode a batch of messages.
+
+    Args:
+        jobs (list): Pairs of a configuration specification (see `~.machine.EnigmaConfig.config_enigma_from_string`)
+            and a message (see `~.machine.EnigmaConfig.make_message`).
+
+    Returns:
+        list: For each job, a pair of whether it succeeded and either the encoded message or an error message.
+
+    Examples:
+        >>> encode_batch([('B-I-III-I EMO UX.MO.AY 13.04.11', 'TESTING'), ('B-I-III-I EMO UX.MO.AY 13', 'TESTING')])
+        [(True, u'OZQKPFL'), (False, u'Bad configuration: number rotors (3), rings (1), and window letters (3) must match')]
+
+    """
+    results = []
+    for spec, message in jobs:
+        try:
+            cfg = shared_specs.config(spec)
+            engine, positions = Engine.for_config(cfg), cfg.positions
+            letters = [num_A0(c) for c in EnigmaConfig.make_message(message)]
+            results.append((True, ''.join(chr_A0(i) for i in engine.encode(positions, letters))))
+        except EnigmaError as e:
+            results.append((False, unicode(e)))
+    return results
+
+
+def _run_batch(jobs):
+    # An unexpected failure must still resolve every future in the batch
+    try:
+        return encode_batch(jobs)
+    except Exception as e:
+        return [(False, unicode(e))] * len(jobs)
+
+
+class EncodingFuture(object):
+    """The eventual result of an encoding request submitted to an `AsyncEncoder`."""
+
+    def __init__(self):
+        self._condition = Condition()
+        self._done = False
+        self._result = None
+        self._error = None
+        self._callbacks = []
+
+    def done(self):
+        """Whether the request has completed."""
+        with self._condition:
+            return self._done
+
+    def result(self, timeout=None):
+        """The encoded message, waiting up to `timeout` seconds (or indefinitely if `None`) for it.
+
+        Raises:
+            EnigmaValueError: Raised if the request failed (e.g., because its configuration is invalid).
+            EnigmaError: Raised if the request has not completed within `timeout`.
+
+        """
+        with self._condition:
+            if not self._done:
+                self._condition.wait(timeout)
+            if not self._done:
+                raise EnigmaError('Timed out waiting for encoding')
+            if self._error is not None:
+                raise EnigmaValueError(self._error)
+            return self._result
+
+    def add_done_callback(self, fn):
+        """Call `fn` with this future when the request completes (immediately, if it already has)."""
+        with self._condition:
+            if not self._done:
+                self._callbacks.append(fn)
+                return
+        fn(self)
+
+    def _resolve(self, ok, value):
+        with self._condition:
+            if ok:
+                self._result = value
+            else:
+                self._error = value
+            self._done = True
+            self._condition.notify_all()
+            callbacks, self._callbacks = self._callbacks, []
+        for fn in callbacks:
+            fn(self)
+
+
+class _RequestQueue(Queue):
+    # A queue of requests that can be closed, under the queue's own lock: once it is closed, puts fail (including
+    # those already waiting for room), and a None sentinel, telling the dispatcher to stop, follows the last request,
+    # however full the queue is
+
+    def __init__(self, maxsize):
+        Queue.__init__(self, maxsize)
+        self.closed = False
+
+    def _put(self, item):
+        if self.closed:
+            raise EnigmaError('Encoder is closed')
+        Queue._put(self, item)
+
+    # close the queue, returning whether it was open
+    def close(self):
+        with self.mutex:
+            if self.closed:
+                return False
+            self.closed = True
+            Queue._put(self, None)
+            self.unfinished_tasks += 1
+            self.not_empty.notify()
+        return True
+
+
+class AsyncEncoder(object):
+    """A non-blocking encoder that batches concurrent requests.
+
+    Requests are queued as they are submitted; a dispatcher collects them into batches of up to `max_batch`
+    requests, waiting no more than `max_latency` seconds after the first for others to join it, and hands each batch
+    to a pool of workers (see `encode_batch`). Backpressure is exerted through bounded queues: at most `max_batches`
+    batches are in progress at once, and once `max_pending` requests are waiting, `submit` blocks (or fails).
+
+    Args:
+        max_batch (int, optional): The most requests encoded together.
+        max_latency (float, optional): The longest time, in seconds, a request waits for others to batch with it.
+        max_pending (int, optional): The most requests waiting to be batched.
+        max_batches (int, optional): The most batches in progress at once; defaults to twice the number of
+            `workers`.
+        executor (unicode, optional): Whether batches are encoded by `'thread'` or `'process'` workers.
+        workers (int, optional): The number of workers.
+
+    """
+
+    def __init__(self, max_batch=64, max_latency=0.002, max_pending=1024, max_batches=None, executor='thread',
+                 workers=1):
+        if executor not in ('thread', 'process'):
+            raise EnigmaValueError('Bad executor - {0} should be thread or process'.format(executor))
+        self._max_batch = max_batch
+        self._max_latency = max_latency
+        self._queue = _RequestQueue(max_pending)
+        self._batches = BoundedSemaphore(2 * workers if max_batches is None else max_batches)
+        self._pool = ThreadPool(workers) if executor == 'thread' else Pool(workers)
+        self._workers = workers
+        self._running = 0
+        self._running_lock = Lock()
+        self._dispatcher = Thread(target=self._dispatch)
+        self._dispatcher.daemon = True
+        self._dispatcher.start()
+
+    def submit(self, config, message, block=True, timeout=None):
+        """Submit a request to encode a message.
+
+        Args:
+            config (unicode): A configuration specification (see
+                `~.machine.EnigmaConfig.config_enigma_from_string`).
+            message (unicode): The message to encode (see `~.machine.EnigmaConfig.make_message`).
+            block (bool, optional): Whether to wait for room if `max_pending` requests are already waiting.
+            timeout (float, optional): The longest time, in seconds, to wait for room, if `block`.
+
+        Returns:
+            EncodingFuture: The eventual result of the request.
+
+        Raises:
+            EnigmaError: Raised if the encoder is closed, or if there is no room for the request.
+
+        """
+        future = EncodingFuture()
+        try:
+            self._queue.put((config, message, future), block, timeout)
+        except Full:
+            raise EnigmaError('Encoder is busy - {0} requests are waiting'.format(self._queue.maxsize))
+        return future
+
+    def encode(self, config, message):
+        """Encode a message, waiting for the result (see `submit`)."""
+        return self.submit(config, message).result()
+
+    def _dispatch(self):
+        closed = False
+        while not closed:
+            item = self._queue.get()
+            if item is None:
+                break
+            batch = [item]
+            deadline = time.time() + self._max_latency
+            while len(batch) < self._max_batch:
+                remaining = deadline - time.time()
+                try:
+                    item = self._queue.get(remaining > 0, max(remaining, 0))
+                except Empty:
+                    break
+                if item is None:
+                    closed = True
+                    break
+                batch.append(item)
+            self._batches.acquire()
+            with self._running_lock:
+                self._running += 1
+            futures = [f for _, _, f in batch]
+            self._pool.apply_async(_run_batch, ([(c, m) for c, m, _ in batch],),
+                                   callback=lambda results, futures=futures: self._complete(futures, results))
+        # Nothing can follow the sentinel, but should anything remain, it fails rather than waiting forever
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except Empty:
+                break
+            if item is not None:
+                item[2]._resolve(False, EnigmaError('Encoder is closed'))
+
+    def _complete(self, futures, results):
+        with self._running_lock:
+            self._running -= 1
+        self._batches.release()
+        for future, (ok, value) in zip(futures, results):
+            future._resolve(ok, value)
+
+    def pending(self):
+        """The number of requests waiting to be batched."""
+        return self._queue.qsize()
+
+    def utilization(self):
+        """The fraction of workers busy encoding a batch."""
+        with self._running_lock:
+            return min(self._running, self._workers) / self._workers
+
+    def close(self):
+        """Stop accepting requests, and wait for those already submitted to complete."""
+        if self._queue.close():
+            self._dispatcher.join()
+            self._pool.close()
+            self._pool.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
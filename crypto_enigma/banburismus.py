@@ -0,0 +1,240 @@
+#!/usr/bin/env python
+# encoding: utf8
+
+# Copyright (C) 2016 by Roy Levien.
+# This file is part of crypto-enigma, an Enigma Machine simulator.
+# released under the BSD-3 License (see LICENSE.txt).
+
+"""
+This module supports a reconstruction of *Banburismus*: sliding pairs of messages against each other and weighing
+the repeats at each offset, in *decibans*, as evidence of how far apart their starting positions are.
+
+"""
+
+from __future__ import (absolute_import, print_function, division, unicode_literals)
+
+from collections import defaultdict, namedtuple
+from math import log10
+from multiprocessing import Pool
+
+from .engine import *
+from .machine import *
+
+
+# A note on the scoring:
+# Messages begun at machine positions that differ only in the fast rotor are in depth once aligned at the right
+# offset, and so repeat (coincide) at the rate of the plain language there, rather than at the 1/26 of unrelated
+# text. Each aligned position is weighed as evidence for the offset, in decibans (10 log10 of the ratio of the
+# likelihoods under the two hypotheses), and repeats of consecutive letters earn a further bonus, since plain text
+# repeats bigrams and trigrams more often than independent single repeats would suggest.
+
+
+#: Approximate rates of coincidence of letters, bigrams and trigrams in German plain text (see `kappas`).
+PLAIN_KAPPAS = (0.0762, 0.0087, 0.0018)
+
+#: The deciban weights of the evidence at each aligned position (see `weights`).
+Weights = namedtuple('Weights', ['repeat', 'miss', 'bigram', 'trigram'])
+
+#: The evidence for a pair of messages being in depth at an offset (see `score_offset`).
+Alignment = namedtuple('Alignment', ['a', 'b', 'offset', 'overlap', 'repeats', 'bigrams', 'trigrams', 'score'])
+
+
+def kappas(text, n=3):
+    """The rates of coincidence of the n-grams of a sample text.
+
+    Args:
+        text (unicode): A sample of plain text; passed through `~.machine.EnigmaConfig.make_message`.
+        n (int, optional): The longest n-gram considered.
+
+    Returns:
+        tuple: The probability that two n-grams drawn at random from `text` are the same, for each length from 1
+            to `n`.
+
+    Examples:
+        >>> kappas('ABAB', 2)
+        (0.3333333333333333, 0.3333333333333333)
+
+    """
+    text = EnigmaConfig.make_message(text)
+    rates = []
+    for size in range(1, n + 1):
+        counts = defaultdict(int)
+        for i in range(len(text) - size + 1):
+            counts[text[i:i + size]] += 1
+        total = sum(counts.values())
+        rates.append(sum(c * (c - 1) for c in counts.values()) / (total * (total - 1)) if total > 1 else 0.0)
+    return tuple(rates)
+
+
+def weights(kappas=PLAIN_KAPPAS):
+    """The deciban weights of repeats and non-repeats for messages in depth.
+
+    Args:
+        kappas (tuple, optional): The rates of coincidence of letters, bigrams and trigrams in the plain
+            language (see `kappas`).
+
+    Returns:
+        Weights: The evidence, in decibans, of a single `repeat`, of a `miss` (a position without a repeat), and
+            the further bonus for each repeated `bigram` and `trigram`.
+
+    Examples:
+        >>> w = weights()
+        >>> round(w.repeat, 2), round(w.miss, 2), round(w.bigram, 2), round(w.trigram, 2)
+        (2.97, -0.17, 1.76, 2.58)
+
+    """
+    k1, k2, k3 = kappas
+    return Weights(10 * log10(k1 * 26),
+                   10 * log10((1 - k1) * 26 / 25),
+                   10 * log10(k2 / k1 ** 2),
+                   10 * log10(k3 * k1 / k2 ** 2))
+
+
+def score_offset(a, b, offset, wts=None):
+    """The evidence that two messages are in depth at an offset.
+
+    Args:
+        a (unicode): A message (see `~.machine.EnigmaConfig.make_message`).
+        b (unicode): Another message.
+        offset (int): The number of steps by which the start of `b` follows the start of `a`, so that
+            letter `i + offset` of `a` is aligned with letter `i` of `b`; may be negative.
+        wts (Weights, optional): The weights used to score the alignment; defaults to `weights()`.
+
+    Returns:
+        Alignment: The length of the `overlap`, the numbers of `repeats` and of repeated `bigrams` and `trigrams`,
+            and the `score` in decibans; `a` and `b` are `None`, to be filled in with indices by the caller.
+
+    Examples:
+        >>> al = score_offset('XXHELLOTHERE', 'HELLOWORLD', 2)
+        >>> al.overlap, al.repeats, al.bigrams, al.trigrams
+        (10, 5, 4, 3)
+
+    """
+    wts = weights() if wts is None else wts
+    hits = [x == y for x, y in zip(a[offset:], b)] if offset >= 0 else [x == y for x, y in zip(a, b[-offset:])]
+    pairs = [x and y for x, y in zip(hits, hits[1:])]
+    repeats = sum(hits)
+    bigrams = sum(pairs)
+    trigrams = sum(x and y for x, y in zip(pairs, pairs[1:]))
+    score = (repeats * wts.repeat + (len(hits) - repeats) * wts.miss +
+             bigrams * wts.bigram + trigrams * wts.trigram)
+    return Alignment(None, None, offset, len(hits), repeats, bigrams, trigrams, score)
+
+
+def score_pair(a, b, max_offset=25, min_overlap=20, wts=None):
+    """The evidence that two messages are in depth at each offset.
+
+    Args:
+        a (unicode): A message (see `~.machine.EnigmaConfig.make_message`).
+        b (unicode): Another message.
+        max_offset (int, optional): The largest offset, in either direction, considered.
+        min_overlap (int, optional): The fewest aligned letters for an offset to be scored.
+        wts (Weights, optional): The weights used to score the alignment; defaults to `weights()`.
+
+    Returns:
+        list of Alignment: The alignments (see `score_offset`) at every offset with sufficient overlap.
+
+    """
+    wts = weights() if wts is None else wts
+    alignments = [score_offset(a, b, d, wts) for d in range(-max_offset, max_offset + 1)]
+    return [al for al in alignments if al.overlap >= min_overlap]
+
+
+# The pool is given the messages once, on start, rather than with each unit of work
+_shared = dict()
+
+
+def _share(messages, max_offset, min_overlap, wts):
+    _shared.update(messages=messages, args=(max_offset, min_overlap, wts))
+
+
+def _score_from(a):
+    # Score every pair (a, b) with b > a; a unit of work for the pool
+    messages = _shared['messages']
+    return [al._replace(a=a, b=b) for b in range(a + 1, len(messages))
+            for al in score_pair(messages[a], messages[b], *_shared['args'])]
+
+
+def score_messages(messages, max_offset=25, min_overlap=20, min_score=0.0, wts=None, processes=None):
+    """Score every pair of messages at every offset, and rank the results.
+
+    Args:
+        messages (sequence of unicode): The cyphertexts to examine; these are passed through
+            `~.machine.EnigmaConfig.make_message` so that formatting (e.g., grouping) is ignored.
+        max_offset (int, optional): The largest offset, in either direction, considered.
+        min_overlap (int, optional): The fewest aligned letters for an offset to be scored.
+        min_score (float, optional): The lowest score, in decibans, of an alignment that is retained.
+        wts (Weights, optional): The weights used to score the alignment; defaults to `weights()`.
+        processes (int, optional): The number of worker processes to use; defaults to the number of CPUs, and
+            if `1` the scoring is done in the calling process.
+
+    Returns:
+        list of Alignment: The alignments scoring at least `min_score`, best first, with `a` and `b` the indices
+            of the aligned `messages`.
+
+    """
+    messages = [EnigmaConfig.make_message(m) for m in messages]
+    wts = weights() if wts is None else wts
+    if processes == 1:
+        _share(messages, max_offset, min_overlap, wts)
+        results = map(_score_from, range(len(messages)))
+    else:
+        pool = Pool(processes, initializer=_share, initargs=(messages, max_offset, min_overlap, wts))
+        try:
+            results = pool.map(_score_from, range(len(messages)))
+        finally:
+            pool.close()
+            pool.join()
+    alignments = [al for res in results for al in res if al.score >= min_score]
+    return sorted(alignments, key=lambda al: (-al.score, al.a, al.b, al.offset))
+
+
+def offset_feasible(cfg, offset):
+    """Whether a message begun `offset` fast-rotor positions after another can be in depth with it at that offset.
+
+    Two messages are in depth at an offset only if the machine's other rotors do not step while the first is
+    encoded up to the start of the second; whether that is so depends on the turnovers of the fast rotor, and
+    so constrains its identity, ring setting, and position.
+
+    Args:
+        cfg (EnigmaConfig): A hypothesis for the configuration at which the earlier message was begun.
+        offset (int): The number of steps (non-negative) to the start of the later message.
+
+    Returns:
+        bool: Whether stepping `cfg` by `offset` changes only the position of the fast rotor.
+
+    Examples:
+        >>> cfg = EnigmaConfig.config_enigma('B-I-II-III', 'ABK', '', '01.01.01')
+        >>> offset_feasible(cfg, 10), offset_feasible(cfg, 12)
+        (True, False)
+
+    """
+    engine = Engine.for_config(cfg)
+    positions = cfg.positions
+    for _ in range(offset):
+        stepped = engine.step(positions)
+        if stepped[2:] != positions[2:]:
+            return False
+        positions = stepped
+    return True
+
+
+def ranked_differences(alignments, cfg=None):
+    """The fast-rotor position differences indicated by alignments, best first.
+
+    Args:
+        alignments (iterable of Alignment): Scored alignments (see `score_messages`).
+        cfg (EnigmaConfig, optional): A hypothesis for the configuration at which the earlier message of each
+            pair was begun; if given, differences inconsistent with it (see `offset_feasible`) are dropped.
+
+    Returns:
+        list: Tuples of the index of the earlier message of a pair, that of the later, the difference in
+            the position of the fast rotor at their starts, and the score, in decibans, of the alignment.
+
+    """
+    differences = []
+    for al in alignments:
+        earlier, later = (al.a, al.b) if al.offset >= 0 else (al.b, al.a)
+        if cfg is None or offset_feasible(cfg, abs(al.offset)):
+            differences.append((earlier, later, abs(al.offset) % 26, al.score))
+    return sorted(differences, key=lambda d: (-d[3], d[0], d[1], d[2]))
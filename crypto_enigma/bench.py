@@ -0,0 +1,209 @@
+#!/usr/bin/env python
+# encoding: utf8
+
+# Copyright (C) 2016 by Roy Levien.
+# This file is part of crypto-enigma, an Enigma Machine simulator.
+# released under the BSD-3 License (see LICENSE.txt).
+
+"""
+This module measures the throughput of a standard mix of workloads (e.g., for the command line script's `bench`
+command), so that the capacity of different machines and deployments can be compared: encoding messages, stepping
+machines, parsing configurations, and rendering configurations.
+
+Each workload is carried out for a fixed time by each of the implementations (*engines*) the package provides for
+it: `'config'`, which creates an `~.machine.EnigmaConfig` for each step (as `~.machine.EnigmaConfig.enigma_encoding`
+and `~.machine.EnigmaConfig.stepped_configs` do), and, where there is one, the faster `'engine'`, which works from
+the precomputed tables of an `~.engine.Engine` (as `~.machine.EnigmaConfig.enigma_encoding_bytes` and
+`~.machine.EnigmaConfig.stepped_positions` do). Every operation is timed, so that, along with the rate at which
+items (characters, steps, configurations or renderings) are processed, the distribution of latencies is reported.
+
+"""
+
+from __future__ import (absolute_import, print_function, division, unicode_literals)
+
+import sys
+import timeit
+from collections import namedtuple
+
+from . import stats
+from .exceptions import *
+from .machine import EnigmaConfig
+
+
+#: The result of a workload for an engine: the workload and engine, the unit of the items processed, the number of
+#: items processed by each operation, the number of operations, the time they took (in seconds), the rate at which
+#: items were processed (per second), and the median, 90th and 99th percentile latency of an operation (in seconds).
+Result = namedtuple('Result', ['workload', 'engine', 'unit', 'size', 'operations', 'seconds', 'rate',
+                               'p50', 'p90', 'p99'])
+
+_SPEC = 'B-I-III-I EMO UX.MO.AY 13.04.11'
+_SPECS = ['B-I-III-I EMO UX.MO.AY 13.04.11', 'B-I-II-III AAA ~ 01.01.01', 'C-VIII-VII-VI QMJ AB.CD.EF 26.01.13',
+          'b-γ-V-VIII-II LFAP UX.MO.KZ.AY.EF.PL 03.17.04.11', 'c-β-VIII-VII-VI QMLI UX.MO.AY 01.13.04.11',
+          'A-V-IV-II ZZZ ~ 02.03.04', 'B-III-II-I VEQ QW.ER.TY.UI.OP.AS.DF.GH.JK.ZX 09.09.09',
+          'C-I-IV-V KDO MN.BV 21.15.16']
+_TEXT = 'FOLGENDESISTSOFORTBEKANNTZUGEBENICHHABEFOLGENDENBEFEHLERHALTEN'
+
+# The number of items processed by each operation of a workload
+_MESSAGE_LENGTH = 100
+_STEPS = 100
+_RENDERINGS = 10
+
+
+def _message():
+    return (_TEXT * (_MESSAGE_LENGTH // len(_TEXT) + 1))[:_MESSAGE_LENGTH]
+
+
+def _encode_config():
+    cfg, message = EnigmaConfig.config_enigma_from_string(_SPEC), _message()
+    return lambda: cfg.enigma_encoding(message)
+
+
+def _encode_engine():
+    cfg, message, buf = EnigmaConfig.config_enigma_from_string(_SPEC), _message().encode('ascii'), \
+        bytearray(_MESSAGE_LENGTH)
+    return lambda: cfg.encode_into(message, buf)
+
+
+def _step_config():
+    cfg = EnigmaConfig.config_enigma_from_string(_SPEC)
+    return lambda: list(cfg.stepped_configs(_STEPS))
+
+
+def _step_engine():
+    cfg = EnigmaConfig.config_enigma_from_string(_SPEC)
+    return lambda: list(cfg.stepped_positions(_STEPS))
+
+
+def _parse_config():
+    return lambda: [EnigmaConfig.config_enigma_from_string(spec) for spec in _SPECS]
+
+
+def _render_config():
+    cfg, letters = EnigmaConfig.config_enigma_from_string(_SPEC), ' ' + _message()[:_RENDERINGS - 1]
+    return lambda: [c.config_string(letter, format='internal')
+                    for c, letter in zip(cfg.stepped_configs(_RENDERINGS - 1), letters)]
+
+
+class _NullSink(object):
+
+    def write(self, text):
+        pass
+
+    def flush(self):
+        pass
+
+
+def _to_null(func):
+    def call():
+        stdout, sys.stdout = sys.stdout, _NullSink()
+        try:
+            func()
+        finally:
+            sys.stdout = stdout
+    return call
+
+
+def _render_engine():
+    # The renderings of print_operation, which follows the engine's tables for this format, written to nowhere
+    cfg, message = EnigmaConfig.config_enigma_from_string(_SPEC), _message()[:_RENDERINGS - 1]
+    return _to_null(lambda: cfg.print_operation(message, format='internal'))
+
+
+#: The workloads, in the order they are run: for each, its name, the unit of the items it processes, the number
+#: processed by each operation, and the engines that carry it out, each with a function that prepares an operation
+#: (returning a callable of no arguments that performs it).
+WORKLOADS = [('encode', 'chars', _MESSAGE_LENGTH, [('config', _encode_config), ('engine', _encode_engine)]),
+             ('step', 'steps', _STEPS, [('config', _step_config), ('engine', _step_engine)]),
+             ('parse', 'configs', len(_SPECS), [('config', _parse_config)]),
+             ('render', 'renderings', _RENDERINGS, [('config', _render_config), ('engine', _render_engine)])]
+
+
+def _percentile(ordered, fraction):
+    # The nearest-rank percentile of a sorted list
+    return ordered[min(len(ordered) - 1, max(0, int(round(fraction * len(ordered))) - 1))]
+
+
+def measure(operation, size, duration):
+    """Repeat an operation for a time, timing each repetition.
+
+    Args:
+        operation (callable): The operation, of no arguments.
+        size (int): The number of items processed by each operation.
+        duration (float): The time, in seconds, for which to repeat the operation; it is performed at least once.
+
+    Returns:
+        tuple: The number of operations, the total time they took, the rate at which items were processed, and the
+            median, 90th and 99th percentile time of an operation.
+
+    """
+    timer = timeit.default_timer
+    times = []
+    elapsed = 0.0
+    while elapsed < duration or not times:
+        start = timer()
+        operation()
+        times.append(timer() - start)
+        elapsed += times[-1]
+    times.sort()
+    return (len(times), elapsed, len(times) * size / elapsed,
+            _percentile(times, 0.5), _percentile(times, 0.9), _percentile(times, 0.99))
+
+
+def run(duration=1.0, workloads=None, report=None):
+    """Run the standard workloads, with each engine.
+
+    Each workload is run, for each engine, starting with the package's caches empty, so that results do not depend on
+    what was run before.
+
+    Args:
+        duration (float, optional): The time, in seconds, for which to run each workload with each engine.
+        workloads (list of unicode, optional): The names of the workloads to run; defaults to all of them.
+        report (callable, optional): A function called with each `Result` as it is completed.
+
+    Returns:
+        list of Result: The result of each workload for each engine, in the order they were run.
+
+    Raises:
+        EnigmaValueError: Raised for an unknown workload, or a duration that is not positive.
+
+    Examples:
+        >>> [(r.workload, r.engine, r.unit) for r in run(0.01, ['encode', 'parse'])]
+        [(u'encode', u'config', u'chars'), (u'encode', u'engine', u'chars'), (u'parse', u'config', u'configs')]
+
+    """
+    names = [w[0] for w in WORKLOADS]
+    for name in workloads or []:
+        if name not in names:
+            raise EnigmaValueError('Bad workload - {0} is not one of {1}'.format(name, ', '.join(names)))
+    if not duration > 0:
+        raise EnigmaValueError('Bad duration - {0} is not a positive number of seconds'.format(duration))
+
+    results = []
+    for name, unit, size, engines in WORKLOADS:
+        if workloads and name not in workloads:
+            continue
+        for engine, setup in engines:
+            stats.clear_caches()
+            result = Result(name, engine, unit, size, *measure(setup(), size, duration))
+            results.append(result)
+            if report is not None:
+                report(result)
+    return results
+
+
+def result_string(result, baseline=None):
+    """A line of text describing a `Result`, as shown by the command line script's `bench` command.
+
+    Args:
+        result (Result): The result to describe.
+        baseline (Result, optional): A result for the same workload, relative to which the speed of `result` is
+            shown.
+
+    Returns:
+        unicode: The workload, engine, rate and latencies (in microseconds per operation) of the result.
+
+    """
+    speedup = '' if baseline is None else '  {0:6.1f}x'.format(result.rate / baseline.rate)
+    return '{0:<8} {1:<8} {2:>12,.0f} {3:<13} p50 {4:>10.1f} us  p90 {5:>10.1f} us  p99 {6:>10.1f} us{7}'.format(
+        result.workload, result.engine, result.rate, result.unit + '/s',
+        result.p50 * 1e6, result.p90 * 1e6, result.p99 * 1e6, speedup)
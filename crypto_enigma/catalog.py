@@ -0,0 +1,334 @@
+#!/usr/bin/env python
+# encoding: utf8
+
+# Copyright (C) 2016 by Roy Levien.
+# This file is part of crypto-enigma, an Enigma Machine simulator.
+# released under the BSD-3 License (see LICENSE.txt).
+
+"""
+This module supports a reconstruction of Rejewski's *card catalog*: an index of the cycle structure of the
+products of Enigma mappings that are six steps apart, as revealed by doubled message-key indicators, for every
+rotor order and starting position.
+
+"""
+
+from __future__ import (absolute_import, print_function, division, unicode_literals)
+
+import io
+import json
+from itertools import permutations, product
+from multiprocessing import Pool
+
+from .engine import *
+from .machine import *
+
+
+# A note on the characteristic:
+# A doubled indicator encodes a three-letter message key twice, so that letters 1 and 4 (2 and 5, 3 and 6) of the
+# indicator are encodings of the same letter, with the mappings of the first six steps from the daily key. Because
+# those mappings are involutions, AD = M4·M1 (BE = M5·M2, CF = M6·M3) is determined by the indicators alone, and its
+# cycle structure is unaffected by the (unknown) plugboard, which merely conjugates it.
+
+
+def cycle_lengths(perm):
+    """The lengths of the cycles of a permutation.
+
+    Args:
+        perm (sequence): A permutation, as a `~.cypher.Mapping` or as a sequence of letter indices.
+
+    Returns:
+        tuple: The lengths of the cycles of the permutation, longest first.
+
+    Examples:
+        >>> cycle_lengths(Mapping('BADCFEHGJILKNMPORQTSVUXWZY'))
+        (2, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2)
+        >>> cycle_lengths(Mapping('BCDEFGHIJKLMNOPQRSTUVWXYZA'))
+        (26,)
+
+    """
+    perm = [num_A0(c) if isinstance(c, unicode) else c for c in perm]
+    seen = [False] * len(perm)
+    lengths = []
+    for start in range(len(perm)):
+        length = 0
+        i = start
+        while not seen[i]:
+            seen[i] = True
+            i = perm[i]
+            length += 1
+        if length:
+            lengths.append(length)
+    return tuple(sorted(lengths, reverse=True))
+
+
+def product_permutations(cfg):
+    """The products of mappings six steps apart, for indicators enciphered at a configuration.
+
+    Args:
+        cfg (EnigmaConfig): The configuration (at the daily key) used to encipher the doubled indicators.
+
+    Returns:
+        tuple of Mapping: The permutations AD, BE and CF, taking each of the first three letters of an
+            indicator to the corresponding letter of the second three.
+
+    Examples:
+        Each is a product of two involutions, so every cycle length appears an even number of times:
+
+        >>> cfg = EnigmaConfig.config_enigma_from_string('B-I-II-III ABC UX.MO.AY 01.01.01')
+        >>> [cycle_lengths(p) for p in product_permutations(cfg)]
+        [(7, 7, 5, 5, 1, 1), (7, 7, 5, 5, 1, 1), (11, 11, 2, 2)]
+
+    """
+    mappings = [c.enigma_mapping() for c in cfg.stepped_configs(6)][1:]
+    return tuple(Mapping(mappings[i + 3].encode_string(mappings[i])) for i in range(3))
+
+
+def characteristic(cfg):
+    """The cycle-length characteristic of a configuration.
+
+    Args:
+        cfg (EnigmaConfig): The configuration (at the daily key) used to encipher the doubled indicators.
+
+    Returns:
+        tuple: The `cycle_lengths` of each of AD, BE, and CF (see `product_permutations`).
+
+    Examples:
+        >>> characteristic(EnigmaConfig.config_enigma_from_string('B-I-II-III ABC UX.MO.AY 01.01.01'))
+        ((7, 7, 5, 5, 1, 1), (7, 7, 5, 5, 1, 1), (11, 11, 2, 2))
+
+        The plugboard has no effect on the characteristic:
+
+        >>> characteristic(EnigmaConfig.config_enigma_from_string('B-I-II-III ABC ~ 01.01.01'))
+        ((7, 7, 5, 5, 1, 1), (7, 7, 5, 5, 1, 1), (11, 11, 2, 2))
+
+    """
+    return _characteristic(Engine.for_config(cfg), cfg.positions)
+
+
+def _characteristic(engine, positions):
+    mappings = []
+    for _ in range(6):
+        positions = engine.step(positions)
+        mappings.append(engine.mapping(positions))
+    return tuple(cycle_lengths([mappings[i + 3][j] for j in mappings[i]]) for i in range(3))
+
+
+def _key(chr_):
+    return ' '.join('.'.join('{}'.format(n) for n in lengths) for lengths in chr_)
+
+
+def _catalog_order(order):
+    # Build the catalog entries for a single rotor order; a unit of work for the pool
+    rotor_names = order.split('-')
+    cfg = EnigmaConfig.config_enigma(order, 'A' * (len(rotor_names) - 1), '',
+                                     '.'.join(['01'] * (len(rotor_names) - 1)))
+    engine = Engine.for_config(cfg)
+    entries = []
+    for windows in product(LETTERS, repeat=len(rotor_names) - 1):
+        windows = ''.join(windows)
+        positions = (1,) + tuple(num_A0(w) + 1 for w in windows[::-1]) + (1,)
+        entries.append((_key(_characteristic(engine, positions)), windows))
+    return order, entries
+
+
+class Catalog(object):
+    """An index of configurations by characteristic.
+
+    A `Catalog` maps each `characteristic` to the rotor orders and window letters (with all rings at **01** and
+    no plugboard) that produce it. Since the characteristic does not depend on the plugboard, and rings only
+    alter the (rare) turnovers in the first six steps, a lookup yields the rotor cores' starting positions for a
+    daily key.
+    """
+
+    def __init__(self, index=None):
+        self._index = dict() if index is None else index
+
+    def add(self, order, windows, chr_):
+        self._index.setdefault(chr_ if isinstance(chr_, unicode) else _key(chr_), []).append((order, windows))
+
+    def lookup(self, chr_):
+        """The rotor orders and window letters that produce a characteristic.
+
+        Args:
+            chr_ (tuple): A characteristic (see `characteristic`).
+
+        Returns:
+            list: A list of pairs of rotor names (e.g., `'B-I-II-III'`) and window letters (e.g. `'ABC'`).
+
+        """
+        return list(self._index.get(_key(chr_), []))
+
+    def configs(self, chr_, plugs='', rings=None):
+        """The candidate configurations for a characteristic.
+
+        Args:
+            chr_ (tuple): A characteristic (see `characteristic`).
+            plugs (unicode, optional): A plugboard specification to use for each configuration.
+            rings (unicode, optional): Ring settings to use for each configuration; defaults to all **01**.
+
+        Yields:
+            EnigmaConfig: A configuration with the rotor cores at the positions of each catalog entry.
+
+        """
+        for order, windows in self.lookup(chr_):
+            rngs = '.'.join(['01'] * len(windows)) if rings is None else rings
+            # Keep the rotor cores where the catalog found them: offset window letters by the rings
+            winds = ''.join(chr_A0((num_A0(w) + int(r) - 1) % 26) for w, r in zip(windows, rngs.split('.')))
+            yield EnigmaConfig.config_enigma(order, winds, plugs, rngs)
+
+    def __len__(self):
+        return sum(len(v) for v in self._index.values())
+
+    def characteristics(self):
+        """The number of distinct characteristics in the catalog."""
+        return len(self._index)
+
+    def save(self, path):
+        """Write the catalog to a file at `path`."""
+        with io.open(path, 'w', encoding='utf-8') as f:
+            f.write(unicode(json.dumps(self._index, ensure_ascii=False, sort_keys=True)))
+
+    @staticmethod
+    def load(path):
+        """Read a catalog from a file at `path` (see `save`)."""
+        with io.open(path, 'r', encoding='utf-8') as f:
+            index = json.load(f)
+        return Catalog(dict((k, [tuple(e) for e in v]) for k, v in index.items()))
+
+
+def build_catalog(reflector='B', rotor_names=('I', 'II', 'III'), orders=None, processes=None):
+    """Build a `Catalog` of all rotor orders and window letters.
+
+    Args:
+        reflector (unicode, optional): The reflector used in every rotor order.
+        rotor_names (sequence, optional): The rotors from which all three-rotor orders are formed.
+        orders (sequence, optional): An explicit list of rotor orders (e.g., `['B-I-II-III', 'B-III-II-I']`),
+            used instead of `reflector` and `rotor_names`.
+        processes (int, optional): The number of worker processes to use; defaults to the number of CPUs, and
+            if `1` the catalog is built in the calling process.
+
+    Returns:
+        Catalog: The catalog of characteristics for every order and window letters.
+
+    """
+    if orders is None:
+        orders = ['-'.join((reflector,) + order) for order in permutations(rotor_names, 3)]
+
+    catalog = Catalog()
+    if processes == 1:
+        results = map(_catalog_order, orders)
+    else:
+        pool = Pool(processes)
+        try:
+            results = pool.map(_catalog_order, orders, chunksize=1)
+        finally:
+            pool.close()
+            pool.join()
+    for order, entries in results:
+        for key, windows in entries:
+            catalog.add(order, windows, key)
+    return catalog
+
+
+class Indicators(object):
+    """The product permutations revealed by a stream of doubled indicators.
+
+    Indicators enciphered at the same daily key are ingested one at a time, each adding (up to) one letter pair to
+    each of the three partial product permutations (see `product_permutations`); nothing else is retained, so
+    memory use is constant however many indicators are ingested. Once enough indicators have been seen to
+    determine all three, the `characteristic` is available and can be looked up in a `Catalog`.
+    """
+
+    def __init__(self):
+        self._perms = [[None] * 26 for _ in range(3)]
+        self._known = [0, 0, 0]
+        self._count = 0
+
+    @property
+    def count(self):
+        """The number of indicators ingested."""
+        return self._count
+
+    @property
+    def complete(self):
+        """Whether the indicators ingested so far fully determine all three product permutations."""
+        return self._known == [26, 26, 26]
+
+    def add(self, indicator):
+        """Ingest a single doubled indicator.
+
+        Args:
+            indicator (unicode): The six enciphered letters of a doubled message key.
+
+        Returns:
+            bool: Whether the product permutations are now `complete`.
+
+        Raises:
+            EnigmaValueError: Raised when the indicator is malformed or contradicts those already ingested (and
+                so cannot have been enciphered at the same daily key).
+
+        """
+        indicator = indicator.upper()
+        if len(indicator) != 6 or any(c not in LETTERS for c in indicator):
+            raise EnigmaValueError('Bad indicator - {0} should be six letters'.format(indicator))
+        # Every pair is checked before any is recorded, so that a rejected indicator leaves nothing behind
+        pairs = [(num_A0(indicator[i]), num_A0(indicator[i + 3])) for i in range(3)]
+        for perm, (first, second) in zip(self._perms, pairs):
+            known = perm[first]
+            if known != second and (known is not None or second in perm):
+                raise EnigmaValueError('Bad indicator - {0} is inconsistent with those already seen'.format(indicator))
+        for i, (first, second) in enumerate(pairs):
+            if self._perms[i][first] is None:
+                self._perms[i][first] = second
+                self._known[i] += 1
+        self._count += 1
+        return self.complete
+
+    def update(self, source, stop=True):
+        """Ingest doubled indicators from a source.
+
+        Args:
+            source (iterable): Strings each containing one or more indicators separated by whitespace; e.g.,
+                a list of indicators, or the lines of a file.
+            stop (bool, optional): Whether to stop consuming `source` once the permutations are `complete`.
+
+        Returns:
+            bool: Whether the product permutations are now `complete`.
+
+        """
+        for line in source:
+            for indicator in line.split():
+                if self.add(indicator) and stop:
+                    return True
+        return self.complete
+
+    def permutations(self):
+        """The (partial) product permutations.
+
+        Returns:
+            tuple of Mapping: The permutations AD, BE and CF, with a space for each letter not yet determined.
+
+        """
+        return tuple(Mapping(''.join(' ' if i is None else chr_A0(i) for i in perm)) for perm in self._perms)
+
+    def characteristic(self):
+        """The characteristic of the ingested indicators, or `None` if not yet `complete`."""
+        return tuple(cycle_lengths(perm) for perm in self._perms) if self.complete else None
+
+    def configs(self, catalog, plugs='', rings=None):
+        """The candidate configurations for the ingested indicators (see `Catalog.configs`).
+
+        Args:
+            catalog (Catalog): A catalog in which to look up the `characteristic`.
+            plugs (unicode, optional): A plugboard specification to use for each configuration.
+            rings (unicode, optional): Ring settings to use for each configuration; defaults to all **01**.
+
+        Yields:
+            EnigmaConfig: A candidate daily key configuration.
+
+        """
+        if not self.complete:
+            raise EnigmaValueError('Incomplete indicators - {0} ingested do not determine a characteristic'.format(
+                self._count))
+        for cfg in catalog.configs(self.characteristic(), plugs, rings):
+            yield cfg
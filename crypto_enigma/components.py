@@ -14,9 +14,9 @@ from __future__ import (absolute_import, print_function, division, unicode_liter
 from enum import Enum
 
 from itertools import cycle, islice
-from cachetools import cached
 
 from .cypher import *
+from .stats import counted_cache, register_cache
 
 
 # REV - Additional performance improvements
@@ -58,7 +58,7 @@ class Component(object):
         "outside of" an `~.machine.EnigmaConfig` can be :ref:`examined using <component_getting>` `component`.
         """
         # Should never happen if correct constructor has been used.
-        assert name not in _comps.keys()
+        assert name not in _comps.keys() and name not in _plugs
 
         self._name = name
         self._wiring = Mapping(wiring)
@@ -140,7 +140,7 @@ class Component(object):
         return self._turnovers
 
     # Caching here is essential; see general note on caching.
-    @cached({})
+    @counted_cache('Component.mapping')
     def mapping(self, position, direction=Direction.FWD):
         """The mapping performed by a component based on its rotational position.
 
@@ -197,6 +197,11 @@ class Component(object):
 
 # REV - Better way to initialize and store these as constants? <<<
 _comps = dict()
+_comps_counts = register_cache('components', _comps, clearable=False)
+
+# Plugboards, which are created as they are used, and so are held apart from the fixed components
+_plugs = dict()
+_plugs_counts = register_cache('plugboards', _plugs)
 
 # Rotors
 _rots = dict()
@@ -268,8 +273,15 @@ def component(name):
         else:
             return letters
 
-    if name not in _comps.keys():
-        _comps[name] = Component(name, ''.join(reduce(plug, name.split('.'), list(LETTERS))), '')
-    assert sorted(_comps[name].wiring) == list(LETTERS)
-    assert all([t in _comps[name].wiring for t in _comps[name].turnovers])
-    return _comps[name]
\ No newline at end of file
+    if name in _comps:
+        _comps_counts[0] += 1
+        comp = _comps[name]
+    elif name in _plugs:
+        _plugs_counts[0] += 1
+        comp = _plugs[name]
+    else:
+        _plugs_counts[1] += 1
+        comp = _plugs[name] = Component(name, ''.join(reduce(plug, name.split('.'), list(LETTERS))), '')
+    assert sorted(comp.wiring) == list(LETTERS)
+    assert all([t in comp.wiring for t in comp.turnovers])
+    return comp
\ No newline at end of file
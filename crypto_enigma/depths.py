@@ -0,0 +1,131 @@
+#!/usr/bin/env python
+# encoding: utf8
+
+# Copyright (C) 2016 by Roy Levien.
+# This file is part of crypto-enigma, an Enigma Machine simulator.
+# released under the BSD-3 License (see LICENSE.txt).
+
+"""
+This module supports finding messages sent *in depth*: enciphered starting from the same `~.machine.EnigmaConfig`,
+so that they were encoded with the same series of mappings.
+
+"""
+
+from __future__ import (absolute_import, print_function, division, unicode_literals)
+
+from collections import defaultdict, namedtuple
+from itertools import combinations
+from math import sqrt
+
+from .machine import *
+
+
+# A note on detecting depths:
+# At each step a machine performs a fixed mapping, so two messages in depth have the same cipher letter at a
+# position exactly when they have the same plain letter there. Their rate of coincidence is thus that of the plain
+# language (about 0.076 for German), rather than the 1/26 of unrelated cyphertexts. That difference is too small
+# to hash on: two messages in depth rarely agree over more than a letter or two in a row. So every pair is
+# compared by default, which is quadratic. For collections too large for that, candidates can instead be found by
+# hashing aligned n-grams of each message into buckets (a simple form of locality-sensitive hashing), which runs in
+# near-linear time but only catches pairs sharing an n-gram near their start, as stereotyped openings common in real
+# traffic do; other depths are missed. Either way, the pairs compared are scored in the same way.
+
+
+#: A cluster of messages found to be in depth, with the mean rate of coincidence of the pairs that joined it.
+Depth = namedtuple('Depth', ['messages', 'score', 'pairs'])
+
+
+def coincidences(a, b):
+    """The number of positions at which two aligned messages have the same letter.
+
+    Args:
+        a (unicode): A message.
+        b (unicode): Another message.
+
+    Returns:
+        tuple: The number of coincidences and the length of the overlap of the messages.
+
+    Examples:
+        >>> coincidences('ABCDEF', 'AXCYEZZZ')
+        (3, 6)
+
+    """
+    overlap = min(len(a), len(b))
+    return sum(1 for x, y in zip(a[:overlap], b[:overlap]) if x == y), overlap
+
+
+def _candidates(messages, prefix, band, fanout):
+    pairs = set()
+    # One position at a time, so only one position's buckets are held; most hold a single message
+    for start in range(0, prefix - band + 1):
+        buckets = dict()
+        for m, msg in enumerate(messages):
+            gram = msg[start:start + band]
+            if len(gram) < band:
+                continue
+            members = buckets.get(gram)
+            if members is None:
+                buckets[gram] = m
+            else:
+                if not isinstance(members, list):
+                    members = buckets[gram] = [members]
+                # Large buckets (a header shared by many messages) are chained rather than compared exhaustively
+                pairs.update((n, m) for n in members[-fanout:])
+                members.append(m)
+    return pairs
+
+
+def find_depths(messages, min_kappa=0.06, min_sigma=5.0, min_overlap=20, prefix=60, band=5, fanout=4,
+                exhaustive=True):
+    """Find clusters of messages likely to have been enciphered in depth.
+
+    Args:
+        messages (sequence of unicode): The cyphertexts to examine; these are passed through
+            `~.machine.EnigmaConfig.make_message` so that formatting (e.g., grouping) is ignored.
+        min_kappa (float, optional): The minimum rate of coincidence for a pair of messages to be
+            considered in depth.
+        min_sigma (float, optional): The minimum number of standard deviations by which the number of
+            coincidences for a pair of messages must exceed that expected for unrelated messages; since every pair
+            is a chance for unrelated messages to pass, this should be higher the more pairs are compared.
+        min_overlap (int, optional): The minimum number of aligned letters for a pair to be considered.
+        prefix (int, optional): The number of initial letters of each message hashed to find candidate pairs.
+        band (int, optional): The length of the aligned n-grams hashed to find candidate pairs.
+        fanout (int, optional): The number of earlier messages in a bucket each message is compared with.
+        exhaustive (bool, optional): Whether to compare every pair; if `False`, only candidate pairs, sharing an
+            aligned n-gram of length `band` within the first `prefix` letters, are compared. This is much faster
+            for large collections, but misses any depth without such a shared n-gram (e.g., one without a
+            stereotyped opening).
+
+    Returns:
+        list of Depth: The clusters found, most convincing first; each includes the indices of its `messages`
+            (in ascending order), its `score`, and the `pairs` (with their rates of coincidence) that joined it.
+
+    """
+    messages = [EnigmaConfig.make_message(m) for m in messages]
+    pairs = combinations(range(len(messages)), 2) if exhaustive else _candidates(messages, prefix, band, fanout)
+
+    parents = dict()
+
+    def root(m):
+        while parents.get(m, m) != m:
+            parents[m] = parents.get(parents[m], parents[m])
+            m = parents[m]
+        return m
+
+    joined = []
+    for a, b in pairs:
+        count, overlap = coincidences(messages[a], messages[b])
+        if overlap >= min_overlap and count >= max(min_kappa * overlap,
+                                                   overlap / 26 + min_sigma * sqrt(overlap * 25 / 26 ** 2)):
+            joined.append((a, b, count / overlap))
+            parents[root(b)] = root(a)
+
+    clusters = defaultdict(list)
+    for pair in joined:
+        clusters[root(pair[0])].append(pair)
+
+    depths = []
+    for pairs in clusters.values():
+        members = tuple(sorted(set(m for a, b, _ in pairs for m in (a, b))))
+        depths.append(Depth(members, sum(k for _, _, k in pairs) / len(pairs), sorted(pairs)))
+    return sorted(depths, key=lambda d: (-d.score, d.messages))
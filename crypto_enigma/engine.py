@@ -0,0 +1,443 @@
+#!/usr/bin/env python
+# encoding: utf8
+
+# Copyright (C) 2016 by Roy Levien.
+# This file is part of crypto-enigma, an Enigma Machine simulator.
+# released under the BSD-3 License (see LICENSE.txt).
+
+"""
+This is a supporting module that implements a table-driven engine for stepping Enigma machine configurations and
+computing the mappings they perform, using precomputed integer permutations rather than `~.cypher.Mapping` strings.
+It underlies the analysis modules, which must examine very large numbers of machine states, and will not generally
+be used directly.
+"""
+
+from __future__ import (absolute_import, print_function, division, unicode_literals)
+
+from array import array
+from collections import namedtuple
+from fractions import gcd
+
+from .components import *
+from .stats import counted_cache, counters, instance_cache, timed
+
+
+# A note on the representation used here:
+# Letters are represented by their alphabetic index (0 for A, ..., 25 for Z), mappings as tuples of such indices,
+# and positions, as in EnigmaConfig, as numbers from 1 to 26. Everything is computed from (and must agree exactly
+# with) Component.mapping and EnigmaConfig.step; the tables are simply the same mappings, computed once.
+
+
+# Tables are small (at most 52 tuples per component) and there are few distinct components, except plugboards, which
+# may be numerous enough that holding all of their tables is not.
+@counted_cache('engine.component_tables', maxsize=1024)
+def component_tables(name):
+    """The forward and reverse mappings performed by a component at every position, as integer tables.
+
+    Args:
+        name (unicode): The `~.components.Component.name` of a component.
+
+    Returns:
+        tuple: A pair of tuples (forward, reverse), each indexed by position - 1, of the mapping (as a tuple of
+            letter indices) performed by the component at that position (see `~.components.Component.mapping`).
+
+    """
+    comp = component(name)
+    # Plugboards can't rotate, so only compute (and cache) the mapping at their single position
+    positions = range(1, 27) if name in rotors + reflectors else [1] * 26
+    return tuple(tuple(tuple(num_A0(c) for c in comp.mapping(p, d)) for p in positions)
+                 for d in (Direction.FWD, Direction.REV))
+
+
+def turnover_positions(name, ring):
+    """The positions of a component at which it is in its turnover position (see `~.components.Component.turnovers`).
+
+    Args:
+        name (unicode): The `~.components.Component.name` of a component.
+        ring (int): The ring setting of the component.
+
+    Returns:
+        frozenset: The positions (see `~.machine.EnigmaConfig.positions`) at which the letter at the window is one
+            of the component's turnovers.
+
+    """
+    return frozenset(((num_A0(t) - ring + 1) % 26) + 1 for t in component(name).turnovers)
+
+
+class Engine(object):
+    """A fast model of an Enigma machine with fixed components and rings.
+
+    Only `~.machine.EnigmaConfig.positions` change as a machine operates, so an `Engine` captures everything else
+    about a configuration, and provides stepping and mappings for bare position tuples (in the same
+    processing order as `~.machine.EnigmaConfig.positions`).
+    """
+
+    def __init__(self, components, rings):
+        self._components = tuple(components)
+        self._rings = tuple(rings)
+        tables = [component_tables(c) for c in self._components]
+        self._fwd = tuple(t[0] for t in tables)
+        self._rev = tuple(t[1] for t in tables)
+        self._turns = tuple(turnover_positions(c, r) for c, r in zip(self._components, self._rings))
+
+    @staticmethod
+    def for_config(cfg):
+        """The `Engine` for the components and rings of an `~.machine.EnigmaConfig`.
+
+        Args:
+            cfg (EnigmaConfig): A machine configuration.
+
+        Returns:
+            Engine: An engine that can step and map the positions of `cfg`.
+
+        """
+        return _config_engine(cfg)
+
+    @property
+    def components(self):
+        return self._components
+
+    @property
+    def rings(self):
+        return self._rings
+
+    def step(self, positions):
+        """The positions that result from stepping a machine at `positions` (see `~.machine.EnigmaConfig.step`).
+
+        Args:
+            positions (tuple): The positions of each component in processing order.
+
+        Returns:
+            tuple: The stepped positions.
+
+        """
+        counters['steps'] += 1
+        return self._step(positions)
+
+    def _step(self, positions):
+        # Stepping, without counting a step taken (e.g., when only checking where a step leads)
+        stages = len(positions)
+        turn_1 = stages > 1 and positions[1] in self._turns[1]
+        turn_2 = stages > 2 and positions[2] in self._turns[2]
+        stepped = list(positions)
+        if stages > 1:
+            stepped[1] = positions[1] % 26 + 1
+        if stages > 2 and (turn_1 or turn_2):
+            stepped[2] = positions[2] % 26 + 1
+        if stages > 3 and turn_2:
+            stepped[3] = positions[3] % 26 + 1
+        return tuple(stepped)
+
+    def predecessors(self, positions):
+        """The positions from which stepping a machine results in `positions` (the inverse of `step`).
+
+        Stepping is not one-to-one: because of the "double step" of the middle rotor, some positions can be reached
+        from two others, and some (e.g., a middle rotor at its turnover with no rotor having just turned over) can't
+        be reached at all. Since the fast rotor always steps, there are only two candidates to consider: one in which
+        the middle rotor stepped and one in which it didn't.
+
+        Args:
+            positions (tuple): The positions of each component in processing order.
+
+        Returns:
+            list: The positions (none, one, or two tuples) that `step` to `positions`.
+
+        """
+        stages = len(positions)
+        prev = list(positions)
+        if stages > 1:
+            prev[1] = (positions[1] - 2) % 26 + 1
+        candidates = [tuple(prev)]
+        if stages > 2:
+            prev[2] = (positions[2] - 2) % 26 + 1
+            if stages > 3 and prev[2] in self._turns[2]:
+                prev[3] = (positions[3] - 2) % 26 + 1
+            candidates.append(tuple(prev))
+        return [c for c in candidates if self._step(c) == positions]
+
+    def stage_tables(self, positions):
+        """The integer tables for each stage of the machine (see `~.machine.EnigmaConfig.stage_mapping_list`).
+
+        Args:
+            positions (tuple): The positions of each component in processing order.
+
+        Returns:
+            list: The mapping, as a tuple of letter indices, performed by each stage, in processing order.
+
+        """
+        fwd = [t[p - 1] for t, p in zip(self._fwd, positions)]
+        rev = [t[p - 1] for t, p in zip(self._rev, positions)]
+        return fwd + rev[:-1][::-1]
+
+    def mapping(self, positions):
+        """The mapping performed by the machine at `positions` (see `~.machine.EnigmaConfig.enigma_mapping`).
+
+        Args:
+            positions (tuple): The positions of each component in processing order.
+
+        Returns:
+            tuple: The mapping, as a tuple of letter indices, performed by the machine as a whole.
+
+        """
+        tables = self.stage_tables(positions)
+        cur = tables[0]
+        for tbl in tables[1:]:
+            cur = [tbl[i] for i in cur]
+        return tuple(cur)
+
+    def stepped_mappings(self, positions, count):
+        """The mappings performed by the machine over a series of steps from `positions`.
+
+        Args:
+            positions (tuple): The positions of each component in processing order.
+            count (int): The number of steps.
+
+        Returns:
+            list: The `mapping` at each of the `count` positions following `positions`; i.e., those used to encode
+                each letter of a message of length `count` (see `~.machine.EnigmaConfig.enigma_encoding`).
+
+        """
+        mappings = []
+        for _ in range(count):
+            positions = self.step(positions)
+            mappings.append(self.mapping(positions))
+        return mappings
+
+    @timed('Engine.encode')
+    def encode(self, positions, letters, tracer=None):
+        """The encoding of a message by a machine at `positions` (see `~.machine.EnigmaConfig.enigma_encoding`).
+
+        Args:
+            positions (tuple): The positions of each component in processing order.
+            letters (sequence): The message, as a sequence of letter indices.
+            tracer (callable, optional): A function called with the path of each letter (see `encoding`).
+
+        Returns:
+            list: The encoded message, as a list of letter indices.
+
+        """
+        return list(self.encoding(positions, letters, tracer))
+
+    def encoding(self, positions, letters, tracer=None):
+        """Generate the encoding of a message, one letter at a time (see `encode`).
+
+        Args:
+            positions (tuple): The positions of each component in processing order.
+            letters (iterable): The message, as letter indices; this may be a (lazy) stream.
+            tracer (callable, optional): A function called, for each letter, with the positions at which it is
+                encoded, and its path through the machine: a list of the letter index entering each stage (see
+                `stage_tables`), followed by the encoded letter index. A `Trace` collects these compactly.
+
+        Yields:
+            int: The index of each encoded letter.
+
+        """
+        # Tracing has its own loop, so that encoding without a tracer pays nothing for it; letters are counted
+        # locally, and added to the counters once the encoding ends (or is abandoned)
+        count = 0
+        try:
+            if tracer is not None:
+                for i in letters:
+                    positions = self.step(positions)
+                    path = [i]
+                    for tbl in self.stage_tables(positions):
+                        i = tbl[i]
+                        path.append(i)
+                    tracer(positions, path)
+                    count += 1
+                    yield i
+                return
+            for i in letters:
+                positions = self.step(positions)
+                for tbl in self.stage_tables(positions):
+                    i = tbl[i]
+                count += 1
+                yield i
+        finally:
+            counters['chars'] += count
+
+    def encode_into(self, positions, src, dst):
+        """Encode a message held as ASCII bytes into a buffer (see `encode`).
+
+        Args:
+            positions (tuple): The positions of each component in processing order.
+            src (bytearray): The message, as uppercase ASCII letters.
+            dst (bytearray): A buffer, at least as long as `src`, into the start of which the encoded message is
+                written; it may be `src` itself.
+
+        Returns:
+            tuple: The positions after encoding the message, from which a following message could be encoded.
+
+        """
+        for j in range(len(src)):
+            positions = self.step(positions)
+            i = src[j] - 65
+            for tbl in self.stage_tables(positions):
+                i = tbl[i]
+            dst[j] = i + 65
+        counters['chars'] += len(src)
+        return positions
+
+
+#: The path of a letter through a machine (see `Trace`): the positions of the machine, and the letter index entering
+#: each stage, followed by the encoded letter index.
+TraceRecord = namedtuple('TraceRecord', ['positions', 'path'])
+
+
+class Trace(object):
+    """A compact record of the paths of the letters of a message through a machine.
+
+    A `Trace` is a tracer for `Engine.encoding`, which stores the positions and path of each letter in flat arrays
+    of bytes, rather than as strings or as objects for each letter.
+
+    Examples:
+        >>> from crypto_enigma.machine import EnigmaConfig
+        >>> cfg = EnigmaConfig.config_enigma_from_string('B-I-III-I EMO UX.MO.AY 13.04.11')
+        >>> trace = Trace()
+        >>> encoded = Engine.for_config(cfg).encode(cfg.positions, [num_A0(c) for c in 'TESTING'], trace)
+        >>> len(trace), len(trace.paths), trace[0].positions
+        (7, 70, (1, 6, 10, 19, 1))
+        >>> ''.join(chr_A0(i) for i in trace[0].path)
+        u'TTXTBRHPMO'
+        >>> list(trace.stages(0))[:2]
+        [(0, 19, 19), (1, 19, 23)]
+
+    """
+
+    def __init__(self):
+        self.positions = array(b'B')
+        self.paths = array(b'B')
+        self._positions = 0
+        self._path = 0
+
+    def __call__(self, positions, path):
+        self._positions, self._path = len(positions), len(path)
+        self.positions.extend(positions)
+        self.paths.extend(path)
+
+    def __len__(self):
+        return len(self.paths) // self._path if self._path else 0
+
+    def __getitem__(self, k):
+        if not 0 <= k < len(self):
+            raise IndexError('Trace index out of range')
+        return TraceRecord(tuple(self.positions[k * self._positions:(k + 1) * self._positions]),
+                           tuple(self.paths[k * self._path:(k + 1) * self._path]))
+
+    def stages(self, k):
+        """Generate the stage index, and the letter index entering and leaving it, for each stage of the `k`-th path."""
+        path = self[k].path
+        for stage in range(len(path) - 1):
+            yield stage, path[stage], path[stage + 1]
+
+
+@counted_cache('engine.Engine', maxsize=1024)
+def _engine(components, rings):
+    return Engine(components, rings)
+
+
+# The engine for each configuration in use, so that a configuration used repeatedly (e.g., to encode many short
+# messages) finds it without the lock of the shared cache
+@instance_cache('engine.config_engines')
+def _config_engine(cfg):
+    return _engine(cfg.components, cfg.rings)
+
+
+def mapping_string(table):
+    """The `~.cypher.Mapping` corresponding to an integer table.
+
+    Args:
+        table (tuple): A mapping as a sequence of letter indices.
+
+    Returns:
+        Mapping: The same mapping as a string of letters.
+
+    """
+    return Mapping(''.join(chr_A0(i) for i in table))
+
+
+#: The steps at which the middle and left rotors of a machine move (see `turnover_calendar`), the period of its
+#: stepping, and the number of steps before it becomes periodic.
+Calendar = namedtuple('Calendar', ['middle', 'left', 'period', 'transient'])
+
+
+def _rotor_steps(fast, middle, fast_turns, middle_turns, count):
+    # The steps (up to count) at which the middle and left rotors move, found by jumping from each movement of
+    # the middle rotor to the next, rather than taking every step: it moves at the step after the fast rotor is at
+    # a turnover, or, if it is itself at a turnover, at the very next step (taking the left rotor with it)
+    firsts = [(t - fast) % 26 + 1 for t in fast_turns]
+    middles, lefts = [], []
+    k = 0
+    while True:
+        if middle in middle_turns:
+            k += 1
+            if k > count:
+                break
+            lefts.append(k)
+        elif firsts:
+            k = min(f if f > k else f + ((k - f) // 26 + 1) * 26 for f in firsts)
+            if k > count:
+                break
+        else:
+            break
+        middles.append(k)
+        middle = middle % 26 + 1
+    return middles, lefts
+
+
+def turnover_calendar(cfg, count):
+    """The steps at which the middle and left rotors of a machine move, and the period of its stepping.
+
+    These are computed from the turnover positions of the rotors (see `turnover_positions`), taking into account
+    the "double step" of the middle rotor and rotors with two turnovers, at a cost proportional to the number of
+    movements of the middle rotor rather than to `count`.
+
+    Args:
+        cfg (EnigmaConfig): A machine configuration.
+        count (int): The number of steps to consider.
+
+    Returns:
+        Calendar: The steps, numbered from 1 (so that step `k` produces the `k`-th configuration following `cfg`
+            in `~.machine.EnigmaConfig.stepped_configs`), up to `count`, at which the `middle` and `left` rotors
+            move; the `period` after which the sequence of positions repeats; and the number of steps (the
+            `transient`) before it begins to do so (nonzero only if `cfg` isn't itself reached by stepping).
+
+    Examples:
+        >>> from crypto_enigma.machine import EnigmaConfig
+        >>> cal = turnover_calendar(EnigmaConfig.config_enigma_from_string('B-I-II-III ADU ~ 01.01.01'), 30)
+        >>> cal.middle, cal.left, cal.period, cal.transient
+        ([2, 3, 28], [3], 16900, 0)
+
+    """
+    engine = Engine.for_config(cfg)
+    positions = cfg.positions
+    fast_turns, middle_turns = engine._turns[1], engine._turns[2]
+    middles, lefts = _rotor_steps(positions[1], positions[2], fast_turns, middle_turns, count)
+
+    # Over each turn of the fast rotor, the middle rotor moves from one position to another that depends only on the
+    # first; following these moves finds when they cycle, and how far the left rotor moves in each cycle
+    seen, moves = dict(), []
+    middle = positions[2]
+    while middle not in seen:
+        seen[middle] = len(moves)
+        m, l = _rotor_steps(positions[1], middle, fast_turns, middle_turns, 26)
+        moves.append(len(l))
+        middle = (middle + len(m) - 1) % 26 + 1
+    start = seen[middle]
+    cycle = len(moves) - start
+    left_moves = sum(moves[start:]) % 26
+    period = 26 * cycle * (26 // gcd(left_moves, 26) if left_moves else 1)
+
+    # The positions are periodic once the middle rotor's position repeats after a cycle; this happens somewhere
+    # during the turn of the fast rotor at which the cycle is entered
+    transient = 0
+    if start > 0:
+        steps, _ = _rotor_steps(positions[1], positions[2], fast_turns, middle_turns, 26 * (start + cycle + 1))
+        offset = 26 * cycle
+
+        def moved(k):
+            return sum(1 for s in steps if s <= k)
+
+        transient = next(k for k in range(26 * (start - 1), 26 * start + 1)
+                         if (moved(k + offset) - moved(k)) % 26 == 0)
+    return Calendar(middles, lefts, period, transient)
@@ -24,4 +24,8 @@ class EnigmaValueError(EnigmaError, ValueError):
 
 
 class EnigmaDisplayError(EnigmaError):
-    pass
\ No newline at end of file
+    pass
+
+
+class EnigmaSteppingError(EnigmaError):
+    pass
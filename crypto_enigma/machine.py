@@ -17,10 +17,30 @@ several utility functions, which support examination of its state
 # highlight it in a the string representing a mapping. Ideally, the number of added printed characters should be even.
 from __future__ import (absolute_import, print_function, division, unicode_literals)
 
+import re
+import sys
 from unicodedata import combining
 
 from .components import *
+from .engine import Engine, Trace
 from .exceptions import *
+from .stats import counters, instance_cache, timed
+
+
+# Standard Kriegsmarine substitutions for symbols, applied by make_message
+_MESSAGE_SUBS = [(' ', ''), ('.', 'X'), (',', 'Y'), ("'", 'J'), ('>', 'J'), ('<', 'J'), ('!', 'X'),
+                 ('?', 'UD'), ('-', 'YY'), (':', 'XX'), ('(', 'KK'), (')', 'KK'),
+                 ('1', 'YQ'), ('2', 'YW'), ('3', 'YE'), ('4', 'YR'), ('5', 'YT'),
+                 ('6', 'YZ'), ('7', 'YU'), ('8', 'YI'), ('9', 'YO'), ('0', 'YP')]
+
+
+# A translation table (for unicode.translate) that keeps letters, substitutes symbols, and deletes every other
+# character up to U+00FF; a plain dict is used as it is far faster than one with __missing__, so any characters
+# beyond the table, which pass through untranslated, are removed afterward
+_MESSAGE_TABLE = dict([(i, None) for i in range(256)] +
+                      [(ord(c), ord(c)) for c in LETTERS] + [(ord(o), n) for o, n in _MESSAGE_SUBS])
+_NON_LETTERS = re.compile('[^A-Z]+')
+_LETTER_BYTES = LETTERS.encode('ascii')
 
 
 class EnigmaConfig(object):
@@ -75,6 +95,7 @@ class EnigmaConfig(object):
         self._positions = tuple(positions)
         self._rings = tuple(rings)
         self._stages = tuple(range(0, len(self._components)))
+        counters['configs'] += 1
 
     @staticmethod
     @require_unicode('rotor_names', 'window_letters', 'plugs', 'rings')
@@ -380,17 +401,67 @@ class EnigmaConfig(object):
                 return 0
 
         stepped_positions = [((self._positions[stage] + pos_inc(stage) - 1) % 26) + 1 for stage in self._stages]
+        counters['steps'] += 1
 
         return EnigmaConfig(self._components, stepped_positions, self._rings)
 
-    def stepped_configs(self, steps=None):
+    def predecessors(self):
+        """The Enigma machine configurations that step to this one.
+
+        Stepping is not one-to-one, because of the "double step" of the middle rotor: a configuration may follow
+        two different configurations, or none (see `~.engine.Engine.predecessors`).
+
+        Returns:
+            list of EnigmaConfig: The configurations (none, one, or two) for which `step` produces this one.
+
+        Examples:
+            >>> cfg = EnigmaConfig.config_enigma_from_string('B-I-II-III CFA ~ 01.01.01')
+            >>> [c.windows() for c in cfg.predecessors()]
+            [u'CFZ', u'BEZ']
+            >>> EnigmaConfig.config_enigma_from_string('B-I-II-III AEA ~ 01.01.01').predecessors()
+            []
+
+        """
+        return [EnigmaConfig(self._components, positions, self._rings)
+                for positions in Engine.for_config(self).predecessors(self._positions)]
+
+    def step_back(self):
+        """Step the Enigma machine back to the configuration preceding this one (the inverse of `step`).
+
+        Returns:
+            EnigmaConfig: The configuration for which `step` produces this one.
+
+        Raises:
+            EnigmaSteppingError: Raised if there is no such configuration, or if there is more than one
+                (see `predecessors`).
+
+        Examples:
+            >>> cfg = EnigmaConfig.config_enigma_from_string('B-I-II-III CFW ~ 01.01.01')
+            >>> print(cfg.step_back().windows())
+            BEV
+
+        """
+        preds = self.predecessors()
+        if not preds:
+            raise EnigmaSteppingError('Impossible step - {0} does not follow any configuration'.format(self.windows()))
+        if len(preds) > 1:
+            raise EnigmaSteppingError('Ambiguous step - {0} follows each of {1}'.format(
+                self.windows(), ', '.join(c.windows() for c in preds)))
+        counters['steps'] += 1
+        return preds[0]
+
+    def stepped_configs(self, steps=None, reverse=False):
         """Generate a series of stepped Enigma machine configurations.
 
         Args:
             steps (int, optional): An optional limit on the number of steps to take in generating configurations.
+            reverse (bool, optional): Whether to step backward (see `step_back`) rather than forward.
 
         Yields:
-            EnigmaConfig: The `EnigmaConfig` resulting from applying `step` to the previous one.
+            EnigmaConfig: The `EnigmaConfig` resulting from applying `step` (or `step_back`) to the previous one.
+
+        Raises:
+            EnigmaSteppingError: Raised, if `reverse`, when a configuration has no unique predecessor.
 
         Examples:
             This allows the examples above to be rewritten as
@@ -415,17 +486,121 @@ class EnigmaConfig(object):
                 c-γ-V-I-II LXZS UX.MO.KZ.AY.EF.PL 03.17.04.01
                 c-γ-V-I-II LXZT UX.MO.KZ.AY.EF.PL 03.17.04.01
 
+            and stepping can be reversed:
+
+            .. doctest:: step
+
+                >>> for c in cfg.stepped_configs(3, reverse=True):
+                ...     print(c.windows())
+                LXZO
+                LXZN
+                LXZM
+                LXZL
+
         """
         cur_config = self
         cur_step = 0
         while steps is None or cur_step <= steps:
             if cur_step > 0:
-                cur_config = cur_config.step()
+                cur_config = cur_config.step_back() if reverse else cur_config.step()
             yield cur_config
             cur_step += 1
 
+    def stepped_positions(self, steps=None, start=0, packed=False):
+        """Generate the positions of a series of stepped Enigma machine configurations.
+
+        A lightweight alternative to `stepped_configs`, for when only the `positions` of the configurations
+        (or their `windows`, see `windows_for`) are needed: no configurations are created, and stepping is done
+        with precomputed tables (see `~.engine.Engine.step`).
+
+        Args:
+            steps (int, optional): An optional limit on the number of steps to take in generating positions.
+            start (int, optional): The number of steps to take before generating the first positions.
+            packed (bool, optional): Whether to generate the positions of the rotors packed into a single integer
+                (see `unpack_positions`), rather than tuples.
+
+        Yields:
+            tuple or int: The `positions` of each configuration from `start` to `steps` steps from this one.
+
+        Examples:
+            >>> cfg = EnigmaConfig.config_enigma_from_string('B-I-II-III ADU ~ 01.01.01')
+            >>> list(cfg.stepped_positions(2))
+            [(1, 21, 4, 1, 1), (1, 22, 4, 1, 1), (1, 23, 5, 1, 1)]
+            >>> list(cfg.stepped_positions(2, start=1, packed=True))
+            [99, 126]
+            >>> list(cfg.windows_for(cfg.stepped_positions(3)))
+            [u'ADU', u'ADV', u'AEW', u'BFX']
+
+        """
+        engine = Engine.for_config(self)
+        positions = self._positions
+        for _ in range(start):
+            positions = engine.step(positions)
+        cur_step = start
+        while steps is None or cur_step <= steps:
+            if cur_step > start:
+                positions = engine.step(positions)
+            yield self._pack(positions) if packed else positions
+            cur_step += 1
+
+    @staticmethod
+    def _pack(positions):
+        # The rotor positions as the digits (0 to 25) of a base 26 number, with the first rotor the least significant
+        value = 0
+        for p in positions[-2:0:-1]:
+            value = value * 26 + p - 1
+        return value
+
+    def unpack_positions(self, packed):
+        """The `positions` corresponding to an integer generated by `stepped_positions` with `packed` set.
+
+        Args:
+            packed (int): The positions of the rotors in this configuration, packed into an integer.
+
+        Returns:
+            tuple: The generalized rotational position of each of the components, in machine processing order.
+
+        Examples:
+            >>> cfg = EnigmaConfig.config_enigma_from_string('B-I-II-III ADU ~ 01.01.01')
+            >>> cfg.unpack_positions(126)
+            (1, 23, 5, 1, 1)
+
+        """
+        positions = [1]
+        for _ in self._stages[1:-1]:
+            packed, digit = divmod(packed, 26)
+            positions.append(digit + 1)
+        return tuple(positions + [1])
+
+    def windows_for(self, positions):
+        """Generate the letters at the windows of an Enigma machine for a series of positions.
+
+        The `windows` of configurations with the same `components` and `rings` as this one, but the given `positions`
+        (e.g., as generated by `stepped_positions`), computed with a table of the letters for each rotor.
+
+        Args:
+            positions (iterable): A series of positions, as tuples or packed integers (see `stepped_positions`).
+
+        Yields:
+            unicode: The letters at the windows for each of the `positions`, in physical, conventional order.
+
+        """
+        # The letter at each position of each rotor, left to right
+        letters = [[chr_A0((p + r - 2) % 26) for p in range(1, 27)] for r in self._rings[-2:0:-1]]
+        rotors = len(letters)
+        for pos in positions:
+            if isinstance(pos, tuple):
+                yield ''.join([tbl[p - 1] for tbl, p in zip(letters, pos[-2:0:-1])])
+            else:
+                digits = [0] * rotors
+                for i in range(rotors - 1, -1, -1):
+                    pos, digits[i] = divmod(pos, 26)
+                yield ''.join([tbl[d] for tbl, d in zip(letters, digits)])
+
     # REV - Caching here isn't really needed
-    @cached({})
+    # Held for each instance, since each step produces a new configuration, and a cache keyed by configurations
+    # would keep every one alive
+    @instance_cache('EnigmaConfig.stage_mapping_list')
     def stage_mapping_list(self):
         """The list of mappings for each stage of an Enigma machine.
 
@@ -507,7 +682,7 @@ class EnigmaConfig(object):
                  zip(self._components, self._positions)][:-1][::-1])
 
     # REV - Caching here isn't really needed
-    @cached({})
+    @instance_cache('EnigmaConfig.enigma_mapping_list')
     def enigma_mapping_list(self):
         """The list of progressive mappings of an Enigma machine at each stage.
 
@@ -580,6 +755,7 @@ class EnigmaConfig(object):
         """
         return self.enigma_mapping_list()[-1]
 
+    @timed('enigma_encoding')
     @require_unicode('message')
     def enigma_encoding(self, message):
         """Encode a message using the machine configuration.
@@ -631,10 +807,91 @@ class EnigmaConfig(object):
 
         """
         message = EnigmaConfig.make_message(message)
+        counters['chars'] += len(message)
 
         return ''.join([step_config.enigma_mapping().encode_char(letter) for
                         (letter, step_config) in zip(message, self.step().stepped_configs())])
 
+    @require_unicode('message')
+    def trace_encoding(self, message):
+        """Trace the path of each letter of a message through the machine as it is encoded.
+
+        This records the same information as `config_string` in the `'internal'` format for each step of
+        `enigma_encoding`, but as numbers rather than text.
+
+        Args:
+            message (unicode): A message to encode (see `make_message`).
+
+        Returns:
+            Trace: The positions at which each letter is encoded, and its path through the stages of the machine
+                (see `~.engine.Trace`).
+
+        Examples:
+            >>> cfg = EnigmaConfig.config_enigma_from_string('B-I-III-I EMO UX.MO.AY 13.04.11')
+            >>> trace = cfg.trace_encoding('TESTING')
+            >>> ''.join(chr_A0(trace[k].path[-1]) for k in range(len(trace)))
+            u'OZQKPFL'
+
+        """
+        trace = Trace()
+        for _ in Engine.for_config(self).encoding(self._positions, (num_A0(c) for c in
+                                                                    EnigmaConfig.make_message(message)), trace):
+            pass
+        return trace
+
+    def enigma_encoding_bytes(self, data):
+        """Encode a message held as bytes using the machine configuration.
+
+        The same as `enigma_encoding`, but for messages held as ASCII `bytes`, `bytearray` or `memoryview`, which
+        are encoded without conversion to and from `unicode`.
+
+        Args:
+            data (bytes): A message to encode (see `make_message_bytes`).
+
+        Returns:
+            bytes: The machine-encoded message.
+
+        Examples:
+            >>> cfg = EnigmaConfig.config_enigma_from_string('B-I-III-I EMO UX.MO.AY 13.04.11')
+            >>> cfg.enigma_encoding_bytes(b'TESTING')
+            'OZQKPFL'
+
+        """
+        message = EnigmaConfig.make_message_bytes(data)
+        Engine.for_config(self).encode_into(self.positions, message, message)
+        return bytes(message)
+
+    def encode_into(self, src, dst):
+        """Encode a message held as bytes into a buffer.
+
+        The same as `enigma_encoding_bytes`, but with the encoded message written into the start of an existing
+        buffer, which can be reused for any number of messages.
+
+        Args:
+            src (bytes): A message to encode (see `make_message_bytes`).
+            dst (bytearray): A buffer at least as long as the message.
+
+        Returns:
+            int: The length of the encoded message written to `dst`.
+
+        Raises:
+            EnigmaValueError: Raised if `dst` is too short to hold the encoded message.
+
+        Examples:
+            >>> cfg = EnigmaConfig.config_enigma_from_string('B-I-III-I EMO UX.MO.AY 13.04.11')
+            >>> buf = bytearray(16)
+            >>> n = cfg.encode_into(b'testing', buf)
+            >>> buf[:n]
+            bytearray(b'OZQKPFL')
+
+        """
+        message = EnigmaConfig.make_message_bytes(src)
+        if len(message) > len(dst):
+            raise EnigmaValueError('Bad buffer - {0} bytes is too short for a message of {1} letters'.format(
+                len(dst), len(message)))
+        Engine.for_config(self).encode_into(self.positions, message, dst)
+        return len(message)
+
     # ASK - Equvalent to Haskell read (if this is like show, or is _repr_ show; eval(repr(obj)) )? <<<
     def __unicode__(self):
         return "{0} {1} {2} {3}".format('-'.join(self._components[1:][::-1]),
@@ -746,15 +1003,53 @@ class EnigmaConfig(object):
             unicode: A string of valid Enigma machine input characters.
 
         """
-        subs = [(' ', ''), ('.', 'X'), (',', 'Y'), ("'", 'J'), ('>', 'J'), ('<', 'J'), ('!', 'X'),
-                ('?', 'UD'), ('-', 'YY'), (':', 'XX'), ('(', 'KK'), (')', 'KK'),
-                ('1', 'YQ'), ('2', 'YW'), ('3', 'YE'), ('4', 'YR'), ('5', 'YT'),
-                ('6', 'YZ'), ('7', 'YU'), ('8', 'YI'), ('9', 'YO'), ('0', 'YP')]
+        # Substitutions replace only non-letters with letters, so they can all be made in a single pass
+        return _NON_LETTERS.sub('', string.upper().translate(_MESSAGE_TABLE))
+
+    @staticmethod
+    def make_message_chunks(chunks):
+        """Convert a series of strings to valid Enigma machine input, one at a time.
+
+        Each string is converted as by `make_message`, so that the concatenation of the results is the same as
+        that of `make_message` applied to the concatenation of the strings, without it ever being assembled.
+
+        Args:
+            chunks (iterable of unicode): Strings to convert; e.g., the lines of a file.
+
+        Yields:
+            unicode: The valid Enigma machine input characters for each string.
+
+        Examples:
+            >>> list(EnigmaConfig.make_message_chunks(['Testing, ', 'testing? 1 2']))
+            [u'TESTINGY', u'TESTINGUDYQYW']
+
+        """
+        for chunk in chunks:
+            yield EnigmaConfig.make_message(chunk)
+
+    @staticmethod
+    def make_message_bytes(data):
+        """Convert a string of bytes to valid Enigma machine input.
 
-        msg = filter(lambda c: c in LETTERS, reduce(lambda s, (o, n): s.replace(o, n), subs, string.upper()))
-        assert all(letter in LETTERS for letter in msg)
+        The same as `make_message`, for ASCII `bytes`, `bytearray` or `memoryview`. Input that is already valid
+        (e.g., the output of another encoding) is only copied.
 
-        return msg
+        Args:
+            data (bytes): A string to convert to valid Enigma machine input; any non-ASCII bytes are removed.
+
+        Returns:
+            bytearray: A new string of valid Enigma machine input characters.
+
+        Examples:
+            >>> EnigmaConfig.make_message_bytes(b'Testing, testing? 1 2')
+            bytearray(b'TESTINGYTESTINGUDYQYW')
+
+        """
+        message = bytearray(data).upper()
+        if message.translate(None, _LETTER_BYTES):
+            # Only input with something other than letters needs substitutions
+            message = bytearray(EnigmaConfig.make_message(message.decode('latin-1')).encode('ascii'))
+        return message
 
     # TBD - Additional formats, e.g., components listed, etc.
     _FMTS_INTERNAL = ['internal', 'detailed', 'schematic']
@@ -1003,14 +1298,15 @@ class EnigmaConfig(object):
                 Each character will be used as a `letter` in the `config_string` specified by the `format`.
             steps (int, optional): A number of steps to run; if omitted when a `message` is provided,
                 will default to the length of the message; otherwise defaults to 1
-            overwrite (bool, optional): Whether to overwrite the display of each step after a pause.
-                (May result in garbled output on some systems.)
+            overwrite (bool, optional): Whether to overwrite the display of each step with the next, as an
+                animation (see `delay`). (May result in garbled output on some systems.)
             format (str, optional): A string specifying the format used to display the `EnigmaConfig` at each
                 step of message processing; see `config_string`.
             initial (bool, optional): Whether to show the initial starting step; the `EnigmaConfig` before
                 encoding begins.
-            delay (float, optional): The number of seconds to wait (see `time.sleep`) between the display of
-                each processing step; defaults to 0.2.
+            delay (float, optional): When overwriting, the shortest time in seconds between the display of
+                steps; steps that are processed more quickly are not displayed, except for the last, and
+                processing never waits for the display. With a delay of 0 (or less) every step is displayed.
             show_step (bool, optional): Whether to include the step number in the display.
             show_encoding (bool, optional): Whether to indicate the encoding of each character for formats
                 that do not include it by default; see `config_string`.
@@ -1114,20 +1410,21 @@ class EnigmaConfig(object):
                 ...
 
         """
-        def print_config_string(cfg_str):
-            if step_num != 0 or initial:
-                if show_step:
-                    if format=='internal':
-                        cfg_str = '{0:04d}\n{1}'.format(step_num, cfg_str)
-                    else:
-                        cfg_str = '{0:04d}  {1}'.format(step_num, cfg_str)
-                if overwrite and step_num <= steps:
-                    print_over(cfg_str, (0 if initial else 1) < step_num, delay)
-                else:
-                    print(cfg_str)
-                if not overwrite and format=='internal' and step_num < steps:
-                    print('')
-
+        strings = self._operation_strings(message, steps, format, initial, show_step, show_encoding, mark_func)
+        if overwrite:
+            # Steps are displayed no more often than every delay seconds, skipping those in between
+            animation = Animation(1 / delay if delay > 0 else None)
+            for _, _, cfg_str in strings:
+                animation.show(cfg_str)
+            animation.close()
+            return
+        for step_num, steps, cfg_str in strings:
+            print(cfg_str)
+            if format=='internal' and step_num < steps:
+                print('')
+
+    def _operation_strings(self, message, steps, format, initial, show_step, show_encoding, mark_func):
+        # The configuration strings shown by print_operation, with their step numbers and the number of steps
         message = EnigmaConfig.make_message(message)
         if message != '':
             steps = len(message) if steps is None else min(steps, len(message))
@@ -1137,10 +1434,23 @@ class EnigmaConfig(object):
             message = ' '
             steps = 1
 
-        for (step_num, cfg, letter) in zip(range(0, steps+1), self.stepped_configs(), ' ' + message[:steps]):
+        # Formats that show only what changes with positions are rendered without creating each configuration
+        renderer = _OperationRenderer.for_format(self, format, show_encoding, mark_func)
+        states = self.stepped_configs() if renderer is None else self.stepped_positions()
+
+        for (step_num, state, letter) in zip(range(0, steps+1), states, ' ' + message[:steps]):
             if not initial and step_num == 0:
                 continue
-            print_config_string(cfg.config_string(letter, format=format, show_encoding=show_encoding, mark_func=mark_func))
+            if renderer is None:
+                cfg_str = state.config_string(letter, format=format, show_encoding=show_encoding, mark_func=mark_func)
+            else:
+                cfg_str = renderer.render(state, letter)
+            if show_step:
+                if format=='internal':
+                    cfg_str = '{0:04d}\n{1}'.format(step_num, cfg_str)
+                else:
+                    cfg_str = '{0:04d}  {1}'.format(step_num, cfg_str)
+            yield step_num, steps, cfg_str
 
     @require_unicode('message')
     def print_operation_internal(self, message, mark_func=None):
@@ -1153,10 +1463,10 @@ class EnigmaConfig(object):
     @staticmethod
     @require_unicode('msg')
     def _postprocess(msg):
-        return '\n'.join(chunk_of(' '.join(chunk_of(msg, 4)), 60))
+        return '\n'.join(grouped_lines(msg))
 
     @require_unicode('message')
-    def print_encoding(self, message):
+    def print_encoding(self, message, group=4, width=60, numbered=False):
         """Show the conventionally formatted encoding of a message.
 
         Print out the encoding of a message by an (initial) `EnigmaConfig`, formatted into conventional
@@ -1165,6 +1475,12 @@ class EnigmaConfig(object):
         Args:
             message (unicode): A message to encode. Characters that are not letters will be replaced with
                 standard *Kriegsmarine* substitutions or be removed (see `make_message`).
+            group (int, optional): The number of characters in each block.
+            width (int, optional): The number of characters (including spaces) at which lines are wrapped.
+            numbered (bool, optional): Whether to begin each line with the number of its first block.
+
+        Raises:
+            EnigmaValueError: Raised if `group` is less than 1.
 
         Examples:
 
@@ -1179,8 +1495,93 @@ class EnigmaConfig(object):
                 RBBF PMHP HGCZ XTDY GAHG UFXG EWKB LKGJ
 
         """
-        print(EnigmaConfig._postprocess(self.enigma_encoding(EnigmaConfig.make_message(message))))
+        # Stream the encoding to the output, so that even the longest messages are encoded in constant memory
+        encoding = Engine.for_config(self).encoding(self._positions, (num_A0(c) for c in
+                                                                      EnigmaConfig.make_message(message)))
+        write_groups((chr_A0(i) for i in encoding), sys.stdout, group, width, numbered)
+
+
+
+class _OperationRenderer(object):
+    # Produces the same strings as config_string, for a machine at a series of positions, but from the engine's
+    # integer tables, with inverse lookups replaced by following the letter through the stages, and with each line
+    # of the internal format cached: a line depends only on a stage, its position and the letter it marks, so as
+    # the machine steps most lines are simply reused
+
+    _FMTS = EnigmaConfig._FMTS_INTERNAL + EnigmaConfig._FMTS_SINGLE + EnigmaConfig._FMTS_WINDOWS + \
+        EnigmaConfig._FMTS_ENCODING
+
+    def __init__(self, cfg, format, show_encoding, mark_func):
+        self._engine = Engine.for_config(cfg)
+        self._format = format
+        self._show_encoding = show_encoding or format in EnigmaConfig._FMTS_ENCODING
+        self._mark_func = mark_func
+        stages = len(cfg.positions)
+        # For each line (in processing order, through the reflector and back) the stage of its component
+        self._stages = list(range(stages)) + list(range(stages - 2, -1, -1))
+        self._labels = ['P' if s == 0 else 'R' if s == stages - 1 else unicode(s) for s in self._stages]
+        self._components = [cfg.components[s] for s in self._stages]
+        # The letter at the window for each position of each rotor, in processing order
+        self._letters = [[chr_A0((p + r - 2) % 26) for p in range(1, 27)] for r in cfg.rings[1:-1]]
+        self._lines = dict()
+        self._heads = dict()
 
+    @staticmethod
+    def for_format(cfg, format, show_encoding, mark_func):
+        return _OperationRenderer(cfg, format, show_encoding, mark_func) if format in _OperationRenderer._FMTS else None
+
+    def _mark(self, mapping, i):
+        return EnigmaConfig._marked_mapping(mapping, i, self._mark_func)
+
+    def _line(self, line, position, table, i):
+        stage = self._stages[line]
+        rotor = 0 < stage < len(self._stages) // 2 and line == stage
+        return '  {0} {1}  {2}  {3}  {4}\n'.format(self._labels[line],
+                                                    self._mark(''.join([chr_A0(c) for c in table]), i),
+                                                    self._letters[stage - 1][position - 1] if rotor else ' ',
+                                                    '{:02d}'.format(position) if rotor else '  ',
+                                                    self._components[line])
+
+    def _windows(self, positions):
+        return ''.join([letters[p - 1] for letters, p in zip(self._letters, positions[1:-1])][::-1])
+
+    def render(self, positions, letter):
+        """The string for the machine at `positions` with `letter` entered (see `EnigmaConfig.config_string`)."""
+        i = num_A0(letter) if letter in LETTERS else -1
+        fmt = self._format
+
+        if fmt in EnigmaConfig._FMTS_WINDOWS or fmt in EnigmaConfig._FMTS_ENCODING:
+            encoding_string = ''
+            if i >= 0 and self._show_encoding:
+                encoded = i
+                for tbl in self._engine.stage_tables(positions):
+                    encoded = tbl[encoded]
+                encoding_string = '  {0} > {1}'.format(letter, chr_A0(encoded))
+            return self._windows(positions) + encoding_string if fmt in EnigmaConfig._FMTS_WINDOWS else \
+                encoding_string[2:]
+
+        mapping = ''.join([chr_A0(c) for c in self._engine.mapping(positions)])
+        prompt = letter + ' >' if i >= 0 else '   '
+        if fmt in EnigmaConfig._FMTS_SINGLE:
+            return '{0} {1}  {2}  {3}'.format(prompt, self._mark(mapping, i), self._windows(positions),
+                                              ' '.join(['{:02d}'.format(p) for p in positions[1:-1]][::-1]))
+
+        head = self._heads.get(i)
+        if head is None:
+            head = self._heads[i] = '{0} {1}\n'.format(prompt, self._mark(LETTERS, i))
+        lines = [head]
+        j = i
+        for line, tbl in enumerate(self._engine.stage_tables(positions)):
+            position = positions[self._stages[line]]
+            key = (line, position, j)
+            text = self._lines.get(key)
+            if text is None:
+                text = self._lines[key] = self._line(line, position, tbl, j)
+            lines.append(text)
+            if j >= 0:
+                j = tbl[j]
+        lines.append('{0} {1}'.format(mapping[i] + ' <' if i >= 0 else '   ', self._mark(mapping, i)))
+        return ''.join(lines)
 
 # TBD - Tidy printing code so that the structures and names in config_string_internal and config_string match <<<
 # TBD - Check spacing of lines, esp at end in .._string and print_... methods <<<
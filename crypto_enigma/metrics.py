@@ -0,0 +1,226 @@
+#!/usr/bin/env python
+# encoding: utf8
+
+# Copyright (C) 2016 by Roy Levien.
+# This file is part of crypto-enigma, an Enigma Machine simulator.
+# released under the BSD-3 License (see LICENSE.txt).
+
+"""
+This module supports monitoring of long-running processes that encode with this package (e.g., an encoding service,
+see `~.service`): a `Registry` collects the durations of encoding calls as histograms, by the length of the
+message encoded, and reports them, along with the counters and cache statistics of `~.stats` and any gauges added
+to it, in the Prometheus text exposition format, which `serve_metrics` makes available over HTTP.
+
+Nothing is collected until a registry is enabled (see `enable`), so metrics cost nothing when unused. Rates, such as
+the number of characters encoded per second, are derived by the scraper from the counters reported.
+
+"""
+
+from __future__ import (absolute_import, print_function, division, unicode_literals)
+
+from bisect import bisect_left
+from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+from threading import Lock, Thread
+
+from . import stats
+
+
+#: The upper bounds, in seconds, of the buckets of latency histograms.
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+#: The upper bounds of the message lengths for which latencies are reported separately.
+LENGTH_BUCKETS = (16, 64, 256, 1024, 4096)
+
+# The counters of stats, and the names and descriptions under which they are reported
+_COUNTERS = [('steps', 'enigma_steps_total', 'Machine steps taken.'),
+             ('configs', 'enigma_configs_total', 'Machine configurations constructed.'),
+             ('chars', 'enigma_chars_total', 'Characters encoded.')]
+
+# The fields of stats.CacheStats, and the names, types and descriptions under which they are reported
+_CACHE_FIELDS = [('hits', 'enigma_cache_hits_total', 'counter', 'Cache hits.'),
+                 ('misses', 'enigma_cache_misses_total', 'counter', 'Cache misses.'),
+                 ('evictions', 'enigma_cache_evictions_total', 'counter', 'Cache entries discarded.'),
+                 ('size', 'enigma_cache_size', 'gauge', 'Cache entries held.')]
+
+
+def _bound(value):
+    return '+Inf' if value is None else '{0:g}'.format(value)
+
+
+def _labels(labels):
+    # Labels are given as pairs, in the order they are shown
+    return '{' + ','.join('{0}="{1}"'.format(k, unicode(v).replace('\\', r'\\').replace('"', r'\"').replace(
+        '\n', r'\n')) for k, v in labels) + '}' if labels else ''
+
+
+def _header(lines, name, type_, help_):
+    lines.append('# HELP {0} {1}'.format(name, help_))
+    lines.append('# TYPE {0} {1}'.format(name, type_))
+
+
+class Registry(object):
+    """A collection of metrics for encoding calls and for the package as a whole.
+
+    Args:
+        latency_buckets (sequence, optional): The upper bounds, in seconds, of the buckets of latency histograms.
+        length_buckets (sequence, optional): The upper bounds of the message lengths for which latencies are
+            reported separately; longer messages are reported together, with a length of `'+Inf'`.
+
+    Examples:
+        >>> registry = Registry(latency_buckets=[0.5], length_buckets=[16])
+        >>> registry.observe('enigma_encoding', 7, 0.125)
+        >>> print('\\n'.join(line for line in registry.exposition().splitlines() if 'seconds' in line))
+        # HELP enigma_encoding_seconds Duration of encoding calls, by message length.
+        # TYPE enigma_encoding_seconds histogram
+        enigma_encoding_seconds_bucket{call="enigma_encoding",length="16",le="0.5"} 1
+        enigma_encoding_seconds_bucket{call="enigma_encoding",length="16",le="+Inf"} 1
+        enigma_encoding_seconds_sum{call="enigma_encoding",length="16"} 0.125
+        enigma_encoding_seconds_count{call="enigma_encoding",length="16"} 1
+
+    """
+
+    def __init__(self, latency_buckets=LATENCY_BUCKETS, length_buckets=LENGTH_BUCKETS):
+        self._latency_buckets = tuple(latency_buckets)
+        self._length_buckets = tuple(length_buckets)
+        # For each call and length bucket: the count in each latency bucket (the last unbounded), and the total
+        self._histograms = dict()
+        self._gauges = dict()
+        self._lock = Lock()
+
+    def observe(self, name, size, seconds):
+        """Record the duration of a call (see `~.stats.set_observer`).
+
+        Args:
+            name (unicode): The name of the call.
+            size (int): The length of the message encoded.
+            seconds (float): The duration of the call.
+
+        """
+        length = next((b for b in self._length_buckets if size <= b), None)
+        with self._lock:
+            histogram = self._histograms.get((name, length))
+            if histogram is None:
+                histogram = self._histograms[(name, length)] = [0] * (len(self._latency_buckets) + 1) + [0.0]
+            histogram[bisect_left(self._latency_buckets, seconds)] += 1
+            histogram[-1] += seconds
+
+    def gauge(self, name, help_, func, **labels):
+        """Report the value of a function as a gauge.
+
+        Args:
+            name (unicode): The name of the gauge; gauges with the same name must have different `labels`.
+            help_ (unicode): A description of the gauge.
+            func (callable): A function, of no arguments, called for the value of the gauge when it is reported.
+            **labels: Labels distinguishing the gauge from others of the same name.
+
+        """
+        with self._lock:
+            self._gauges.setdefault(name, (help_, []))[1].append((labels, func))
+
+    def watch(self, encoder, pool='aio'):
+        """Report the utilization of an `~.aio.AsyncEncoder`'s workers, and the number of requests it has pending.
+
+        Args:
+            encoder (AsyncEncoder): The encoder.
+            pool (unicode, optional): A label distinguishing the encoder from others.
+
+        """
+        self.gauge('enigma_pool_utilization', 'Fraction of pool workers busy.', encoder.utilization, pool=pool)
+        self.gauge('enigma_pool_pending', 'Requests waiting to be batched.', encoder.pending, pool=pool)
+
+    def exposition(self):
+        """The current metrics, in the Prometheus text exposition format."""
+        lines = []
+        counters = dict(stats.counters)
+        for key, name, help_ in _COUNTERS:
+            _header(lines, name, 'counter', help_)
+            lines.append('{0} {1}'.format(name, counters[key]))
+
+        caches = sorted(stats.cache_info().items())
+        for field, name, type_, help_ in _CACHE_FIELDS:
+            _header(lines, name, type_, help_)
+            for cache, info in caches:
+                lines.append('{0}{1} {2}'.format(name, _labels([('cache', cache)]), getattr(info, field)))
+
+        with self._lock:
+            histograms = sorted((key, list(histogram)) for key, histogram in self._histograms.items())
+            gauges = sorted((name, help_, list(series)) for name, (help_, series) in self._gauges.items())
+        name = 'enigma_encoding_seconds'
+        _header(lines, name, 'histogram', 'Duration of encoding calls, by message length.')
+        for (call, length), histogram in histograms:
+            labels = [('call', call), ('length', _bound(length))]
+            total = 0
+            for bound, count in zip(self._latency_buckets + (None,), histogram[:-1]):
+                total += count
+                lines.append('{0}_bucket{1} {2}'.format(name, _labels(labels + [('le', _bound(bound))]), total))
+            lines.append('{0}_sum{1} {2!r}'.format(name, _labels(labels), histogram[-1]))
+            lines.append('{0}_count{1} {2}'.format(name, _labels(labels), total))
+
+        for name, help_, series in gauges:
+            _header(lines, name, 'gauge', help_)
+            for labels, func in series:
+                lines.append('{0}{1} {2!r}'.format(name, _labels(sorted(labels.items())), float(func())))
+        return '\n'.join(lines) + '\n'
+
+
+# The registry collecting the durations of encoding calls, if any
+_enabled = None
+
+
+def enable(registry=None):
+    """Start collecting the durations of encoding calls in a registry.
+
+    Args:
+        registry (Registry, optional): The registry; if `None`, the registry already enabled, if any, or a new one.
+
+    Returns:
+        Registry: The enabled registry.
+
+    """
+    global _enabled
+    _enabled = registry or _enabled or Registry()
+    stats.set_observer(_enabled.observe)
+    return _enabled
+
+
+def disable():
+    """Stop collecting the durations of encoding calls."""
+    stats.set_observer(None)
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+
+    def do_GET(self):
+        if self.path.split('?')[0] not in ('/', '/metrics'):
+            self.send_error(404)
+            return
+        body = self.server.registry.exposition().encode('utf-8')
+        self.send_response(200)
+        self.send_header(b'Content-Type', b'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header(b'Content-Length', bytes(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve_metrics(port, host='127.0.0.1', registry=None):
+    """Serve metrics over HTTP, at `/metrics`, from a background thread.
+
+    Args:
+        port (int): The port on which to serve; if `0`, any free port is used.
+        host (unicode, optional): The address on which to serve; by default, only to the local host.
+        registry (Registry, optional): The registry to report; if `None`, the registry enabled (see `enable`).
+
+    Returns:
+        HTTPServer: The server, whose `server_address` gives the port used, and which is stopped with its
+            `shutdown` method.
+
+    """
+    server = HTTPServer((host, port), _MetricsHandler)
+    server.registry = registry or enable()
+    thread = Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+    return server
@@ -0,0 +1,160 @@
+#!/usr/bin/env python
+# encoding: utf8
+
+# Copyright (C) 2016 by Roy Levien.
+# This file is part of crypto-enigma, an Enigma Machine simulator.
+# released under the BSD-3 License (see LICENSE.txt).
+
+"""
+This module supports profiling of work done with this package (e.g., by the command line script's `--profile`
+option): `profile` runs a function under `cProfile`, and writes the resulting statistics both as a `.pstats` file
+(for `pstats` or a viewer such as SnakeViz) and as *collapsed stacks*, one line per call stack with its cost, as
+used by flame graph tools (e.g., `flamegraph.pl`).
+
+Since `cProfile` records only callers and callees, not whole stacks, the collapsed stacks it produces apportion the
+time of each function among the stacks that reach it in proportion to the time each caller spends in it. For long
+runs, where the overhead of `cProfile` is unwelcome, a `Sampler` instead records the actual stack at regular
+intervals of processor time, with much less overhead.
+
+"""
+
+from __future__ import (absolute_import, print_function, division, unicode_literals)
+
+import cProfile
+import os
+import pstats
+import signal
+from collections import defaultdict
+
+from .exceptions import *
+
+
+def _frame_name(filename, line, name):
+    return '{0} ({1}:{2})'.format(name, os.path.basename(filename), line)
+
+
+def collapsed_stacks(stats, min_fraction=0.0001):
+    """The collapsed stacks for profile statistics.
+
+    Args:
+        stats (pstats.Stats): The statistics from a profile.
+        min_fraction (float, optional): The smallest share of a function's time that is followed into its callees.
+
+    Returns:
+        list of unicode: Lines each giving a stack, as function names separated by semicolons from the outermost
+            inwards, followed by a space and the time, in microseconds, spent in its innermost function.
+
+    """
+    entries = stats.stats
+    callees = defaultdict(list)
+    for func, (_, _, _, _, callers) in entries.items():
+        for caller, edge in callers.items():
+            callees[caller].append((func, edge[3]))
+
+    totals = defaultdict(float)
+
+    def descend(func, path, share):
+        _, _, own, cumulative, _ = entries[func]
+        path = path + (func,)
+        totals[path] += own * share
+        for callee, edge_cumulative in callees[func]:
+            callee_cumulative = entries[callee][3]
+            # Recursion is cut short, and its time attributed to the first appearance of a function
+            if callee in path or callee_cumulative <= 0:
+                continue
+            callee_share = share * min(1.0, edge_cumulative / callee_cumulative)
+            if callee_share >= min_fraction:
+                descend(callee, path, callee_share)
+
+    for func, (_, _, _, _, callers) in entries.items():
+        if not callers:
+            descend(func, (), 1.0)
+    return ['{0} {1}'.format(';'.join(_frame_name(*f) for f in path), int(round(t * 1e6)))
+            for path, t in sorted(totals.items()) if t >= 0.5e-6]
+
+
+class Sampler(object):
+    """A sampling profiler that records the stack of the main thread at regular intervals of processor time.
+
+    Sampling relies on `signal.setitimer` and so is available only on Unix, and only from the main thread.
+
+    Args:
+        interval (float, optional): The processor time, in seconds, between samples.
+
+    """
+
+    def __init__(self, interval=0.005):
+        if not hasattr(signal, 'setitimer'):
+            raise EnigmaError('Sampling is not supported on this platform')
+        self._interval = interval
+        self._counts = defaultdict(int)
+        self._previous = None
+
+    def _sample(self, _, frame):
+        stack = []
+        while frame is not None:
+            code = frame.f_code
+            stack.append((code.co_filename, code.co_firstlineno, code.co_name))
+            frame = frame.f_back
+        self._counts[tuple(reversed(stack))] += 1
+
+    def start(self):
+        """Start sampling."""
+        self._previous = signal.signal(signal.SIGPROF, self._sample)
+        signal.setitimer(signal.ITIMER_PROF, self._interval, self._interval)
+
+    def stop(self):
+        """Stop sampling."""
+        signal.setitimer(signal.ITIMER_PROF, 0, 0)
+        signal.signal(signal.SIGPROF, self._previous or signal.SIG_DFL)
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def collapsed_stacks(self):
+        """The collapsed stacks sampled (see `collapsed_stacks`), with the number of samples of each."""
+        return ['{0} {1}'.format(';'.join(_frame_name(*f) for f in stack), count)
+                for stack, count in sorted(self._counts.items())]
+
+
+def _write_lines(path, lines):
+    with open(path, 'wb') as f:
+        for line in lines:
+            f.write(line.encode('utf-8') + b'\n')
+
+
+def profile(func, out, sample=None):
+    """Call a function, profiling it, and write the results.
+
+    The results are written even if the function raises an exception (including `SystemExit`), which is propagated.
+
+    Args:
+        func (callable): A function of no arguments.
+        out (unicode): The path, without extension, of the results: `out + '.pstats'`, holding the statistics, and
+            `out + '.collapsed'`, holding the collapsed stacks (see `collapsed_stacks`).
+        sample (float, optional): If not `None`, sample the stack at intervals of this many seconds of processor
+            time (see `Sampler`), rather than profiling every call; only the collapsed stacks, counting samples, are
+            written.
+
+    Returns:
+        The result of `func`.
+
+    """
+    if sample is not None:
+        sampler = Sampler(sample)
+        try:
+            with sampler:
+                return func()
+        finally:
+            _write_lines(out + '.collapsed', sampler.collapsed_stacks())
+
+    profiler = cProfile.Profile()
+    try:
+        return profiler.runcall(func)
+    finally:
+        profiler.dump_stats(out + '.pstats')
+        _write_lines(out + '.collapsed', collapsed_stacks(pstats.Stats(out + '.pstats')))
@@ -0,0 +1,233 @@
+#!/usr/bin/env python
+# encoding: utf8
+
+# Copyright (C) 2016 by Roy Levien.
+# This file is part of crypto-enigma, an Enigma Machine simulator.
+# released under the BSD-3 License (see LICENSE.txt).
+
+"""
+This module supports exhaustive searches of Enigma key spaces: a space of rotor orders, ring settings and window
+letters is partitioned into units of work that are scored in parallel, with the best keys retained, progress
+reported, and the state of the search periodically saved so that an interrupted search can be resumed.
+
+"""
+
+from __future__ import (absolute_import, print_function, division, unicode_literals)
+
+import io
+import json
+import os
+import time
+from collections import namedtuple
+from heapq import heappush, heappushpop, nlargest
+from itertools import product
+from multiprocessing import Pool
+
+from .engine import *
+from .machine import *
+
+
+# A note on scheduling:
+# Units are handed to the pool one at a time (imap_unordered with a chunksize of 1), so that a worker that finishes
+# a unit immediately takes the next, and slow units never hold up idle workers. Within a unit, keys are scored
+# from bare positions with an Engine, so the per-key cost is essentially that of the scoring function itself.
+
+
+#: A unit of work: the window letters to be scored for a rotor order and ring setting.
+WorkUnit = namedtuple('WorkUnit', ['index', 'order', 'rings', 'windows'])
+
+#: A scored key, as a configuration string (see `~.machine.EnigmaConfig.config_enigma_from_string`).
+Result = namedtuple('Result', ['score', 'config'])
+
+#: The progress of a search, reported after each unit of work is completed.
+Progress = namedtuple('Progress', ['units', 'total_units', 'keys', 'total_keys', 'elapsed', 'rate', 'eta'])
+
+
+class KeySpace(object):
+    """A description of a space of keys to be searched.
+
+    A `KeySpace` combines every rotor order with every ring setting and every set of window letters; it is
+    partitioned into `WorkUnit` instances (by default, one for each order, ring setting, and leftmost window letter)
+    that are generated as needed, so that even very large spaces are never held in memory.
+
+    Args:
+        orders (sequence of unicode): The rotor orders (e.g., `'B-I-II-III'`) to search.
+        rings (sequence of unicode, optional): The ring settings (e.g., `'01.01.01'`) to search; defaults to all
+            **01**.
+        windows (sequence of unicode, optional): The window letters (e.g., `'ABC'`) to search; defaults to all.
+        plugs (unicode, optional): The plugboard specification used for every key.
+        unit_size (int, optional): The number of window letters in each unit of work when `windows` are given.
+
+    """
+
+    def __init__(self, orders, rings=None, windows=None, plugs='', unit_size=676):
+        self._orders = list(orders)
+        self._rings = None if rings is None else list(rings)
+        self._windows = None if windows is None else list(windows)
+        self._plugs = plugs
+        self._unit_size = unit_size
+
+    @staticmethod
+    def all_rings(count=3):
+        """Every ring setting for `count` rotors, for use as the `rings` of a `KeySpace`."""
+        return ['.'.join('{0:02d}'.format(r) for r in rngs) for rngs in product(range(1, 27), repeat=count)]
+
+    @property
+    def plugs(self):
+        return self._plugs
+
+    def _order_rings(self, order):
+        return ['.'.join(['01'] * (len(order.split('-')) - 1))] if self._rings is None else self._rings
+
+    def _order_windows(self, order):
+        if self._windows is not None:
+            for i in range(0, len(self._windows), self._unit_size):
+                yield tuple(self._windows[i:i + self._unit_size])
+        else:
+            rest = [''.join(w) for w in product(LETTERS, repeat=len(order.split('-')) - 2)]
+            for first in LETTERS:
+                yield tuple(first + w for w in rest)
+
+    def units(self):
+        """The units of work into which the key space is partitioned.
+
+        Yields:
+            WorkUnit: Each unit of work, numbered consecutively from `0` by its `index`.
+
+        """
+        index = 0
+        for order in self._orders:
+            for rings in self._order_rings(order):
+                for windows in self._order_windows(order):
+                    yield WorkUnit(index, order, rings, windows)
+                    index += 1
+
+    def __len__(self):
+        return sum(len(self._order_rings(order)) *
+                   (26 ** (len(order.split('-')) - 1) if self._windows is None else len(self._windows))
+                   for order in self._orders)
+
+    def count_units(self):
+        """The number of units of work into which the key space is partitioned."""
+        return sum(len(self._order_rings(order)) *
+                   (26 if self._windows is None else -(-len(self._windows) // self._unit_size))
+                   for order in self._orders)
+
+    def description(self):
+        """A summary of the key space, used to check that a checkpoint belongs to the same search."""
+        return dict(orders=self._orders, rings=self._rings, windows=self._windows, plugs=self._plugs,
+                    unit_size=self._unit_size)
+
+
+def _config_string(order, windows, plugs, rings):
+    return ' '.join([order, windows, plugs or '~', rings])
+
+
+def _search_unit(job):
+    # Score every key in a unit, keeping the best; a unit of work for the pool
+    unit, score, args, top, plugs = job
+    engine = Engine.for_config(EnigmaConfig.config_enigma(unit.order, unit.windows[0], plugs, unit.rings))
+    # The position of each rotor (in processing order) for each window letter, given its ring
+    tables = [dict((w, ((num_A0(w) - r + 1) % 26) + 1) for w in LETTERS) for r in engine.rings[1:-1]]
+    best = []
+    for windows in unit.windows:
+        positions = (1,) + tuple(t[w] for t, w in zip(tables, windows[::-1])) + (1,)
+        value = score(engine, positions, *args)
+        if value is not None:
+            if len(best) < top:
+                heappush(best, (value, windows))
+            elif value > best[0][0]:
+                heappushpop(best, (value, windows))
+    return unit.index, len(unit.windows), [(v, _config_string(unit.order, w, plugs, unit.rings)) for v, w in best]
+
+
+def _load_checkpoint(path, space):
+    with io.open(path, 'r', encoding='utf-8') as f:
+        state = json.load(f)
+    if state['space'] != space.description():
+        raise EnigmaValueError('Bad checkpoint - {0} is for a different search'.format(path))
+    return set(state['done']), state['keys'], [tuple(r) for r in state['results']]
+
+
+def _save_checkpoint(path, space, done, keys, results):
+    state = dict(space=space.description(), done=sorted(done), keys=keys, results=results)
+    # Write a new file and then replace the old, so that an interruption never leaves a damaged checkpoint
+    with io.open(path + '.tmp', 'w', encoding='utf-8') as f:
+        f.write(unicode(json.dumps(state, ensure_ascii=False, sort_keys=True)))
+    # On Windows a file can't be renamed over another, so the old is removed first (leaving, for a moment, only the
+    # new, in the temporary file)
+    if os.name == 'nt' and os.path.exists(path):
+        os.remove(path)
+    os.rename(path + '.tmp', path)
+
+
+def search(space, score, args=(), top=10, processes=None, checkpoint=None, every=60.0, progress=None):
+    """Score every key in a key space, returning the best.
+
+    Args:
+        space (KeySpace): The keys to search.
+        score (callable): A function taking an `~.engine.Engine` and the positions (see
+            `~.machine.EnigmaConfig.positions`) of a key, followed by `args`, and returning a score (higher is
+            better), or `None` if the key is to be ignored; it must be defined at the top level of a module, so
+            that it can be sent to worker processes.
+        args (tuple, optional): Further arguments passed to `score` (e.g., a cyphertext).
+        top (int, optional): The number of best keys to retain.
+        processes (int, optional): The number of worker processes to use; defaults to the number of CPUs, and
+            if `1` the search is done in the calling process.
+        checkpoint (unicode, optional): The path of a file to which the state of the search is saved; if the file
+            exists, the search resumes from the saved state, skipping the units of work already done.
+        every (float, optional): The minimum number of seconds between saves of the `checkpoint`.
+        progress (callable, optional): A function called with a `Progress` after each unit of work.
+
+    Returns:
+        list of Result: The best `top` keys found, best first.
+
+    Raises:
+        EnigmaValueError: Raised when the `checkpoint` is for a different key space.
+
+    """
+    done, keys, results = set(), 0, []
+    if checkpoint is not None and os.path.exists(checkpoint):
+        done, keys, results = _load_checkpoint(checkpoint, space)
+
+    best = []
+    for result in results:
+        heappush(best, result)
+
+    total_units, total_keys = space.count_units(), len(space)
+    jobs = ((unit, score, args, top, space.plugs) for unit in space.units() if unit.index not in done)
+    if processes == 1:
+        pool = None
+        finished = (_search_unit(job) for job in jobs)
+    else:
+        pool = Pool(processes)
+        finished = pool.imap_unordered(_search_unit, jobs, chunksize=1)
+
+    start = saved = time.time()
+    resumed = keys
+    try:
+        for index, count, unit_best in finished:
+            done.add(index)
+            keys += count
+            for result in unit_best:
+                if len(best) < top:
+                    heappush(best, result)
+                elif result > best[0]:
+                    heappushpop(best, result)
+            now = time.time()
+            if checkpoint is not None and now - saved >= every:
+                _save_checkpoint(checkpoint, space, done, keys, best)
+                saved = now
+            if progress is not None:
+                elapsed = now - start
+                rate = (keys - resumed) / elapsed if elapsed > 0 else 0.0
+                eta = (total_keys - keys) / rate if rate > 0 else None
+                progress(Progress(len(done), total_units, keys, total_keys, elapsed, rate, eta))
+    finally:
+        if pool is not None:
+            pool.terminate()
+            pool.join()
+        if checkpoint is not None:
+            _save_checkpoint(checkpoint, space, done, keys, best)
+
+    return [Result(*r) for r in nlargest(top, best)]
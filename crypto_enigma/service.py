@@ -0,0 +1,285 @@
+#!/usr/bin/env python
+# encoding: utf8
+
+# Copyright (C) 2016 by Roy Levien.
+# This file is part of crypto-enigma, an Enigma Machine simulator.
+# released under the BSD-3 License (see LICENSE.txt).
+
+"""
+This module supports a persistent encoding service: a daemon that keeps component tables and parsed configurations
+in memory and answers requests, one per line, as JSON objects over a Unix domain socket, and a client for it.
+
+Requests are objects with an operation (`'op'`), one of `'encode'`, `'show'`, or `'run'`, a configuration
+specification (`'config'`), and further members corresponding to the arguments of the command line script's
+commands of the same names (e.g., `'message'`, `'format'`, `'letter'`, `'steps'`). Responses are objects with a
+member `'ok'` indicating success, and either the output of the operation (`'result'`) or an error message
+(`'error'`). Any `'id'` in a request is returned in its response.
+
+"""
+
+from __future__ import (absolute_import, print_function, division, unicode_literals)
+
+import json
+import os
+import socket
+import stat
+from multiprocessing import Pool
+from SocketServer import StreamRequestHandler, ThreadingMixIn, UnixStreamServer
+
+from .engine import *
+from .machine import *
+from .specs import shared_specs
+
+
+_OPS = ('encode', 'show', 'run')
+
+# The type of each member of a request that has one (other than the format, which is a flag for 'encode')
+_TEXT_MEMBERS = ('config', 'message', 'letter', 'highlight')
+_INT_MEMBERS = ('steps',)
+
+
+def _mark_func(highlight):
+    return (lambda c: highlight[0] + c + highlight[1]) if highlight and len(highlight) == 2 else None
+
+
+def _check_types(request, op):
+    # Members of the wrong type would otherwise fail deep inside the machine, with other than an EnigmaError
+    text_members = _TEXT_MEMBERS + (('format',) if op != 'encode' else ())
+    for name in text_members + _INT_MEMBERS:
+        value = request.get(name)
+        if value is None:
+            continue
+        if name in text_members and not isinstance(value, unicode):
+            raise EnigmaValueError('Bad request - {0} should be a string, not {1}'.format(name, json.dumps(value)))
+        if name in _INT_MEMBERS and (isinstance(value, bool) or not isinstance(value, (int, long))):
+            raise EnigmaValueError('Bad request - {0} should be an integer, not {1}'.format(name, json.dumps(value)))
+
+
+def _result(request):
+    op = request.get('op', 'encode')
+    if op not in _OPS:
+        raise EnigmaValueError('Bad request - unknown operation, {0}'.format(op))
+    if 'config' not in request:
+        raise EnigmaValueError('Bad request - no config')
+    _check_types(request, op)
+    cfg = shared_specs.config(request['config'])
+    message = request.get('message') or ''
+    header = unicode(cfg) + ':\n\n' if request.get('verbose') else ''
+
+    if op == 'encode':
+        # Encode with the table-driven engine, which agrees with enigma_encoding but is far faster
+        letters = [num_A0(c) for c in EnigmaConfig.make_message(message)]
+        encoded = ''.join(chr_A0(i) for i in Engine.for_config(cfg).encode(cfg.positions, letters))
+        return EnigmaConfig._postprocess(encoded) if request.get('format') else encoded
+
+    fmt = request.get('format') or 'single'
+    mark_func = _mark_func(request.get('highlight'))
+    show_encoding = bool(request.get('showencoding'))
+    if op == 'show':
+        return header + cfg.config_string(request.get('letter') or '', fmt, show_encoding=show_encoding,
+                                          mark_func=mark_func)
+
+    lines = []
+    for step_num, steps, cfg_str in cfg._operation_strings(message, request.get('steps'), fmt,
+                                                           request.get('initial', True),
+                                                           bool(request.get('showstep')), show_encoding, mark_func):
+        lines.append(cfg_str)
+        if fmt == 'internal' and step_num < steps:
+            lines.append('')
+    return header + '\n'.join(lines)
+
+
+def handle_request(request):
+    """Carry out a single request.
+
+    Args:
+        request (dict): A request (see above).
+
+    Returns:
+        dict: The response to the request.
+
+    Examples:
+        >>> response = handle_request({'op': 'encode', 'config': 'B-I-III-I EMO UX.MO.AY 13.04.11',
+        ...                            'message': 'TESTING'})
+        >>> response['ok'], response['result']
+        (True, u'OZQKPFL')
+        >>> response = handle_request({'op': 'encode', 'config': 'B-I-III-I EMO UX.MO.AY 13.04', 'id': 7})
+        >>> response['ok'], response['id']
+        (False, 7)
+
+    """
+    response = dict()
+    if 'id' in request:
+        response['id'] = request['id']
+    try:
+        response['result'] = _result(request)
+        response['ok'] = True
+    except EnigmaError as e:
+        response['error'] = unicode(e)
+        response['ok'] = False
+    return response
+
+
+def _parse(line):
+    try:
+        request = json.loads(line.decode('utf-8') if isinstance(line, bytes) else line)
+        if not isinstance(request, dict):
+            raise ValueError('not an object')
+    except ValueError as e:
+        return None, dict(ok=False, error='Bad request - {0}'.format(e))
+    return request, None
+
+
+def _handle_line(numbered):
+    # Carry out the request on a single numbered line; a unit of work for the pool
+    number, line = numbered
+    request, response = _parse(line)
+    return number, handle_request(request) if response is None else response
+
+
+def process_jobs(lines, processes=1, ordered=True, chunksize=16):
+    """Carry out a series of requests, each a line of JSON.
+
+    Args:
+        lines (iterable): Lines each containing a request (see `handle_request`) as a JSON object; blank lines
+            are ignored.
+        processes (int, optional): The number of worker processes to use; if `1` requests are carried out in the
+            calling process, and if `None` the number of CPUs is used.
+        ordered (bool, optional): Whether responses are produced in the order of `lines`, rather than in the order
+            in which they are completed.
+        chunksize (int, optional): The number of requests sent to a worker process at a time.
+
+    Yields:
+        dict: The response to each request; if not `ordered`, it includes the (1-based) number of the `line`
+            containing the request.
+
+    """
+    numbered = ((n, line) for n, line in enumerate(lines, 1) if line.strip())
+    if processes == 1:
+        results = (_handle_line(job) for job in numbered)
+        pool = None
+    else:
+        pool = Pool(processes)
+        results = (pool.imap if ordered else pool.imap_unordered)(_handle_line, numbered, chunksize)
+    try:
+        for number, response in results:
+            if not ordered:
+                response['line'] = number
+            yield response
+    finally:
+        if pool is not None:
+            pool.terminate()
+            pool.join()
+
+
+def warm_tables():
+    """Compute, and cache, the mappings of every rotor and reflector at every position."""
+    for name in rotors + reflectors:
+        comp = component(name)
+        for position in range(1, 27):
+            for direction in (Direction.FWD, Direction.REV):
+                comp.mapping(position, direction)
+
+
+class _Handler(StreamRequestHandler):
+
+    def handle(self):
+        for line in iter(self.rfile.readline, b''):
+            if not line.strip():
+                continue
+            request, response = _parse(line)
+            if response is None:
+                try:
+                    response = handle_request(request)
+                except Exception as e:
+                    # Whatever goes wrong with one request, the connection remains open for others
+                    response = dict(ok=False, error='Error handling request - {0}'.format(e))
+                    if 'id' in request:
+                        response['id'] = request['id']
+            self.wfile.write(json.dumps(response).encode('utf-8') + b'\n')
+            self.wfile.flush()
+
+
+def _remove_stale_socket(path):
+    # Remove a socket left by a server that is no longer running, but nothing else
+    try:
+        mode = os.stat(path).st_mode
+    except OSError:
+        return
+    if not stat.S_ISSOCK(mode):
+        raise EnigmaError('Unable to serve at {0} - it exists and is not a socket'.format(path))
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(path)
+    except socket.error:
+        os.remove(path)
+    else:
+        raise EnigmaError('Unable to serve at {0} - another server is using it'.format(path))
+    finally:
+        probe.close()
+
+
+class EnigmaServer(ThreadingMixIn, UnixStreamServer):
+    """A server for encoding requests on a Unix domain socket; each connection is handled in its own thread.
+
+    Args:
+        path (unicode): The path of the socket; any socket already there is replaced, unless it is in use.
+
+    Raises:
+        EnigmaError: Raised if `path` exists but is not a socket, or is the socket of a server that is running.
+
+    """
+
+    daemon_threads = True
+
+    def __init__(self, path):
+        _remove_stale_socket(path)
+        UnixStreamServer.__init__(self, path, _Handler)
+        warm_tables()
+
+    def server_close(self):
+        UnixStreamServer.server_close(self)
+        if os.path.exists(self.server_address):
+            os.remove(self.server_address)
+
+
+def serve(path):
+    """Serve encoding requests on a Unix domain socket at `path` until interrupted."""
+    server = EnigmaServer(path)
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+
+
+class Client(object):
+    """A client for an `EnigmaServer`, which keeps a single connection open for any number of requests.
+
+    Args:
+        path (unicode): The path of the server's socket.
+
+    """
+
+    def __init__(self, path):
+        self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._socket.connect(path)
+        self._file = self._socket.makefile('rwb')
+
+    def request(self, request):
+        """Send a request (see `handle_request`) to the server, and return its response."""
+        self._file.write(json.dumps(request).encode('utf-8') + b'\n')
+        self._file.flush()
+        line = self._file.readline()
+        if not line:
+            raise EnigmaError('Connection closed by server')
+        return json.loads(line.decode('utf-8'))
+
+    def close(self):
+        self._file.close()
+        self._socket.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,139 @@
+#!/usr/bin/env python
+# encoding: utf8
+
+# Copyright (C) 2016 by Roy Levien.
+# This file is part of crypto-enigma, an Enigma Machine simulator.
+# released under the BSD-3 License (see LICENSE.txt).
+
+"""
+This module supports efficient handling of configuration specifications (as used by
+`~.machine.EnigmaConfig.config_enigma_from_string`) that are encountered repeatedly: a `SpecCache` parses each
+specification once, and shares the resulting configuration, and `parse_specs` validates many specifications at once,
+reporting every invalid one.
+
+"""
+
+from __future__ import (absolute_import, print_function, division, unicode_literals)
+
+from collections import namedtuple
+from threading import RLock
+
+from cachetools import LRUCache
+
+from .machine import *
+
+
+#: Statistics for a `SpecCache`.
+CacheInfo = namedtuple('CacheInfo', ['hits', 'misses', 'maxsize', 'currsize'])
+
+#: An invalid specification found by `parse_specs`: its position in the input, the specification, and the error.
+SpecError = namedtuple('SpecError', ['row', 'spec', 'error'])
+
+
+class SpecCache(object):
+    """A bounded cache of configurations, by specification.
+
+    A `SpecCache` holds the `~.machine.EnigmaConfig` for each of the `maxsize` most recently used specifications;
+    since configurations are immutable, the same instance is returned for every use of a specification, along with
+    anything it has itself cached (e.g., its mappings). It is safe for use from multiple threads.
+
+    Args:
+        maxsize (int, optional): The most configurations held.
+
+    Examples:
+        >>> cache = SpecCache(maxsize=2)
+        >>> cache.config('B-I-III-I EMO UX.MO.AY 13.04.11') is cache.config('B-I-III-I EMO UX.MO.AY 13.04.11')
+        True
+        >>> cache.info()
+        CacheInfo(hits=1, misses=1, maxsize=2, currsize=1)
+
+    """
+
+    def __init__(self, maxsize=1024):
+        self._cache = LRUCache(maxsize=maxsize)
+        self._lock = RLock()
+        self._hits = 0
+        self._misses = 0
+
+    def config(self, spec):
+        """The configuration for a specification (see `~.machine.EnigmaConfig.config_enigma_from_string`).
+
+        Raises:
+            EnigmaValueError: Raised when the specification is invalid; invalid specifications are not cached.
+
+        """
+        with self._lock:
+            try:
+                cfg = self._cache[spec]
+            except KeyError:
+                pass
+            else:
+                self._hits += 1
+                return cfg
+        cfg = EnigmaConfig.config_enigma_from_string(spec)
+        with self._lock:
+            self._misses += 1
+            self._cache[spec] = cfg
+        return cfg
+
+    __call__ = config
+
+    def info(self):
+        """The number of hits and misses, and the maximum and current number of configurations held."""
+        with self._lock:
+            return CacheInfo(self._hits, self._misses, self._cache.maxsize, self._cache.currsize)
+
+    def clear(self):
+        """Empty the cache and reset its statistics."""
+        with self._lock:
+            self._cache.clear()
+            self._hits = self._misses = 0
+
+
+#: A cache shared by the modules of this package that handle specifications received in requests.
+shared_specs = SpecCache()
+
+
+def parse_specs(specs, cache=None):
+    """Validate and parse a collection of specifications, collecting any errors rather than raising them.
+
+    Each distinct specification is parsed only once, however many times it appears.
+
+    Args:
+        specs (iterable of unicode): Configuration specifications (see
+            `~.machine.EnigmaConfig.config_enigma_from_string`).
+        cache (SpecCache, optional): A cache through which to parse the specifications; if `None`, each distinct
+            specification is parsed anew.
+
+    Returns:
+        tuple: A list of the configuration for each specification (or `None` if it is invalid), and a list of
+            `SpecError` for each invalid specification.
+
+    Examples:
+        >>> configs, errors = parse_specs(['B-I-II-III AAA ~ 01.01.01', 'B-I-II-IX AAA ~ 01.01.01',
+        ...                                'B-I-II-III AAA ~ 01.01.01'])
+        >>> configs[0] is configs[2], configs[1]
+        (True, None)
+        >>> errors
+        [SpecError(row=1, spec=u'B-I-II-IX AAA ~ 01.01.01', error=u'Bad configuration - Invalid rotor name, IX')]
+
+    """
+    parsed = dict()
+    configs, errors = [], []
+    for row, spec in enumerate(specs):
+        if not isinstance(spec, basestring):
+            # Rows of other types (e.g., lists decoded from JSON) may not be hashable, and are never valid
+            configs.append(None)
+            errors.append(SpecError(row, spec, 'Bad configuration - {0!r} is not a string'.format(spec)))
+            continue
+        if spec not in parsed:
+            try:
+                parsed[spec] = (EnigmaConfig.config_enigma_from_string(spec) if cache is None else
+                                cache.config(spec)), None
+            except (EnigmaError, TypeError) as e:
+                parsed[spec] = None, unicode(e)
+        cfg, error = parsed[spec]
+        configs.append(cfg)
+        if error is not None:
+            errors.append(SpecError(row, spec, error))
+    return configs, errors
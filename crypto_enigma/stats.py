@@ -0,0 +1,301 @@
+#!/usr/bin/env python
+# encoding: utf8
+
+# Copyright (C) 2016 by Roy Levien.
+# This file is part of crypto-enigma, an Enigma Machine simulator.
+# released under the BSD-3 License (see LICENSE.txt).
+
+"""
+This module supports instrumentation of the package: it reports the hits, misses, current size and evictions of
+each of the caches used to avoid recomputing mappings and tables, and counts the work done on the hot paths of
+encoding — the steps taken, the configurations constructed and the characters encoded. It also allows the duration
+of encoding calls to be observed (see `set_observer`), as `~.metrics` does.
+
+Counting adds no more than an increment to work that is already being done, so it is always on. Counts are kept
+for the current process only: work done in worker processes (e.g., by `~.triage.triage`) is counted there.
+
+"""
+
+from __future__ import (absolute_import, print_function, division, unicode_literals)
+
+import time
+from collections import namedtuple
+from functools import wraps
+from threading import RLock
+from weakref import KeyedRef
+
+from cachetools import LRUCache
+from cachetools.keys import hashkey
+
+
+#: Statistics for a cache (see `cache_info`).
+CacheStats = namedtuple('CacheStats', ['hits', 'misses', 'size', 'evictions'])
+
+# For each cache, by name: the cache, its counts of hits, misses and evictions, whether it may be cleared, and any
+# lock guarding it
+_caches = dict()
+
+#: The number of steps taken, configurations constructed and characters encoded; incremented directly on hot paths.
+counters = {'steps': 0, 'configs': 0, 'chars': 0}
+
+# A function called with the name, result size and duration of each timed call, or None
+_observer = None
+
+
+def register_cache(name, cache, clearable=True, lock=None):
+    """Register a cache to be reported by `cache_info`.
+
+    Args:
+        name (unicode): The name under which the cache is reported.
+        cache (dict): The cache; its size is reported.
+        clearable (bool, optional): Whether `clear_caches` may empty the cache.
+        lock (RLock, optional): A lock held by the cache's users while they access it.
+
+    Returns:
+        list: The counts of hits, misses and evictions for the cache, which its user increments.
+
+    """
+    counts = [0, 0, 0]
+    _caches[name] = (cache, counts, clearable, lock)
+    return counts
+
+
+class _LRUCache(LRUCache):
+    # A least recently used cache that counts the entries it evicts to make room for others
+
+    def __init__(self, maxsize):
+        LRUCache.__init__(self, maxsize)
+        self.counts = None
+
+    def popitem(self):
+        self.counts[2] += 1
+        return LRUCache.popitem(self)
+
+
+def counted_cache(name, maxsize=None):
+    """A decorator that caches the results of a function, counting hits and misses (see `register_cache`).
+
+    This behaves as `cachetools.cached`, so cached methods are keyed by their instance as well as their arguments.
+    By default the cache is unbounded; a bounded cache, which evicts the least recently used entries, suits shared
+    tables with keys that may be numerous (e.g., those of plugboards), at the cost of a lock. For results for
+    numerous, short lived objects, see `instance_cache`.
+
+    Args:
+        name (unicode): The name under which the cache is reported.
+        maxsize (int, optional): The most entries held, if the cache is bounded; a bounded cache is guarded by a
+            lock, so it can be used from several threads.
+
+    Examples:
+        >>> @counted_cache('example.square')
+        ... def square(x):
+        ...     return x * x
+        >>> square(3), square(3), square(4)
+        (9, 9, 16)
+        >>> cache_info()['example.square']
+        CacheStats(hits=1, misses=2, size=2, evictions=0)
+
+    """
+    def decorator(func):
+        if maxsize is not None:
+            return _bounded(func, name, maxsize)
+        cache = dict()
+        counts = register_cache(name, cache)
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            k = hashkey(*args, **kwargs)
+            try:
+                v = cache[k]
+            except KeyError:
+                counts[1] += 1
+                v = cache[k] = func(*args, **kwargs)
+                return v
+            counts[0] += 1
+            return v
+        return wrapper
+    return decorator
+
+
+def _bounded(func, name, maxsize):
+    cache, lock = _LRUCache(maxsize), RLock()
+    cache.counts = counts = register_cache(name, cache, lock=lock)
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        k = hashkey(*args, **kwargs)
+        with lock:
+            try:
+                v = cache[k]
+            except KeyError:
+                counts[1] += 1
+            else:
+                counts[0] += 1
+                return v
+        v = func(*args, **kwargs)
+        with lock:
+            cache[k] = v
+        return v
+    return wrapper
+
+
+def instance_cache(name):
+    """A decorator that caches the result of a method of no arguments for each instance, counting hits and misses.
+
+    Entries are held only as long as their instance is, so this suits results for objects that are numerous and short
+    lived (e.g., the configurations of each step of a machine), which a cache keyed by the objects themselves would
+    keep alive indefinitely; and no lock is needed to bound it, so a hit costs no more than a dictionary lookup.
+
+    Args:
+        name (unicode): The name under which the cache is reported.
+
+    Examples:
+        >>> class Square(object):
+        ...     def __init__(self, x):
+        ...         self.x = x
+        ...     @instance_cache('example.Square.value')
+        ...     def value(self):
+        ...         return self.x * self.x
+        >>> s = Square(3)
+        >>> s.value(), s.value()
+        (9, 9)
+        >>> cache_info()['example.Square.value']
+        CacheStats(hits=1, misses=1, size=1, evictions=0)
+        >>> del s
+        >>> cache_info()['example.Square.value'].size
+        0
+
+    """
+    def decorator(method):
+        cache = _InstanceCache()
+        counts = register_cache(name, cache)
+
+        @wraps(method)
+        def wrapper(self):
+            try:
+                v = cache[id(self)]
+            except KeyError:
+                counts[1] += 1
+                v = cache.add(self, method(self))
+                return v
+            counts[0] += 1
+            return v
+        return wrapper
+    return decorator
+
+
+class _InstanceCache(dict):
+    # Results keyed by the identity of their instances (rather than their hash, which for some objects is costly to
+    # compute or compare), each removed by a weak reference callback once its instance is gone, before its identity
+    # can be reused
+
+    def __init__(self):
+        dict.__init__(self)
+        self._refs = dict()
+
+    def _remove(self, r):
+        self.pop(r.key, None)
+        self._refs.pop(r.key, None)
+
+    def add(self, instance, value):
+        k = id(instance)
+        self._refs[k] = KeyedRef(instance, self._remove, k)
+        self[k] = value
+        return value
+
+    def clear(self):
+        dict.clear(self)
+        self._refs.clear()
+
+
+def timed(name):
+    """A decorator that reports the duration of each call of a function to the observer, if any (see `set_observer`).
+
+    When there is no observer, the only cost is a check for one; timed functions must return a sequence, the length
+    of which is reported as the size of the call.
+
+    Args:
+        name (unicode): The name under which calls are reported.
+
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if _observer is None:
+                return func(*args, **kwargs)
+            start = time.time()
+            result = func(*args, **kwargs)
+            _observer(name, len(result), time.time() - start)
+            return result
+        return wrapper
+    return decorator
+
+
+def set_observer(observer):
+    """Set the function called after each timed call (see `timed`), or remove it if `None`.
+
+    Args:
+        observer (callable): A function called with the name of the call, the size of its result, and its duration
+            in seconds; it may be called from any thread.
+
+    Returns:
+        callable: The previous observer, if any.
+
+    """
+    global _observer
+    previous, _observer = _observer, observer
+    return previous
+
+
+def cache_info():
+    """The `CacheStats` of every cache, by name."""
+    return dict((name, CacheStats(counts[0], counts[1], len(cache), counts[2]))
+                for name, (cache, counts, _, _) in _caches.items())
+
+
+def snapshot():
+    """The current statistics, as a dictionary of plain values (e.g., for serialization as JSON).
+
+    Returns:
+        dict: The statistics of each cache (see `cache_info`), by name, as a dictionary, under `'caches'`, and a
+            copy of `counters`, under `'counters'`.
+
+    Examples:
+        >>> from crypto_enigma.machine import EnigmaConfig
+        >>> reset()
+        >>> EnigmaConfig.config_enigma_from_string('B-I-III-I EMO UX.MO.AY 13.04.11').enigma_encoding('TESTING')
+        u'OZQKPFL'
+        >>> sorted(snapshot()['counters'].items())
+        [(u'chars', 7), (u'configs', 8), (u'steps', 7)]
+
+    """
+    return {'caches': dict((name, dict(s._asdict())) for name, s in cache_info().items()),
+            'counters': dict(counters)}
+
+
+def reset():
+    """Reset every count to zero; the contents of the caches are unaffected (see `clear_caches`)."""
+    for _, counts, _, _ in _caches.values():
+        counts[:] = [0, 0, 0]
+    for name in counters:
+        counters[name] = 0
+
+
+def clear_caches():
+    """Empty every clearable cache, counting the entries discarded as evictions.
+
+    Cached mappings and tables are recomputed as needed, so this is always safe; it releases the memory held for
+    configurations and plugboards that are no longer in use (though a plugboard used again is a new
+    `~.components.Component`).
+
+    """
+    for cache, counts, clearable, lock in _caches.values():
+        if clearable:
+            if lock is not None:
+                lock.acquire()
+            try:
+                evictions, size = counts[2], len(cache)
+                cache.clear()
+                counts[2] = evictions + size
+            finally:
+                if lock is not None:
+                    lock.release()
@@ -0,0 +1,234 @@
+#!/usr/bin/env python
+# encoding: utf8
+
+# Copyright (C) 2016 by Roy Levien.
+# This file is part of crypto-enigma, an Enigma Machine simulator.
+# released under the BSD-3 License (see LICENSE.txt).
+
+"""
+This module supports the triage of *stops*: candidate rotor orders and positions, with a partial plugboard, such as
+those produced by a bombe. Each stop's plugboard is completed, as far as a crib allows, by propagating its
+consequences, and then by a short hill-climb, and the resulting fully specified configurations are ranked by how
+much their decryption of a message resembles plain text.
+
+"""
+
+from __future__ import (absolute_import, print_function, division, unicode_literals)
+
+from collections import defaultdict, namedtuple
+from itertools import combinations
+from math import log10
+from multiprocessing import Pool
+
+from .engine import *
+from .machine import *
+
+
+# A note on the plugboard:
+# The machine's mapping at each step is S·M·S, where S is the plugboard and M the mapping of the (unplugged) rotors
+# and reflector. A crib letter pair (c, p) at a step with rotor mapping M thus means that M takes S(c) to S(p), so
+# knowing where either letter is plugged determines where the other is. Following these links from a stop's partial
+# plugboard either completes much of the plugboard or yields a contradiction that eliminates the stop.
+
+
+#: A candidate stop: a rotor order, window letters, ring settings, and a partial plugboard as a series of
+#: period-separated letter pairs (e.g., `'AB.CC'`), in which a repeated letter means a letter is not plugged.
+Stop = namedtuple('Stop', ['order', 'windows', 'rings', 'plugs'])
+
+#: The result of triage of a stop: its score, a configuration string (see
+#: `~.machine.EnigmaConfig.config_enigma_from_string`), the decrypted message, and the number of crib letters it
+#: reproduces.
+Verdict = namedtuple('Verdict', ['score', 'config', 'plain', 'matches'])
+
+#: A table of n-gram log probabilities (see `ngram_table`).
+NGrams = namedtuple('NGrams', ['n', 'logp', 'floor'])
+
+
+def ngram_table(source, n=3):
+    """A table of n-gram log probabilities for scoring decryptions.
+
+    Args:
+        source (unicode or dict): A sample of plain text (passed through `~.machine.EnigmaConfig.make_message`),
+            or a dictionary of counts of n-grams.
+        n (int, optional): The length of the n-grams counted in a sample text.
+
+    Returns:
+        NGrams: The length `n` of the n-grams, the base 10 log probability `logp` of each, and a `floor` used
+            for n-grams not in the table.
+
+    Examples:
+        >>> tbl = ngram_table('ABABAB', 2)
+        >>> tbl.n, sorted(tbl.logp), round(tbl.logp['AB'], 3)
+        (2, [u'AB', u'BA'], -0.222)
+
+    """
+    if isinstance(source, dict):
+        counts = source
+        n = len(next(iter(source)))
+    else:
+        text = EnigmaConfig.make_message(source)
+        counts = defaultdict(int)
+        for i in range(len(text) - n + 1):
+            counts[text[i:i + n]] += 1
+    total = sum(counts.values())
+    return NGrams(n, dict((g, log10(c / total)) for g, c in counts.items()), log10(0.01 / total))
+
+
+def _score(plain, ngrams):
+    # Default to the index of coincidence, which needs no model of the plain language
+    if ngrams is None:
+        counts = [0] * 26
+        for i in plain:
+            counts[i] += 1
+        return 26 * sum(c * (c - 1) for c in counts) / max(1, len(plain) * (len(plain) - 1))
+    text = ''.join(chr_A0(i) for i in plain)
+    logp, floor = ngrams.logp, ngrams.floor
+    return sum(logp.get(text[i:i + ngrams.n], floor) for i in range(len(text) - ngrams.n + 1))
+
+
+def _plug(stecker, a, b):
+    # Plug a to b if possible, returning whether anything changed; None on a contradiction
+    if stecker[a] == b:
+        return False
+    if stecker[a] is not None or stecker[b] is not None:
+        return None
+    stecker[a], stecker[b] = b, a
+    return True
+
+
+def propagate(stecker, links):
+    """Complete a partial plugboard from the consequences of a crib.
+
+    Args:
+        stecker (list): The plugboard, as a list giving the letter index to which each letter is plugged, or `None`
+            if unknown; it is updated in place.
+        links (dict): For each letter index, a list of pairs of a rotor mapping (see `~.engine.Engine.mapping`)
+            and the index of the letter it is linked to by the crib at a step with that mapping.
+
+    Returns:
+        bool: Whether the plugboard is consistent with the crib; if `False`, `stecker` is left partly updated.
+
+    """
+    queue = [x for x in range(26) if stecker[x] is not None]
+    while queue:
+        x = queue.pop()
+        for mapping, other in links[x]:
+            changed = _plug(stecker, other, mapping[stecker[x]])
+            if changed is None:
+                return False
+            if changed:
+                queue.extend({other, stecker[other]})
+    return True
+
+
+def _decrypt(mappings, cypher, stecker):
+    return [stecker[mapping[stecker[c]]] for mapping, c in zip(mappings, cypher)]
+
+
+def _climb(mappings, cypher, stecker, fixed, ngrams, max_plugs, passes):
+    # Try plugging (or unplugging) every pair of letters the crib leaves free, keeping each improvement
+    best = _score(_decrypt(mappings, cypher, stecker), ngrams)
+    free = [x for x in range(26) if x not in fixed]
+    for _ in range(passes):
+        improved = False
+        for a, b in combinations(free, 2):
+            trial = list(stecker)
+            if trial[a] == b:
+                trial[a], trial[b] = a, b
+            else:
+                for x in (a, b):
+                    trial[trial[x]] = trial[x]
+                trial[a], trial[b] = b, a
+                if sum(1 for x in range(26) if trial[x] != x) > 2 * max_plugs:
+                    continue
+            value = _score(_decrypt(mappings, cypher, trial), ngrams)
+            if value > best:
+                stecker, best, improved = trial, value, True
+        if not improved:
+            break
+    return stecker, best
+
+
+def _plugs_string(stecker):
+    return '.'.join(chr_A0(a) + chr_A0(b) for a, b in enumerate(stecker) if a < b) or '~'
+
+
+# The pool is given the message and crib once, on start, rather than with each stop
+_shared = dict()
+
+
+def _share(cypher, crib, crib_at, ngrams, max_plugs, passes):
+    _shared.update(cypher=cypher, crib=crib, crib_at=crib_at, ngrams=ngrams, max_plugs=max_plugs, passes=passes)
+
+
+def _triage_stop(stop):
+    # Complete, decrypt and score a single stop; a unit of work for the pool
+    cypher, crib, crib_at = _shared['cypher'], _shared['crib'], _shared['crib_at']
+    order, windows, rings, plugs = stop
+    rings = '.'.join(['01'] * len(windows)) if rings is None else rings
+    cfg = EnigmaConfig.config_enigma(order, windows, '', rings)
+    mappings = Engine.for_config(cfg).stepped_mappings(cfg.positions, len(cypher))
+
+    stecker = [None] * 26
+    for pair in filter(None, plugs.split('.')):
+        if _plug(stecker, num_A0(pair[0]), num_A0(pair[-1])) is None:
+            return None
+    links = defaultdict(list)
+    for i, p in enumerate(crib):
+        c = cypher[crib_at + i]
+        links[c].append((mappings[crib_at + i], p))
+        links[p].append((mappings[crib_at + i], c))
+    if not propagate(stecker, links):
+        return None
+
+    fixed = set(x for x in range(26) if stecker[x] is not None)
+    stecker = [x if s is None else s for x, s in enumerate(stecker)]
+    stecker, score = _climb(mappings, cypher, stecker, fixed, _shared['ngrams'], _shared['max_plugs'],
+                            _shared['passes'])
+    plain = _decrypt(mappings, cypher, stecker)
+    matches = sum(1 for i, p in enumerate(crib) if plain[crib_at + i] == p)
+    return Verdict(score, ' '.join([order, windows, _plugs_string(stecker), rings]),
+                   ''.join(chr_A0(i) for i in plain), matches)
+
+
+def triage(stops, cypher, crib='', crib_at=0, ngrams=None, max_plugs=10, passes=2, top=None, processes=None,
+           chunksize=8):
+    """Complete, decrypt and rank a series of candidate stops.
+
+    Args:
+        stops (iterable of Stop): The candidate stops, which may be a (lazy) stream; tuples of the same elements
+            are accepted, and a `rings` of `None` means all **01**.
+        cypher (unicode): The message (see `~.machine.EnigmaConfig.make_message`) from which the stops were found.
+        crib (unicode, optional): Known plain text of part of the message.
+        crib_at (int, optional): The position in the message at which the `crib` begins.
+        ngrams (NGrams, optional): A table used to score decryptions (see `ngram_table`); if `None`, decryptions
+            are scored by their index of coincidence.
+        max_plugs (int, optional): The most plugboard connections allowed when hill-climbing.
+        passes (int, optional): The most passes of the hill-climb.
+        top (int, optional): The number of best verdicts to return; if `None`, all are returned.
+        processes (int, optional): The number of worker processes to use; defaults to the number of CPUs, and
+            if `1` stops are triaged in the calling process.
+        chunksize (int, optional): The number of stops sent to a worker process at a time.
+
+    Returns:
+        list of Verdict: The verdicts for the stops that are consistent with the `crib`, best first: those that
+            reproduce more of the crib, and then those with higher scores.
+
+    """
+    cypher = [num_A0(c) for c in EnigmaConfig.make_message(cypher)]
+    crib = [num_A0(c) for c in EnigmaConfig.make_message(crib)]
+    if crib_at + len(crib) > len(cypher):
+        raise EnigmaValueError('Bad crib - it extends beyond the end of the message')
+    args = (cypher, crib, crib_at, ngrams, max_plugs, passes)
+    if processes == 1:
+        _share(*args)
+        verdicts = [_triage_stop(stop) for stop in stops]
+    else:
+        pool = Pool(processes, initializer=_share, initargs=args)
+        try:
+            verdicts = list(pool.imap_unordered(_triage_stop, stops, chunksize=chunksize))
+        finally:
+            pool.close()
+            pool.join()
+    verdicts = sorted((v for v in verdicts if v is not None), key=lambda v: (-v.matches, -v.score, v.config))
+    return verdicts if top is None else verdicts[:top]
@@ -17,15 +17,60 @@ from __future__ import (absolute_import, print_function, division, unicode_liter
 import time
 import sys
 
-
-# TBD - Generalize to other platforms; test?
-def print_over(s, backup=True, delay=0.2):
-    if backup:
-        print('', end='\r')
-        print("\033[F" * (s.count('\n')+2))
-    print(s)
-    sys.stdout.flush()
-    time.sleep(delay)
+from .exceptions import EnigmaValueError
+
+
+# Animate frames (multi-line strings) in place on a terminal, at no more than a given frame rate, without ever
+# waiting: a frame shown before the next is due replaces any pending one, and is drawn when due (by poll) or on
+# close, so intermediate frames are skipped when they are produced faster than they can be watched; each frame is
+# drawn with a single write and flush, rewriting only the lines that differ from those already displayed; with no
+# frame rate (fps of None), every frame is drawn
+class Animation(object):
+
+    def __init__(self, fps=10, file=None, clock=time.time):
+        self._interval = 0 if fps is None else 1 / fps
+        self._file = file
+        self._clock = clock
+        self._lines = None
+        self._pending = None
+        self._next = None
+
+    # seconds until the next frame is due, for scheduling a call to poll (e.g., from an event loop)
+    def due(self):
+        return 0 if self._next is None else max(0, self._next - self._clock())
+
+    def show(self, frame):
+        self._pending = frame
+        self.poll()
+
+    # draw the pending frame, if there is one and it is due, returning whether it was drawn
+    def poll(self):
+        if self._pending is None or (self._next is not None and self._clock() < self._next):
+            return False
+        self._draw(self._pending)
+        self._pending = None
+        self._next = self._clock() + self._interval
+        return True
+
+    # draw the last frame shown, if it is still pending
+    def close(self):
+        if self._pending is not None:
+            self._draw(self._pending)
+            self._pending = None
+
+    def _draw(self, frame):
+        lines = frame.split('\n')
+        prev = self._lines or []
+        # Return to the start of the previous frame, and rewrite (after clearing) only the lines that changed
+        out = ['\033[{0}F'.format(len(prev))] if prev else []
+        for i, line in enumerate(lines):
+            out.append('\n' if i < len(prev) and prev[i] == line else '\033[2K' + line + '\n')
+        if len(lines) < len(prev):
+            out.append('\033[J')
+        file = sys.stdout if self._file is None else self._file
+        file.write(''.join(out))
+        file.flush()
+        self._lines = lines
 
 
 
@@ -47,6 +92,36 @@ def accumulate(l, f):
 def chunk_of(it, n):
     return [it[i:i+n] for i in range(0, len(it), n)]
 
+
+# the lines of characters in groups of a given size separated by spaces, wrapped (regardless of groups) at a given
+# width, as chunk_of(' '.join(chunk_of(chars, group)), width) would give, but holding only one line at a time;
+# optionally prefixed with the number of the group in which each begins
+def grouped_lines(chars, group=4, width=60, numbered=False):
+    if group < 1:
+        raise EnigmaValueError('Bad group size - {0} is not a positive number of characters'.format(group))
+    line, first = [], 1
+    for n, c in enumerate(chars):
+        for e in ((' ', c) if n and n % group == 0 else (c,)):
+            if not line:
+                first = n // group + 1
+            line.append(e)
+            if len(line) == width:
+                yield ('{0:04d}  '.format(first) if numbered else '') + ''.join(line)
+                line = []
+    if line:
+        yield ('{0:04d}  '.format(first) if numbered else '') + ''.join(line)
+
+
+# write grouped_lines to a file, each followed by a newline; if there are none, a single newline is written (as
+# printing their joined lines would)
+def write_groups(chars, file, group=4, width=60, numbered=False):
+    written = False
+    for line in grouped_lines(chars, group, width, numbered):
+        file.write(line + '\n')
+        written = True
+    if not written:
+        file.write('\n')
+
 from functools import wraps
 # require unicode strings (see unicode_literal in enigma.py)
 #   http://stackoverflow.com/a/33743668/656912
@@ -15,9 +15,16 @@ Description
 from __future__ import (absolute_import, print_function, division, unicode_literals)
 
 import argparse
+import json
+import os
+import socket
 
 from crypto_enigma import __version__
 from crypto_enigma import *
+from crypto_enigma.bench import WORKLOADS, result_string, run as run_bench
+from crypto_enigma.metrics import serve_metrics
+from crypto_enigma.profiling import profile
+from crypto_enigma.service import Client, process_jobs, serve
 
 
 # Decode the Enigma specification string
@@ -42,6 +49,109 @@ def make_args(name, is_opt=False, opt_letter=None):
         return ['--' + name, '-' + (opt_letter if opt_letter is not None else name[0])]
 
 
+# Build a request for an encoding service (see crypto_enigma.service) from command arguments
+def make_request(args):
+    request = dict(op=args.command, config=args.config, format=args.format)
+    if args.command == 'encode':
+        request.update(message=args.message)
+    else:
+        request.update(verbose=args.verbose, showencoding=args.showencoding or args.verbose,
+                       highlight=args.highlight)
+        if args.command == 'show':
+            request.update(letter=args.letter)
+        else:
+            request.update(message=args.message, steps=args.steps, initial=args.initial,
+                           showstep=args.showstep or args.verbose)
+    return request
+
+
+# Carry out a command (other than help), as specified by parsed arguments; commands are forwarded to the service at
+# connect, if given, unless they are run with overwriting, and if fallback they are carried out here if the service
+# cannot be reached
+def run_command(args, connect, fallback=False):
+    if args.command == 'version':
+        print('{0}'.format(__version__))
+
+    elif args.command == 'serve':
+        if args.metrics is not None:
+            serve_metrics(args.metrics)
+        serve(args.socket)
+
+    elif args.command == 'batch':
+        for response in process_jobs(args.jobs, args.processes, not args.unordered):
+            sys.stdout.write(json.dumps(response, sort_keys=True) + '\n')
+
+    elif args.command == 'bench':
+        if args.json:
+            results = run_bench(args.duration, args.workload)
+            print(json.dumps(dict(version=__version__, duration=args.duration,
+                                  results=[r._asdict() for r in results]), indent=2, separators=(',', ': ')))
+        else:
+            baselines = dict()
+
+            def report(result):
+                # Faster engines are compared with the 'config' engine for the same workload
+                baselines.setdefault(result.workload, result)
+                baseline = baselines[result.workload]
+                print(result_string(result, None if baseline is result else baseline))
+                sys.stdout.flush()
+            run_bench(args.duration, args.workload, report)
+
+    elif connect is not None and not (args.command == 'run' and args.overwrite):
+        try:
+            with Client(connect) as client:
+                response = client.request(make_request(args))
+        except socket.error as e:
+            if fallback:
+                # E.g., a socket left behind by a service that is no longer running
+                run_command(args, None)
+                return
+            print('Unable to connect to {0}: {1}'.format(connect, e))
+            sys.exit(1)
+        if not response['ok']:
+            print(response['error'])
+            sys.exit(1)
+        print(response['result'])
+
+    else:
+        uni_arg_err = "Unable to decode '{}' to Unicode; report this error!"
+
+        assert isinstance(args.config, unicode), uni_arg_err.format(_CONFIG_KWARGS['metavar'])
+        cfg = EnigmaConfig.config_enigma_from_string(args.config)
+        fmt = args.format
+
+        if args.command == 'encode':
+            assert isinstance(args.message, unicode), uni_arg_err.format(_ENCODE_MESSAGE_KWARGS['metavar'])
+            msg = args.message
+            if fmt:
+                cfg.print_encoding(msg)
+            else:
+                print(cfg.enigma_encoding(msg))
+        else:
+            sst = args.command == 'run' and (args.showstep or args.verbose)
+            sec = args.showencoding or args.verbose
+            if args.highlight is not None:
+                assert isinstance(args.highlight, unicode), uni_arg_err.format(_HIGHLIGHT_KWARGS['metavar'])
+            mks = (lambda c: args.highlight[0] + c + args.highlight[1]) if args.highlight and len(
+                args.highlight) == 2 else None
+            if args.command == 'show':
+                let = '' if args.letter is None else args.letter
+                assert isinstance(let, unicode), uni_arg_err.format(_LETTER_KWARGS['metavar'])
+                if args.verbose:
+                    print(unicode(cfg) + ':\n')
+                print(cfg.config_string(let, fmt, show_encoding=sec, mark_func=mks))
+            elif args.command == 'run':
+                msg = '' if args.message is None else args.message
+                assert isinstance(msg, unicode), uni_arg_err.format(_RUN_MESSAGE_KWARGS['metavar'])
+                if args.verbose:
+                    print(unicode(cfg) + ':\n')
+                cfg.print_operation(message=msg, steps=args.steps, overwrite=args.overwrite,
+                                    format=args.format, initial=args.initial, delay=0.1 + (0.1 * args.slower),
+                                    show_encoding=sec,
+                                    show_step=sst,
+                                    mark_func=mks)
+
+
 _HELP_ARGS = ['--help', '-h', '-?']
 _HELP_KWARGS = dict(
     action='help',
@@ -115,6 +225,8 @@ Examples:
     $ %(prog)s run "B-I-III-I EMO UX.MO.AY 13.04.11" -m "TESTING" -t -f config -e
     $ %(prog)s run "B-I-III-I EMO UX.MO.AY 13.04.11" -m "TESTING" -t -f internal -e
     $ %(prog)s run "c-β-VIII-VII-VI QMLI UX.MO.AY 01.13.04.11" -s 500 -t -f internal -o
+    $ %(prog)s --profile /tmp/enigma run "B-I-III-I EMO UX.MO.AY 13.04.11" -s 1000 -f internal
+    $ %(prog)s --profile /tmp/enigma --sample 0.005 run "B-I-III-I EMO UX.MO.AY 13.04.11" -s 20000
 
 
 More information about each of these examples is available in the help for the respective
@@ -308,6 +420,76 @@ examples in the help for the '{shw_cmd}' command.)
 """
 _HELP_RUN_CONFIG = 'the machine setup at the start of operation (see below)'
 
+# Serve command help strings
+_HELP_SERVE = 'run a persistent encoding service'
+_DESC_SERVE = """\
+Run a persistent encoding service on a Unix domain socket, which answers
+requests from other invocations given --connect (or ENIGMA_SOCKET) without
+the cost of starting up and warming caches for each.
+"""
+_EXAMPLES_SERVE = """\
+Examples:
+
+  Start a service, and use it to encode a message:
+    $ %(prog)s --socket /tmp/enigma.sock &
+    $ enigma.py --connect /tmp/enigma.sock encode "B-I-III-I EMO UX.MO.AY 13.04.11" "TESTINGXTESTINGUD"
+    OZQKPFLPYZRPYTFVU
+
+  Start a service that also reports metrics, and scrape them:
+    $ %(prog)s --socket /tmp/enigma.sock --metrics 9105 &
+    $ curl -s localhost:9105/metrics | grep enigma_chars_total
+
+"""
+
+# Batch command help strings
+_HELP_BATCH = 'carry out a series of jobs'
+_DESC_BATCH = """\
+Carry out a series of jobs, each a JSON object on a line of its own (as
+used by the serve command), writing the result of each as a line of JSON.
+"""
+_EXAMPLES_BATCH = """\
+Each job is an object with an operation ("op": "encode", "show", or "run"), a
+configuration ("config"), and any of the other arguments of the corresponding
+command (e.g., "message", "letter", "format", "steps"); each result includes
+"ok" and either "result" or "error", and any "id" given in the job.
+
+Examples:
+
+  Encode a series of messages, in parallel:
+    $ cat jobs.ndjson
+    {"op": "encode", "config": "B-I-III-I EMO UX.MO.AY 13.04.11", "message": "TESTINGXTESTINGUD"}
+    {"op": "encode", "config": "B-I-III-I EMO UX.MO.AY 13.04.11", "message": "OZQKPFLPYZRPYTFVU"}
+    $ %(prog)s jobs.ndjson -j 4
+    {"ok": true, "result": "OZQKPFLPYZRPYTFVU"}
+    {"ok": true, "result": "TESTINGXTESTINGUD"}
+
+"""
+
+# Bench command help strings
+_HELP_BENCH = 'measure the throughput of this installation'
+_DESC_BENCH = """\
+Measure the throughput of this installation with a standard mix of workloads:
+encoding messages, stepping a machine, parsing configurations, and rendering
+configurations. Each workload is run for a fixed time with each engine that
+carries it out ('config', which creates a configuration for each step, and
+the faster 'engine', which works from precomputed tables), and the rate at
+which items are processed and the latencies of operations are reported.
+"""
+_EXAMPLES_BENCH = """\
+Each operation processes a fixed number of items: a message of 100 characters,
+100 steps, 8 configurations, or 10 renderings (in the 'internal' format).
+Faster engines are shown with their speed relative to 'config'.
+
+Examples:
+
+  Run all the workloads, for a second each:
+    $ %(prog)s
+
+  Run just the encoding workload, for 5 seconds, and report the results as JSON:
+    $ %(prog)s -w encode -d 5 --json
+
+"""
+
 # Version command help strings
 _HELP_VERSION = 'show the package version and exit'
 _DESC_VERSION = 'Show the package version and exit.'
@@ -397,6 +579,22 @@ if __name__ == '__main__':
                                      add_help=False,
                                      formatter_class=argparse.RawDescriptionHelpFormatter)
     parser.add_argument(*_HELP_ARGS, **_HELP_KWARGS)
+    parser.add_argument('--connect',
+                        action='store', metavar=fmt_arg('path'), default=None,
+                        type=unicode_literal,
+                        help='forward commands (other than overwriting runs) to the encoding service at the socket '
+                             'PATH; defaults to the socket given by the environment variable ENIGMA_SOCKET, '
+                             'if it exists and a service is running there (see the serve command)')
+    parser.add_argument('--profile',
+                        action='store', metavar=fmt_arg('out'), default=None,
+                        type=unicode_literal,
+                        help='profile the command, writing statistics to OUT.pstats and collapsed stacks (for flame '
+                             'graphs) to OUT.collapsed')
+    parser.add_argument('--sample',
+                        action='store', metavar=fmt_arg('seconds'), default=None,
+                        type=float,
+                        help='with --profile, sample the stack every SECONDS (e.g., 0.005) of processor time, '
+                             'rather than profiling every call; only OUT.collapsed, counting samples, is written')
 
     commands = parser.add_subparsers(help='', dest='command',
                                      # title='required arguments',
@@ -452,11 +650,12 @@ if __name__ == '__main__':
                                      help="don't show the initial starting step")
     run_operation_group.add_argument('--overwrite', '-o',
                                      action='store_true',
-                                     help='overwrite each step after a pause '
+                                     help='overwrite each step with the next, showing at most 10 steps a second '
+                                          'and skipping any in between '
                                           '(may result in garbled output on some systems)')
     run_operation_group.add_argument('--slower', '-S',
                                      action='count', default=0,
-                                     help='slow down overwriting; '
+                                     help='slow down overwriting, by lowering the rate at which steps are shown; '
                                           'repeat for more slowing (only has effect with --overwrite)')
     run_operation_group.add_argument('--showstep', '-t', action='store_true',
                                      help='show the step number')
@@ -467,6 +666,57 @@ if __name__ == '__main__':
                                           'will default to the length of the message; otherwise defaults to 1')
     run_parser.add_argument(*_HELP_ARGS, **_HELP_KWARGS)
 
+    # Run an encoding service
+    serve_parser = commands.add_parser('serve', parents=[parent_parser], add_help=False,
+                                       description=_DESC_SERVE, epilog=_EXAMPLES_SERVE, help=_HELP_SERVE,
+                                       formatter_class=argparse.RawDescriptionHelpFormatter)
+    serve_parser.add_argument('--socket',
+                              action='store', metavar=fmt_arg('path'), required=True,
+                              type=unicode_literal,
+                              help='the path of the Unix domain socket on which to serve requests')
+    serve_parser.add_argument('--metrics',
+                              action='store', metavar=fmt_arg('port'), default=None,
+                              type=int,
+                              help='also serve metrics, in the Prometheus text format, over HTTP at /metrics on '
+                                   'PORT of the local host')
+    serve_parser.add_argument(*_HELP_ARGS, **_HELP_KWARGS)
+
+    # Carry out a series of jobs
+    batch_parser = commands.add_parser('batch', parents=[parent_parser], add_help=False,
+                                       description=_DESC_BATCH, epilog=_EXAMPLES_BATCH, help=_HELP_BATCH,
+                                       formatter_class=argparse.RawDescriptionHelpFormatter)
+    batch_parser.add_argument('jobs',
+                              action='store', metavar=fmt_arg('file'), nargs='?', default='-',
+                              type=argparse.FileType('rb'),
+                              help='a file of jobs, one per line; defaults to standard input')
+    batch_parser.add_argument('--jobs', '-j',
+                              action='store', metavar='N', default=1, dest='processes',
+                              type=int,
+                              help='the number of worker processes to use; defaults to 1')
+    batch_parser.add_argument('--unordered', '-u',
+                              action='store_true',
+                              help='write results as they are completed, each with the number of the line '
+                                   'containing its job, rather than in the order of the jobs')
+    batch_parser.add_argument(*_HELP_ARGS, **_HELP_KWARGS)
+
+    # Measure throughput
+    bench_parser = commands.add_parser('bench', parents=[parent_parser], add_help=False,
+                                       description=_DESC_BENCH, epilog=_EXAMPLES_BENCH, help=_HELP_BENCH,
+                                       formatter_class=argparse.RawDescriptionHelpFormatter)
+    bench_parser.add_argument('--duration', '-d',
+                              action='store', metavar=fmt_arg('seconds'), default=1.0,
+                              type=float,
+                              help='the time for which to run each workload with each engine; defaults to 1')
+    bench_parser.add_argument('--workload', '-w',
+                              action='append', metavar=fmt_arg('workload'), default=None,
+                              choices=[w[0] for w in WORKLOADS],
+                              help='a workload to run ({0}); may be repeated; defaults to all'.format(
+                                  ', '.join(w[0] for w in WORKLOADS)))
+    bench_parser.add_argument('--json',
+                              action='store_true',
+                              help='report the results as JSON')
+    bench_parser.add_argument(*_HELP_ARGS, **_HELP_KWARGS)
+
     # Just show the package version
     version_parser = commands.add_parser('version', add_help=False,
                                          description=_DESC_VERSION + '.', help=_HELP_VERSION)
@@ -482,48 +732,19 @@ if __name__ == '__main__':
     # else:
 
     args = parser.parse_args()
+    if args.sample is not None and args.profile is None:
+        parser.error('argument --sample: requires --profile')
 
-    try:
-        if args.command == 'version':
-            print('{0}'.format(__version__))
+    # A service given by the environment is used only if it can be reached; one given explicitly must be
+    connect, fallback = args.connect, False
+    if connect is None and os.path.exists(os.environ.get('ENIGMA_SOCKET', '')):
+        connect, fallback = unicode_literal(os.environ['ENIGMA_SOCKET']), True
 
+    try:
+        if args.profile is None:
+            run_command(args, connect, fallback)
         else:
-            uni_arg_err = "Unable to decode '{}' to Unicode; report this error!"
-
-            assert isinstance(args.config, unicode), uni_arg_err.format(_CONFIG_KWARGS['metavar'])
-            cfg = EnigmaConfig.config_enigma_from_string(args.config)
-            fmt = args.format
-
-            if args.command == 'encode':
-                assert isinstance(args.message, unicode), uni_arg_err.format(_ENCODE_MESSAGE_KWARGS['metavar'])
-                msg = args.message
-                if fmt:
-                    cfg.print_encoding(msg)
-                else:
-                    print(cfg.enigma_encoding(msg))
-            else:
-                sst = args.command == 'run' and (args.showstep or args.verbose)
-                sec = args.showencoding or args.verbose
-                if args.highlight is not None:
-                    assert isinstance(args.highlight, unicode), uni_arg_err.format(_HIGHLIGHT_KWARGS['metavar'])
-                mks = (lambda c: args.highlight[0] + c + args.highlight[1]) if args.highlight and len(
-                    args.highlight) == 2 else None
-                if args.command == 'show':
-                    let = '' if args.letter is None else args.letter
-                    assert isinstance(let, unicode), uni_arg_err.format(_LETTER_KWARGS['metavar'])
-                    if args.verbose:
-                        print(unicode(cfg) + ':\n')
-                    print(cfg.config_string(let, fmt, show_encoding=sec, mark_func=mks))
-                elif args.command == 'run':
-                    msg = '' if args.message is None else args.message
-                    assert isinstance(msg, unicode), uni_arg_err.format(_RUN_MESSAGE_KWARGS['metavar'])
-                    if args.verbose:
-                        print(unicode(cfg) + ':\n')
-                    cfg.print_operation(message=msg, steps=args.steps, overwrite=args.overwrite,
-                                        format=args.format, initial=args.initial, delay=0.1 + (0.1 * args.slower),
-                                        show_encoding=sec,
-                                        show_step=sst,
-                                        mark_func=mks)
+            profile(lambda: run_command(args, connect, fallback), args.profile, args.sample)
     except KeyboardInterrupt as e:
         # REV - Restore interrupt message and ask for trace?
         # if 'y' in raw_input('\rInterrupted by user; print stack trace? ').lower():
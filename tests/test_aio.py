@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+# encoding: utf8
+from __future__ import (absolute_import, print_function, division, unicode_literals)
+
+''' Simple test file for debugging and testing at the shell. To use simply
+        python test.py
+    or
+        ./test.py
+    or run 'test' in PyCharm.
+'''
+
+import threading
+import time
+
+import pytest
+
+from crypto_enigma.aio import *
+
+
+# Tests of the batching encoder, checked against enigma_encoding
+
+_SPECS = ['B-I-III-I EMO UX.MO.AY 13.04.11', 'c-β-VIII-VII-VI QMLI UX.MO.AY 01.13.04.11']
+_MESSAGES = ['TESTINGXTESTINGUD', 'FOLGENDES IST SOFORT BEKANNTZUGEBEN', '']
+
+
+def test_encode_batch():
+    jobs = [(s, m) for s in _SPECS for m in _MESSAGES]
+    assert encode_batch(jobs) == [(True, EnigmaConfig.config_enigma_from_string(s).enigma_encoding(
+        EnigmaConfig.make_message(m))) for s, m in jobs]
+
+
+@pytest.mark.parametrize('executor', ['thread', 'process'])
+def test_async_encoder(executor):
+    jobs = [(s, m) for s in _SPECS for m in _MESSAGES] * 50
+    expected = [r for _, r in encode_batch(jobs)]
+    with AsyncEncoder(max_batch=8, executor=executor, workers=2) as encoder:
+        futures = [encoder.submit(s, m) for s, m in jobs]
+        assert [f.result(10) for f in futures] == expected
+        # Callbacks are called on completion, or immediately if already complete
+        done = threading.Event()
+        encoder.submit(_SPECS[0], 'TESTING').add_done_callback(lambda f: done.set())
+        assert done.wait(10)
+        seen = []
+        futures[0].add_done_callback(seen.append)
+        assert seen == [futures[0]]
+        with pytest.raises(EnigmaValueError):
+            encoder.encode('B-I-III-I EMO UX.MO.AY', 'TESTING')
+    with pytest.raises(EnigmaError):
+        encoder.submit(_SPECS[0], 'TESTING')
+
+
+def test_backpressure():
+    encoder = AsyncEncoder(max_batch=1, max_pending=1, max_batches=1)
+    # Occupy the only batch slot, so that the dispatcher holds the first request, and the queue just the second
+    encoder._batches.acquire()
+    try:
+        first = encoder.submit(_SPECS[0], 'TESTING')
+        second = encoder.submit(_SPECS[0], 'TESTING')
+        with pytest.raises(EnigmaError):
+            encoder.submit(_SPECS[0], 'TESTING', block=False)
+        assert not first.done()
+    finally:
+        encoder._batches.release()
+        encoder.close()
+    assert first.result() == second.result() == 'OZQKPFL'
+
+
+def test_close_while_full():
+    encoder = AsyncEncoder(max_batch=1, max_pending=1, max_batches=1)
+    encoder._batches.acquire()
+    first = encoder.submit(_SPECS[0], 'TESTING')
+    second = encoder.submit(_SPECS[0], 'TESTING')
+    # A request waiting for room when the encoder is closed fails, rather than being queued after it closes
+    errors = []
+
+    def submit():
+        try:
+            encoder.submit(_SPECS[0], 'TESTING')
+        except EnigmaError as e:
+            errors.append(e)
+    waiting = threading.Thread(target=submit)
+    waiting.start()
+    time.sleep(0.05)
+    closing = threading.Thread(target=encoder.close)
+    closing.start()
+    time.sleep(0.05)
+    encoder._batches.release()
+    closing.join(10)
+    waiting.join(10)
+    assert not closing.is_alive() and not waiting.is_alive()
+    assert first.result(10) == second.result(10) == 'OZQKPFL'
+    assert [unicode(e) for e in errors] == ['Encoder is closed']
@@ -0,0 +1,53 @@
+#!/usr/bin/env python
+# encoding: utf8
+from __future__ import (absolute_import, print_function, division, unicode_literals)
+
+''' Simple test file for debugging and testing at the shell. To use simply
+        python test.py
+    or
+        ./test.py
+    or run 'test' in PyCharm.
+'''
+
+import random
+
+from crypto_enigma.banburismus import *
+
+
+# Tests of offset scoring for a pair of messages known to be in depth
+
+_WORDS = ['AN', 'OBERKOMMANDO', 'DER', 'WEHRMACHT', 'FOLGENDES', 'IST', 'SOFORT', 'BEKANNTZUGEBEN', 'ICH', 'HABE',
+          'BEFEHL', 'ERHALTEN', 'STOP', 'FUEHRER', 'HAUPTQUARTIER', 'MELDUNG', 'KRKR']
+
+
+def _plain(seed):
+    rnd = random.Random(seed)
+    return 'X'.join(rnd.choice(_WORDS) for _ in range(40))
+
+
+def test_score_offset():
+    al = score_offset('XXHELLOTHERE', 'HELLOWORLD', 2)
+    assert (al.overlap, al.repeats, al.bigrams, al.trigrams) == (10, 5, 4, 3)
+    assert score_offset('HELLOWORLD', 'XXHELLOTHERE', -2)[3:] == al[3:]
+    wts = weights()
+    assert wts.repeat > 0 > wts.miss
+    assert abs(al.score - (5 * wts.repeat + 5 * wts.miss + 4 * wts.bigram + 3 * wts.trigram)) < 1e-9
+
+
+def test_score_messages():
+    # The later message starts 7 positions further on the fast rotor
+    earlier = EnigmaConfig.config_enigma('B-I-II-III', 'ABC', 'UX.MO.AY', '01.01.01')
+    later = EnigmaConfig.config_enigma('B-I-II-III', 'ABJ', 'UX.MO.AY', '01.01.01')
+    other = EnigmaConfig.config_enigma('B-I-II-III', 'QRS', 'UX.MO.AY', '01.01.01')
+    messages = [earlier.enigma_encoding(_plain(1)), other.enigma_encoding(_plain(2)), later.enigma_encoding(_plain(3))]
+    best = score_messages(messages, processes=1)[0]
+    assert (best.a, best.b, best.offset) == (0, 2, 7)
+    assert score_messages(messages, processes=2)[:5] == score_messages(messages, processes=1)[:5]
+    assert ranked_differences([best])[0][:3] == (0, 2, 7)
+    assert ranked_differences([best], earlier)[0][:3] == (0, 2, 7)
+    assert ranked_differences([best], EnigmaConfig.config_enigma('B-I-II-III', 'ABT', '', '01.01.01')) == []
+
+
+def test_offset_feasible():
+    cfg = EnigmaConfig.config_enigma('B-I-II-III', 'ABK', '', '01.01.01')
+    assert [offset_feasible(cfg, d) for d in (0, 11, 12)] == [True, True, False]
@@ -0,0 +1,72 @@
+#!/usr/bin/env python
+# encoding: utf8
+from __future__ import (absolute_import, print_function, division, unicode_literals)
+
+''' Simple test file for debugging and testing at the shell. To use simply
+        python test.py
+    or
+        ./test.py
+    or run 'test' in PyCharm.
+'''
+
+import pytest
+
+from crypto_enigma import bench
+from crypto_enigma.bench import *
+from crypto_enigma.exceptions import *
+
+
+# Tests of throughput measurement
+
+class _Sink(object):
+
+    def __init__(self):
+        self.text = []
+
+    def write(self, text):
+        self.text.append(text)
+
+    def flush(self):
+        pass
+
+
+def test_engines_agree(monkeypatch):
+    # Each engine of a workload does the same work
+    sink = _Sink()
+    monkeypatch.setattr(bench, '_NullSink', lambda: sink)
+    for name, _, size, engines in WORKLOADS:
+        outputs = [setup()() for _, setup in engines]
+        if name == 'encode':
+            # The encoded message, and the length of the message encoded into a buffer
+            outputs = [len(outputs[0]), outputs[1]]
+            assert outputs[0] == size
+        elif name == 'step':
+            # Stepping includes the starting configuration
+            outputs = [[c.positions for c in outputs[0]], outputs[1]]
+            assert len(outputs[0]) == size + 1
+        elif name == 'render':
+            # What print_operation writes, rather than to nowhere
+            outputs = [outputs[0], ''.join(sink.text).rstrip('\n').split('\n\n')]
+            assert len(outputs[0]) == size
+        assert all(output == outputs[0] for output in outputs)
+
+
+def test_run():
+    reported = []
+    results = run(0.02, report=reported.append)
+    assert results == reported
+    assert [(r.workload, r.engine) for r in results] == [(name, engine) for name, _, _, engines in WORKLOADS
+                                                         for engine, _ in engines]
+    for r in results:
+        assert r.operations >= 1 and r.seconds > 0
+        assert r.rate == pytest.approx(r.operations * r.size / r.seconds)
+        assert 0 < r.p50 <= r.p90 <= r.p99
+    line = result_string(results[1], results[0])
+    assert line.startswith('encode   engine') and 'chars/s' in line and line.endswith('x')
+
+
+def test_run_errors():
+    with pytest.raises(EnigmaValueError):
+        run(0.01, ['encrypt'])
+    with pytest.raises(EnigmaValueError):
+        run(0)
@@ -0,0 +1,81 @@
+#!/usr/bin/env python
+# encoding: utf8
+from __future__ import (absolute_import, print_function, division, unicode_literals)
+
+''' Simple test file for debugging and testing at the shell. To use simply
+        python test.py
+    or
+        ./test.py
+    or run 'test' in PyCharm.
+'''
+
+import pytest
+
+from crypto_enigma.catalog import *
+
+
+# Tests of the characteristic catalog, checked against EnigmaConfig
+
+def test_characteristic():
+    for spec in ['B-I-II-III ABC UX.MO.AY 01.01.01', 'B-I-II-III ADU ~ 01.01.01', 'C-V-I-VI ZQM AB.CD 05.02.11']:
+        cfg = EnigmaConfig.config_enigma_from_string(spec)
+        assert characteristic(cfg) == tuple(cycle_lengths(p) for p in product_permutations(cfg))
+        assert all(sum(lengths) == 26 for lengths in characteristic(cfg))
+    assert cycle_lengths([1, 2, 0, 4, 3, 5]) == (3, 2, 1)
+
+
+@pytest.fixture(scope='module')
+def cat():
+    return build_catalog(orders=['B-I-II-III'], processes=1)
+
+
+def test_catalog(cat, tmpdir):
+    assert len(cat) == 26 ** 3
+    cfg = EnigmaConfig.config_enigma_from_string('B-I-II-III ABC UX.MO.AY 01.01.01')
+    chr_ = characteristic(cfg)
+    assert ('B-I-II-III', 'ABC') in cat.lookup(chr_)
+    assert all(characteristic(c) == chr_ for c in cat.configs(chr_))
+    assert cat.lookup(((26,), (26,), (26,))) == []
+
+    path = unicode(tmpdir.join('catalog.json'))
+    cat.save(path)
+    loaded = Catalog.load(path)
+    assert len(loaded) == len(cat)
+    assert loaded.lookup(chr_) == cat.lookup(chr_)
+
+
+def test_indicators(cat):
+    cfg = EnigmaConfig.config_enigma_from_string('B-I-II-III ABC UX.MO.AY 01.01.01')
+    keys = ['{0}{1}{2}'.format(a, b, c) for a, b, c in zip(LETTERS, LETTERS[7:] + LETTERS[:7], LETTERS[::-1])]
+    lines = [' '.join(cfg.enigma_encoding(k + k) for k in keys[i:i + 4]) for i in range(0, 26, 4)]
+    ind = Indicators()
+    assert not ind.complete and ind.characteristic() is None
+    assert ind.update(lines)
+    assert ind.permutations() == product_permutations(cfg)
+    assert ind.characteristic() == characteristic(cfg)
+    assert cfg in list(ind.configs(cat, plugs='UX.MO.AY'))
+
+    ind = Indicators()
+    enc = cfg.enigma_encoding('AAAAAA')
+    ind.add(enc)
+    assert not ind.complete
+    assert ind.permutations()[0].count(' ') == 25
+    with pytest.raises(EnigmaValueError):
+        ind.add(enc[:3] + ('A' if enc[3] != 'A' else 'B') + enc[4:])
+    with pytest.raises(EnigmaValueError):
+        ind.add('ABCDE')
+    with pytest.raises(EnigmaValueError):
+        list(ind.configs(cat))
+
+
+def test_indicators_rejected():
+    # An indicator rejected for its last pair leaves none of its earlier pairs recorded
+    ind = Indicators()
+    ind.add('ABCDEF')
+    before = ind.permutations(), ind.characteristic(), ind.count
+    with pytest.raises(EnigmaValueError):
+        ind.add('GHCJKX')
+    assert (ind.permutations(), ind.characteristic(), ind.count) == before
+    assert ind._known == [1, 1, 1]
+    ind.add('GHIJKL')
+    assert ind._known == [2, 2, 2]
@@ -9,8 +9,12 @@ from __future__ import (absolute_import, print_function, division, unicode_liter
     or run 'test' in PyCharm.
 '''
 
+from collections import defaultdict
+from itertools import product
+
 import pytest
 
+from crypto_enigma.engine import *
 from crypto_enigma.machine import *
 from crypto_enigma.exceptions import *
 
@@ -53,6 +57,44 @@ def test_config_stepping():
     assert [cfg.components == cfg.components for ec in cfg.stepped_configs(99)]
 
 
+def test_stepped_positions():
+    for spec in ['B-III-VI-VII EZU ~ 14.22.11', 'c-β-VIII-VII-VI UYZO UX.MO.AY 01.13.04.11',
+                 'b-γ-V-VIII-II LEZO UX.MO.KZ.AY.EF.PL 03.17.04.11', 'B-I-II-III ADQ ~ 01.01.01']:
+        cfg = EnigmaConfig.config_enigma_from_string(spec)
+        configs = list(cfg.stepped_configs(700))
+        assert list(cfg.stepped_positions(700)) == [c.positions for c in configs]
+        assert list(cfg.stepped_positions(700, start=650)) == [c.positions for c in configs[650:]]
+        assert list(cfg.windows_for(cfg.stepped_positions(700))) == [c.windows() for c in configs]
+        packed = list(cfg.stepped_positions(700, packed=True))
+        assert list(cfg.windows_for(packed)) == [c.windows() for c in configs]
+        assert [cfg.unpack_positions(p) for p in packed] == [c.positions for c in configs]
+        assert len(set(packed)) == len(set(c.positions for c in configs))
+
+
+def test_step_back():
+    # Predecessors found in closed form agree with a search of every position
+    for spec in ['B-I-II-III AAA ~ 01.01.01', 'c-β-VIII-VII-VI AUYZ ~ 01.13.04.11']:
+        cfg = EnigmaConfig.config_enigma_from_string(spec)
+        eng = Engine.for_config(cfg)
+        first, last = cfg.positions[:1], cfg.positions[4:]
+        preds = defaultdict(list)
+        for p1, p2, p3 in product(range(1, 27), repeat=3):
+            positions = first + (p1, p2, p3) + last
+            preds[eng.step(positions)].append(positions)
+        for p1, p2, p3 in product(range(1, 27), repeat=3):
+            positions = first + (p1, p2, p3) + last
+            assert sorted(eng.predecessors(positions)) == sorted(preds[positions])
+    cfg = EnigmaConfig.config_enigma_from_string('b-γ-V-VIII-II LEZO UX.MO.KZ.AY.EF.PL 03.17.04.11')
+    configs = list(cfg.stepped_configs(700))
+    assert all(c in c.step().predecessors() for c in configs)
+    configs = list(EnigmaConfig.config_enigma_from_string('B-I-II-III ABA ~ 01.01.01').stepped_configs(40))
+    assert list(configs[-1].stepped_configs(40, reverse=True)) == configs[::-1]
+    with pytest.raises(EnigmaSteppingError):
+        EnigmaConfig.config_enigma_from_string('B-I-II-III CFA ~ 01.01.01').step_back()
+    with pytest.raises(EnigmaSteppingError):
+        EnigmaConfig.config_enigma_from_string('B-I-II-III AEA ~ 01.01.01').step_back()
+
+
 def test_config_mapping():
     # EnigmaConfig mappings
     cfg = EnigmaConfig.config_enigma('b-γ-V-VIII-II', 'LFAQ', '', '03.17.04.11')
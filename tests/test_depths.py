@@ -0,0 +1,54 @@
+#!/usr/bin/env python
+# encoding: utf8
+from __future__ import (absolute_import, print_function, division, unicode_literals)
+
+''' Simple test file for debugging and testing at the shell. To use simply
+        python test.py
+    or
+        ./test.py
+    or run 'test' in PyCharm.
+'''
+
+import random
+
+from crypto_enigma.depths import *
+
+
+# Tests of depth detection on a synthetic corpus with a known depth
+
+_WORDS = ['AN', 'OBERKOMMANDO', 'DER', 'WEHRMACHT', 'FOLGENDES', 'IST', 'SOFORT', 'BEKANNTZUGEBEN', 'ICH', 'HABE',
+          'BEFEHL', 'ERHALTEN', 'STOP', 'FUEHRER', 'HAUPTQUARTIER', 'MELDUNG', 'KRKR']
+
+
+def _corpus(size, depth_every):
+    rnd = random.Random(1)
+    messages, states = [], []
+    for i in range(size):
+        windows = 'ABC' if i % depth_every == 0 else ''.join(rnd.choice(LETTERS) for _ in range(3))
+        cfg = EnigmaConfig.config_enigma('B-I-II-III', windows, 'UX.MO.AY', '01.01.01')
+        plain = 'ANXOBERKOMMANDOX' + 'X'.join(rnd.choice(_WORDS) for _ in range(20))
+        messages.append(cfg.enigma_encoding(plain))
+        # Messages are encoded starting with the stepped configuration, which can be shared by distinct keys
+        states.append(cfg.step().positions)
+    return messages, states
+
+
+def test_coincidences():
+    assert coincidences('ABCDEF', 'AXCYEZZZ') == (3, 6)
+    assert coincidences('', 'ABC') == (0, 0)
+
+
+def test_find_depths():
+    messages, states = _corpus(150, 30)
+    depths = find_depths(messages)
+    assert any(set(range(0, 150, 30)) <= set(d.messages) for d in depths)
+    assert all(len(set(states[m] for m in d.messages)) == 1 for d in depths)
+    assert all(d.score >= 0.06 for d in depths)
+    # Candidates sharing an opening find the same depth, with the same scores
+    candidates = find_depths(messages, exhaustive=False)
+    assert any(set(range(0, 150, 30)) <= set(d.messages) for d in candidates)
+    scores = dict(((a, b), k) for d in depths for a, b, k in d.pairs)
+    assert all(scores[a, b] == k for d in candidates for a, b, k in d.pairs)
+    # Formatting is ignored
+    grouped = [' '.join(m[i:i + 4] for i in range(0, len(m), 4)) for m in messages]
+    assert find_depths(grouped) == find_depths(messages)
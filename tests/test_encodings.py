@@ -9,6 +9,8 @@ from __future__ import (absolute_import, print_function, division, unicode_liter
     or run 'test' in PyCharm.
 '''
 
+import pytest
+
 from crypto_enigma.machine import *
 
 
@@ -55,3 +57,22 @@ def test_config_encoding_historical():
     msg = 'KRKR ALLE XX FOLGENDES IST SOFORT BEKANNTZUGEBEN XX ICH HABE FOLGELNBE BEFEHL ERHALTEN XX J ANSTERLE DES BISHERIGXN REICHSMARSCHALLS J GOERING J SETZT DER FUEHRER SIE Y HVRR GRZSSADMIRAL Y ALS SEINEN NACHFOLGER EIN X SCHRIFTLSCHE VOLLMACHT UNTERWEGS X ABSOFORT SOLLEN SIE SAEMTLICHE MASSNAHMEN VERFUEGEN Y DIE SICH AUS DER GEGENWAERTIGEN LAGE ERGEBEN X GEZ X REICHSLEITEI KK TULPE KK J BORMANN J XX OB.D.MMM DURNH FKST.KOM.ADM.UUU BOOIE.KP'
     assert cfg.enigma_encoding(msg) == enc
     assert cfg.enigma_encoding(cfg.enigma_encoding(msg)) == EnigmaConfig.make_message(msg)
+
+
+def test_encoding_bytes():
+    # Bytes encoding agrees with unicode encoding, and reuses the caller's buffer
+    buf = bytearray(100)
+    for spec in ['b-γ-V-VIII-II LFAQ ~ 03.17.04.11', 'c-γ-V-VIII-III MFIQ ML.IO.QW.AG.DS.ZR 13.19.02.16',
+                 'B-I-II-III ADU UX.MO.AY 01.01.01']:
+        cfg = EnigmaConfig.config_enigma_from_string(spec)
+        for message in ['ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'aBCD Ef& GHI<K LMN, 12 TUV|W!YZA?', '  ', '']:
+            expected = cfg.enigma_encoding(message).encode('ascii')
+            data = message.encode('ascii')
+            assert cfg.enigma_encoding_bytes(data) == expected
+            assert cfg.enigma_encoding_bytes(bytearray(data)) == expected
+            assert cfg.enigma_encoding_bytes(memoryview(data)) == expected
+            n = cfg.encode_into(data, buf)
+            assert n == len(expected) and bytes(buf[:n]) == expected
+    assert EnigmaConfig.make_message_bytes(b'caf\xe9, 1') == bytearray(b'CAFYYQ')
+    with pytest.raises(EnigmaValueError):
+        cfg.encode_into(b'TESTING', bytearray(6))
@@ -0,0 +1,72 @@
+#!/usr/bin/env python
+# encoding: utf8
+from __future__ import (absolute_import, print_function, division, unicode_literals)
+
+''' Simple test file for debugging and testing at the shell. To use simply
+        python test.py
+    or
+        ./test.py
+    or run 'test' in PyCharm.
+'''
+
+import pytest
+
+from crypto_enigma.engine import *
+from crypto_enigma.machine import *
+
+
+# Tests of the table-driven engine, checked against EnigmaConfig
+
+def test_engine_agrees():
+    for spec in ['B-I-II-III ADU UX.MO.AY 01.01.01', 'c-β-VIII-VII-VI QMLZ UX.MO.AY 01.13.04.11',
+                 'b-γ-V-VIII-II LEZO UX.MO.KZ.AY.EF.PL 03.17.04.11', 'B-III-VI-VII EZU ~ 14.22.11']:
+        cfg = EnigmaConfig.config_enigma_from_string(spec)
+        eng = Engine.for_config(cfg)
+        positions = cfg.positions
+        message = [num_A0(c) for c in 'THEQUICKBROWNFOXJUMPEDOVERTHELAZYDOG' * 20]
+        assert ''.join(chr_A0(i) for i in eng.encode(positions, message)) == cfg.enigma_encoding(
+            ''.join(chr_A0(i) for i in message))
+        assert eng.stepped_mappings(positions, 3) == [eng.mapping(c.positions) for c in cfg.stepped_configs(3)][1:]
+        for c in cfg.stepped_configs(700):
+            assert c.positions == positions
+            assert [mapping_string(t) for t in eng.stage_tables(positions)] == c.stage_mapping_list()
+            assert mapping_string(eng.mapping(positions)) == c.enigma_mapping()
+            positions = eng.step(positions)
+
+
+def test_trace():
+    for spec in ['B-I-II-III ADU UX.MO.AY 01.01.01', 'c-β-VIII-VII-VI QMLZ UX.MO.AY 01.13.04.11']:
+        cfg = EnigmaConfig.config_enigma_from_string(spec)
+        message = 'THEQUICKBROWNFOXJUMPEDOVERTHELAZYDOG' * 3
+        trace = cfg.trace_encoding(message)
+        assert len(trace) == len(message)
+        assert ''.join(chr_A0(trace[k].path[-1]) for k in range(len(trace))) == cfg.enigma_encoding(message)
+        for k, (c, letter) in enumerate(zip(list(cfg.stepped_configs(len(message)))[1:], message)):
+            assert trace[k].positions == c.positions
+            assert trace[k].path[0] == num_A0(letter)
+            for stage, i, o in trace.stages(k):
+                assert chr_A0(o) == c.stage_mapping_list()[stage].encode_char(chr_A0(i))
+    with pytest.raises(IndexError):
+        trace[len(message)]
+
+
+def test_turnover_calendar():
+    for spec in ['B-I-II-III ADU ~ 01.01.01', 'B-I-II-III AEA ~ 01.01.01', 'B-VI-VII-VIII AMA ~ 01.01.01',
+                 'B-I-VI-III AZA ~ 01.01.01', 'c-β-VIII-VII-VI QMLZ UX.MO.AY 01.13.04.11', 'C-V-I-VI ZQM ~ 05.02.11']:
+        cfg = EnigmaConfig.config_enigma_from_string(spec)
+        eng = Engine.for_config(cfg)
+        cal = turnover_calendar(cfg, 2000)
+        positions, middle, left, seen = cfg.positions, [], [], dict()
+        for k in range(1, 2001):
+            stepped = eng.step(positions)
+            if stepped[2] != positions[2]:
+                middle.append(k)
+            if stepped[3] != positions[3]:
+                left.append(k)
+            positions = stepped
+        assert (cal.middle, cal.left) == (middle, left)
+        positions, k = cfg.positions, 0
+        while positions not in seen:
+            seen[positions] = k
+            positions, k = eng.step(positions), k + 1
+        assert (cal.period, cal.transient) == (k - seen[positions], seen[positions])
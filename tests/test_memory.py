@@ -0,0 +1,77 @@
+#!/usr/bin/env python
+# encoding: utf8
+from __future__ import (absolute_import, print_function, division, unicode_literals)
+
+''' Simple test file for debugging and testing at the shell. To use simply
+        python test.py
+    or
+        ./test.py
+    or run 'test' in PyCharm.
+'''
+
+import gc
+import weakref
+
+from crypto_enigma import stats
+from crypto_enigma.machine import *
+
+
+# Tests that long-running workloads do not retain memory beyond the (bounded) caches
+
+_SPEC = 'B-I-III-I EMO UX.MO.AY 13.04.11'
+_LETTERS = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+
+
+def _objects():
+    gc.collect()
+    return len(gc.get_objects())
+
+
+def _config_caches():
+    info = stats.cache_info()
+    return [info['EnigmaConfig.stage_mapping_list'], info['EnigmaConfig.enigma_mapping_list']]
+
+
+def test_encoding_retains_nothing():
+    cfg = EnigmaConfig.config_enigma_from_string(_SPEC)
+    stats.clear_caches()
+    before = _objects()
+    cfg.enigma_encoding('A' * 2000)
+    # Only the starting configuration remains in the caches for configurations
+    assert all(info.size <= 1 for info in _config_caches())
+    assert stats.cache_info()['engine.component_tables'].size <= 1024
+    stats.clear_caches()
+    assert _objects() - before < 50
+
+
+def test_stepped_configs_released():
+    cfg = EnigmaConfig.config_enigma_from_string(_SPEC)
+    stats.clear_caches()
+    stats.reset()
+    configs = cfg.stepped_configs(5000)
+    next(configs)  # The starting configuration itself
+    first = weakref.ref(next(configs))
+    first().enigma_mapping()
+    for c in configs:
+        c.enigma_mapping()
+    # Mappings are cached only for as long as their configurations are in use
+    del c
+    gc.collect()
+    assert first() is None
+    assert all(info.size == 0 for info in _config_caches())
+    assert stats.cache_info()['EnigmaConfig.enigma_mapping_list'].misses == 5000
+
+
+def test_plugboards_released():
+    stats.clear_caches()
+    before = _objects()
+    for n in range(2000):
+        # Distinct (and disjoint) pairs, each of a letter from the first half of the alphabet and one from the second
+        x, y, z = n % 13, n // 13 % 13, n // 169 % 13
+        plugs = '{0}{1}.{2}{3}'.format(_LETTERS[x], _LETTERS[13 + y],
+                                       _LETTERS[(x + 1 + z % 12) % 13], _LETTERS[13 + (y + 1) % 13])
+        EnigmaConfig.config_enigma('B-I-II-III', 'AAA', plugs, '01.01.01').enigma_encoding('ABC')
+    assert stats.cache_info()['plugboards'].size > 0
+    stats.clear_caches()
+    assert stats.cache_info()['plugboards'].size == 0
+    assert _objects() - before < 50
@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+# encoding: utf8
+from __future__ import (absolute_import, print_function, division, unicode_literals)
+
+''' Simple test file for debugging and testing at the shell. To use simply
+        python test.py
+    or
+        ./test.py
+    or run 'test' in PyCharm.
+'''
+
+import urllib2
+
+from crypto_enigma import metrics, stats
+from crypto_enigma.aio import AsyncEncoder
+from crypto_enigma.machine import *
+from crypto_enigma.service import handle_request
+
+
+# Tests of metrics collection and exposition
+
+_SPEC = 'B-I-III-I EMO UX.MO.AY 13.04.11'
+
+
+def _samples(text):
+    return dict(line.rsplit(' ', 1) for line in text.splitlines() if not line.startswith('#'))
+
+
+def test_registry():
+    cfg = EnigmaConfig.config_enigma_from_string(_SPEC)
+    registry = metrics.Registry(latency_buckets=[60], length_buckets=[16, 64])
+    # Nothing is collected until the registry is enabled
+    cfg.enigma_encoding('TESTING')
+    assert metrics.enable(registry) is registry
+    try:
+        stats.reset()
+        cfg.enigma_encoding('TESTING')
+        cfg.enigma_encoding('TESTING' * 5)
+        cfg.enigma_encoding('TESTING' * 20)
+        assert handle_request(dict(op='encode', config=_SPEC, message='TESTING'))['ok']
+    finally:
+        metrics.disable()
+    cfg.enigma_encoding('TESTING')
+    samples = _samples(registry.exposition())
+    for length in ['16', '64', '+Inf']:
+        assert samples['enigma_encoding_seconds_count{call="enigma_encoding",length="' + length + '"}'] == '1'
+        assert samples['enigma_encoding_seconds_bucket{call="enigma_encoding",length="' + length +
+                       '",le="60"}'] == '1'
+    assert samples['enigma_encoding_seconds_count{call="Engine.encode",length="16"}'] == '1'
+    assert 0 < float(samples['enigma_encoding_seconds_sum{call="enigma_encoding",length="+Inf"}']) < 60
+    assert samples['enigma_chars_total'] == '{0}'.format(7 * 28)
+    assert samples['enigma_cache_size{cache="Component.mapping"}'] == \
+        '{0}'.format(stats.cache_info()['Component.mapping'].size)
+
+
+def test_gauges():
+    registry = metrics.Registry()
+    registry.gauge('widgets', 'Widgets.', lambda: 3, kind='a"b')
+    with AsyncEncoder(workers=2) as encoder:
+        registry.watch(encoder, pool='test')
+        assert encoder.encode(_SPEC, 'TESTING') == 'OZQKPFL'
+        samples = _samples(registry.exposition())
+        assert samples['enigma_pool_utilization{pool="test"}'] == '0.0'
+        assert samples['enigma_pool_pending{pool="test"}'] == '0.0'
+    assert samples['widgets{kind="a\\"b"}'] == '3.0'
+
+
+def test_serve_metrics():
+    registry = metrics.Registry()
+    server = metrics.serve_metrics(0, registry=registry)
+    try:
+        url = 'http://127.0.0.1:{0}'.format(server.server_address[1])
+        response = urllib2.urlopen(url + '/metrics')
+        assert response.info()['Content-Type'].startswith('text/plain; version=0.0.4')
+        assert 'enigma_chars_total' in _samples(response.read().decode('utf-8'))
+        try:
+            urllib2.urlopen(url + '/other')
+            assert False
+        except urllib2.HTTPError as e:
+            assert e.code == 404
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -159,3 +159,31 @@ MTPP XOGC IFXU YSEE TXEI Y
     cfg.print_encoding(msg)
     out, err = capsys.readouterr()
     assert out == "LANO TCTO UARB BFPM HPHG CZXT DYGA HGUF XGEW KBLK GJWL QXXT \nGPJJ AVTO CKZF SLPP QIHZ FXOE BWII EKFZ LCLO AQJU LJOY HSSM \nBBGW HZAN VOII PYRB RTDJ QDJJ OQKC XWDN BBTY VXLY TAPG VEAT \nXSON PNYN QFUD BBHH VWEP YEYD OHNL XKZD NWRH DUWU JUMW WVII \nWZXI VIUQ DRHY MNCY EFUA PNHO TKHK GDNP SAKN UAGH JZSM JBMH \nVTRE QEDG XHLZ WIFU SKDQ VELN MIMI THBH DBWV HDFY HJOQ IHOR \nTDJD BWXE MEAY XGYQ XOHF DMYU XXNO JAZR SGHP LWML RECW WUTL \nRTTV LBHY OORG LGOW UXNX HMHY FAAC QEKT HSJW\n"
+
+
+def test_operation_strings():
+    # Operation strings are rendered from cached lines, and must match config_string exactly
+    for spec in ['B-I-II-III ADU UX.MO.AY 01.01.01', 'c-β-VIII-VII-VI QMLZ UX.MO.AY 01.13.04.11']:
+        cfg = EnigmaConfig.config_enigma_from_string(spec)
+        for fmt in ['internal', 'single', 'windows', 'encoding']:
+            for mark_func in [None, lambda c: '[' + c + ']']:
+                for message, steps in [('THEQUICKBROWNFOXJUMPEDOVERTHELAZYDOG' * 10, None), ('', 400)]:
+                    letters = ' ' + (message or ' ' * steps)
+                    expected = [c.config_string(l, format=fmt, show_encoding=True, mark_func=mark_func)
+                                for c, l in zip(cfg.stepped_configs(len(letters) - 1), letters)]
+                    assert [s for _, _, s in cfg._operation_strings(message, steps, fmt, True, False, True,
+                                                                    mark_func)] == expected
+
+
+def test_operation_overwrite_no_delay(capsys):
+    # With no delay, every step is displayed (and the last remains)
+    cfg = EnigmaConfig.config_enigma_from_string('B-I-III-I EMO UX.MO.AY 13.04.11')
+    cfg.print_operation('TESTING', overwrite=True, format='windows', delay=0)
+    out, err = capsys.readouterr()
+    assert out.count('\033[2K') == 8 and out.endswith('\033[2KENV\n')
+
+
+def test_encoding_empty(capsys):
+    # An empty message is printed as a blank line
+    EnigmaConfig.config_enigma_from_string('B-I-III-I EMO UX.MO.AY 13.04.11').print_encoding('')
+    assert capsys.readouterr()[0] == '\n'
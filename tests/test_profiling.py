@@ -0,0 +1,64 @@
+#!/usr/bin/env python
+# encoding: utf8
+from __future__ import (absolute_import, print_function, division, unicode_literals)
+
+''' Simple test file for debugging and testing at the shell. To use simply
+        python test.py
+    or
+        ./test.py
+    or run 'test' in PyCharm.
+'''
+
+import pstats
+import time
+
+import pytest
+
+from crypto_enigma.machine import *
+from crypto_enigma.profiling import *
+
+
+# Tests of profiling, and of the collapsed stacks it produces
+
+_SPEC = 'B-I-III-I EMO UX.MO.AY 13.04.11'
+
+
+def _stacks(path):
+    with open(path, 'rb') as f:
+        return [line.decode('utf-8').rsplit(' ', 1) for line in f.read().splitlines()]
+
+
+def test_profile(tmpdir):
+    cfg = EnigmaConfig.config_enigma_from_string(_SPEC)
+    out = unicode(tmpdir.join('encode'))
+    assert profile(lambda: cfg.enigma_encoding('TESTING' * 10), out) == cfg.enigma_encoding('TESTING' * 10)
+    stats = pstats.Stats(out + '.pstats')
+    assert any(func[2] == 'enigma_encoding' for func in stats.stats)
+    stacks = _stacks(out + '.collapsed')
+    assert any(stack.split(';')[-1].startswith('step (machine.py') for stack, _ in stacks)
+    assert all('enigma_encoding (machine.py' in stack for stack, _ in stacks if 'stepped_configs' in stack)
+    # The stacks account for (nearly) all of the time profiled
+    assert sum(int(t) for _, t in stacks) == pytest.approx(stats.total_tt * 1e6, rel=0.05)
+
+
+def test_profile_failure(tmpdir):
+    out = unicode(tmpdir.join('failure'))
+    with pytest.raises(EnigmaValueError):
+        profile(lambda: EnigmaConfig.config_enigma_from_string('B-I-III-I EMO UX.MO'), out)
+    assert tmpdir.join('failure.pstats').check() and tmpdir.join('failure.collapsed').check()
+
+
+def _spin(seconds):
+    end = time.clock() + seconds
+    while time.clock() < end:
+        pass
+
+
+def test_sample(tmpdir):
+    out = unicode(tmpdir.join('sample'))
+    profile(lambda: _spin(0.2), out, sample=0.005)
+    assert not tmpdir.join('sample.pstats').check()
+    stacks = _stacks(out + '.collapsed')
+    total = sum(int(n) for _, n in stacks)
+    assert total >= 10
+    assert sum(int(n) for stack, n in stacks if '_spin (test_profiling.py' in stack) >= 0.9 * total
@@ -0,0 +1,87 @@
+#!/usr/bin/env python
+# encoding: utf8
+from __future__ import (absolute_import, print_function, division, unicode_literals)
+
+''' Simple test file for debugging and testing at the shell. To use simply
+        python test.py
+    or
+        ./test.py
+    or run 'test' in PyCharm.
+'''
+
+import os
+
+import pytest
+
+from crypto_enigma.search import *
+
+
+# Tests of a small search for a key from a known plaintext
+
+_WINDOWS = [a + b + c for a in 'ABCD' for b in LETTERS for c in LETTERS]
+_KEY = 'B-I-II-III CQX UX.MO.AY 01.01.01'
+_PLAIN = 'OBERKOMMANDO'
+_CYPHER = EnigmaConfig.config_enigma_from_string(_KEY).enigma_encoding(_PLAIN)
+
+
+def _crib_score(engine, positions, cypher, plain):
+    matches = 0
+    for c, p in zip(cypher, plain):
+        positions = engine.step(positions)
+        matches += engine.mapping(positions)[num_A0(c)] == num_A0(p)
+    return matches
+
+
+def _space():
+    return KeySpace(['B-I-II-III'], windows=_WINDOWS, plugs='UX.MO.AY', unit_size=200)
+
+
+def test_key_space():
+    space = KeySpace(['B-I-II-III', 'c-β-V-III-II'], rings=['01.01.01'])
+    assert len(space) == 26 ** 3 + 26 ** 4
+    units = list(KeySpace(['B-I-II-III']).units())
+    assert [u.index for u in units] == list(range(26)) == list(range(KeySpace(['B-I-II-III']).count_units()))
+    assert sum(len(u.windows) for u in units) == 26 ** 3
+    assert _space().count_units() == len(list(_space().units())) == 14
+    assert len(KeySpace.all_rings(2)) == 26 ** 2
+
+
+def test_search(tmpdir):
+    reports = []
+    results = search(_space(), _crib_score, (_CYPHER, _PLAIN), top=3, processes=1, progress=reports.append)
+    assert results[0] == Result(len(_PLAIN), _KEY)
+    assert len(results) == 3 and results[0].score > results[1].score >= results[2].score
+    assert reports[-1].keys == reports[-1].total_keys == len(_WINDOWS)
+    assert search(_space(), _crib_score, (_CYPHER, _PLAIN), top=3, processes=2) == results
+
+    # Interrupt a search, and resume it from its checkpoint
+    path = unicode(tmpdir.join('search.json'))
+
+    def interrupt(prog):
+        if prog.units == 5:
+            raise KeyboardInterrupt
+
+    with pytest.raises(KeyboardInterrupt):
+        search(_space(), _crib_score, (_CYPHER, _PLAIN), top=3, processes=1, checkpoint=path, progress=interrupt)
+    reports = []
+    assert search(_space(), _crib_score, (_CYPHER, _PLAIN), top=3, processes=1, checkpoint=path,
+                  progress=reports.append) == results
+    assert len(reports) == 14 - 5 and reports[-1].keys == len(_WINDOWS)
+    with pytest.raises(EnigmaValueError):
+        search(KeySpace(['B-I-II-III']), _crib_score, (_CYPHER, _PLAIN), checkpoint=path)
+
+
+def test_checkpoint_replace(tmpdir, monkeypatch):
+    # Checkpoints are saved repeatedly, even where renaming can't replace a file
+    rename = os.rename
+
+    def rename_nt(src, dst):
+        if os.path.exists(dst):
+            raise OSError('Cannot create a file when that file already exists')
+        rename(src, dst)
+    monkeypatch.setattr(os, 'name', 'nt')
+    monkeypatch.setattr(os, 'rename', rename_nt)
+    path = unicode(tmpdir.join('search.json'))
+    results = search(_space(), _crib_score, (_CYPHER, _PLAIN), top=3, processes=1, checkpoint=path, every=0)
+    assert results[0] == Result(len(_PLAIN), _KEY)
+    assert os.listdir(unicode(tmpdir)) == ['search.json']
@@ -0,0 +1,111 @@
+#!/usr/bin/env python
+# encoding: utf8
+from __future__ import (absolute_import, print_function, division, unicode_literals)
+
+''' Simple test file for debugging and testing at the shell. To use simply
+        python test.py
+    or
+        ./test.py
+    or run 'test' in PyCharm.
+'''
+
+import json
+import socket
+import threading
+
+import pytest
+
+from crypto_enigma.service import *
+
+
+# Tests of the encoding service, checked against the results of the same operations performed directly
+
+_SPEC = 'B-I-III-I EMO UX.MO.AY 13.04.11'
+
+
+def test_handle_request(capsys):
+    cfg = EnigmaConfig.config_enigma_from_string(_SPEC)
+    message = 'FOLGENDES IST SOFORT BEKANNTZUGEBEN'
+    assert handle_request(dict(op='encode', config=_SPEC, message=message)) == dict(
+        ok=True, result=cfg.enigma_encoding(EnigmaConfig.make_message(message)))
+    cfg.print_encoding(message)
+    assert handle_request(dict(op='encode', config=_SPEC, message=message, format=True))['result'] + '\n' == \
+        capsys.readouterr()[0]
+    assert handle_request(dict(op='show', config=_SPEC, letter='X', format='internal'))['result'] == \
+        cfg.config_string('X', 'internal')
+    for fmt in ['single', 'internal', 'windows', 'config']:
+        cfg.print_operation(message='TESTING', format=fmt, show_step=True, show_encoding=True)
+        assert handle_request(dict(op='run', config=_SPEC, message='TESTING', format=fmt, showstep=True,
+                                   showencoding=True))['result'] + '\n' == capsys.readouterr()[0]
+    cfg.print_operation(steps=30, initial=False, mark_func=lambda c: '(' + c + ')')
+    assert handle_request(dict(op='run', config=_SPEC, steps=30, initial=False,
+                               highlight='()'))['result'] + '\n' == capsys.readouterr()[0]
+    assert handle_request(dict(op='flip', config=_SPEC, id='x')) == dict(
+        ok=False, id='x', error='Bad request - unknown operation, flip')
+    assert not handle_request(dict(op='encode', config='B-I-III-I EMO UX.MO.AY', message='A'))['ok']
+
+
+def test_handle_request_types():
+    # Members of the wrong type are reported like any other bad request
+    assert handle_request(dict(config=5, id=1)) == dict(ok=False, id=1,
+                                                        error='Bad request - config should be a string, not 5')
+    assert handle_request(dict(op='run', config=_SPEC, steps='x')) == dict(
+        ok=False, error='Bad request - steps should be an integer, not "x"')
+    for request in [dict(config=_SPEC, message=5), dict(op='show', config=_SPEC, letter=['X']),
+                    dict(op='show', config=_SPEC, highlight=5), dict(op='run', config=_SPEC, format=True),
+                    dict(op='run', config=_SPEC, steps=True)]:
+        assert not handle_request(request)['ok']
+    assert handle_request(dict(config=_SPEC, message='TESTING', format=True))['ok']
+
+
+def test_server(tmpdir):
+    path = unicode(tmpdir.join('enigma.sock'))
+    server = EnigmaServer(path)
+    thread = threading.Thread(target=server.serve_forever)
+    thread.start()
+    try:
+        with Client(path) as client:
+            for i, message in enumerate(['TESTINGXTESTINGUD', 'OZQKPFLPYZRPYTFVU']):
+                request = dict(op='encode', config=_SPEC, message=message, id=i)
+                assert client.request(request) == handle_request(request)
+            with Client(path) as other:
+                assert other.request(dict(op='show', config=_SPEC))['ok']
+            assert client.request(dict(config=_SPEC, message='OZQKPFLPYZRPYTFVU'))['result'] == 'TESTINGXTESTINGUD'
+            assert client.request(dict(config=5, id=3)) == handle_request(dict(config=5, id=3))
+            assert client.request(dict(config=_SPEC, message='TESTING'))['ok']
+        # The socket of a running server is not taken over
+        with pytest.raises(EnigmaError):
+            EnigmaServer(path)
+    finally:
+        server.shutdown()
+        server.server_close()
+        thread.join()
+    assert not os.path.exists(path)
+
+
+def test_server_path(tmpdir):
+    # A stale socket is replaced, but nothing else is
+    path = unicode(tmpdir.join('stale.sock'))
+    stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    stale.bind(path)
+    stale.close()
+    server = EnigmaServer(path)
+    server.server_close()
+    other = tmpdir.join('other')
+    other.write('keep')
+    with pytest.raises(EnigmaError):
+        EnigmaServer(unicode(other))
+    assert other.read() == 'keep'
+
+
+def test_process_jobs():
+    jobs = [dict(op='encode', config=_SPEC, message=m, id=i) for i, m in enumerate(['TESTING', 'OZQKPFL'] * 40)]
+    lines = [json.dumps(j) for j in jobs] + ['', '[1, 2]', 'not json', '{"config": 5}']
+    expected = [handle_request(j) for j in jobs]
+    ordered = list(process_jobs(lines))
+    assert ordered[:-3] == expected and not any(r['ok'] for r in ordered[-3:])
+    assert list(process_jobs(lines, processes=2)) == ordered
+    unordered = list(process_jobs(lines, processes=2, ordered=False))
+    assert sorted(r.pop('line') for r in unordered) == list(range(1, 81)) + [82, 83, 84]
+    assert sorted(unordered, key=lambda r: (r.get('id', 99), r.get('error'))) == sorted(
+        ordered, key=lambda r: (r.get('id', 99), r.get('error')))
@@ -0,0 +1,52 @@
+#!/usr/bin/env python
+# encoding: utf8
+from __future__ import (absolute_import, print_function, division, unicode_literals)
+
+''' Simple test file for debugging and testing at the shell. To use simply
+        python test.py
+    or
+        ./test.py
+    or run 'test' in PyCharm.
+'''
+
+import pytest
+
+from crypto_enigma.specs import *
+
+
+# Tests of cached and bulk parsing of configuration specifications
+
+_SPECS = ['B-I-III-I EMO UX.MO.AY 13.04.11', 'c-β-VIII-VII-VI QMLI UX.MO.AY 01.13.04.11', 'B-I-II-III ABC ~ 01.01.01']
+
+
+def test_spec_cache():
+    cache = SpecCache(maxsize=2)
+    first = cache.config(_SPECS[0])
+    assert first == EnigmaConfig.config_enigma_from_string(_SPECS[0])
+    assert cache(_SPECS[0]) is first
+    cache.config(_SPECS[1])
+    cache.config(_SPECS[2])
+    assert cache.info() == CacheInfo(hits=1, misses=3, maxsize=2, currsize=2)
+    # The least recently used configuration was evicted
+    assert cache.config(_SPECS[0]) is not first
+    with pytest.raises(EnigmaValueError):
+        cache.config('B-I-III-I EMO UX.MO.AY')
+    assert cache.info().misses == 4
+    cache.clear()
+    assert cache.info() == CacheInfo(0, 0, 2, 0)
+
+
+def test_parse_specs():
+    column = _SPECS * 3 + ['B-I-III-I EMO UX.MO.AY', None, 'B-I-III-I EMO UX.MO.AY']
+    configs, errors = parse_specs(column)
+    assert configs[:9] == [EnigmaConfig.config_enigma_from_string(s) for s in column[:9]]
+    assert all(c is None for c in configs[9:])
+    assert [e.row for e in errors] == [9, 10, 11]
+    assert errors[0].error == errors[2].error == 'Bad string - [u\'B-I-III-I\', u\'EMO\', u\'UX.MO.AY\'] should have 4 elements'
+    cache = SpecCache()
+    assert parse_specs(column, cache) == (configs, errors)
+    assert parse_specs(column, cache)[0][0] is cache.config(_SPECS[0])
+    # Rows that are not strings, hashable or not, are reported like any other invalid row
+    configs, errors = parse_specs([_SPECS[0], ['B-I-II-III', 'AAA'], 5])
+    assert configs[1:] == [None, None] and [e.row for e in errors] == [1, 2]
+    assert errors[0].error == "Bad configuration - [u'B-I-II-III', u'AAA'] is not a string"
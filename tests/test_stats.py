@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+# encoding: utf8
+from __future__ import (absolute_import, print_function, division, unicode_literals)
+
+''' Simple test file for debugging and testing at the shell. To use simply
+        python test.py
+    or
+        ./test.py
+    or run 'test' in PyCharm.
+'''
+
+import json
+
+from crypto_enigma import stats
+from crypto_enigma.engine import *
+from crypto_enigma.machine import *
+
+
+# Tests of the instrumentation of caches and hot paths
+
+def test_counters():
+    cfg = EnigmaConfig.config_enigma_from_string('B-I-III-I EMO UX.MO.AY 13.04.11')
+    stats.reset()
+    assert cfg.enigma_encoding('TESTING') == 'OZQKPFL'
+    assert stats.counters == dict(steps=7, configs=7, chars=7)
+    stats.reset()
+    assert Engine.for_config(cfg).encode(cfg.positions, [num_A0(c) for c in 'TESTING']) == \
+        [num_A0(c) for c in 'OZQKPFL']
+    assert stats.counters == dict(steps=7, configs=0, chars=7)
+    # Abandoned encodings count only the letters encoded
+    stats.reset()
+    encoding = Engine.for_config(cfg).encoding(cfg.positions, [num_A0(c) for c in 'TESTING'])
+    next(encoding), next(encoding)
+    encoding.close()
+    assert stats.counters['chars'] == 2
+    stats.reset()
+    assert cfg.enigma_encoding_bytes(b'TESTING') == b'OZQKPFL'
+    assert stats.counters == dict(steps=7, configs=0, chars=7)
+    # Finding the configurations that step to another takes no steps; stepping back takes one
+    stats.reset()
+    assert len(cfg.predecessors()) == 1
+    assert stats.counters['steps'] == 0
+    cfg.step_back()
+    assert stats.counters['steps'] == 1
+
+
+def test_cache_stats():
+    cfg = EnigmaConfig.config_enigma_from_string('B-I-III-I EMO UX.MO.AY 13.04.11')
+    cfg.enigma_encoding('TESTING')
+    stats.reset()
+    before = stats.cache_info()
+    assert set(before) >= {'Component.mapping', 'EnigmaConfig.stage_mapping_list',
+                           'EnigmaConfig.enigma_mapping_list', 'components', 'engine.component_tables',
+                           'engine.Engine'}
+    assert all(s.hits == s.misses == s.evictions == 0 for s in before.values())
+    # Encoding again with the same configurations reuses every cached mapping
+    assert cfg.enigma_encoding('TESTING') == 'OZQKPFL'
+    after = stats.cache_info()
+    assert after['EnigmaConfig.enigma_mapping_list'].misses == 7
+    assert after['Component.mapping'].misses == 0 and after['Component.mapping'].hits > 0
+    assert after['components'].hits > 0 and after['components'].misses == 0
+    assert after['Component.mapping'].size == before['Component.mapping'].size
+    # The snapshot is plain data
+    snap = json.loads(json.dumps(stats.snapshot()))
+    assert snap['counters'] == dict(steps=7, configs=7, chars=7)
+    assert snap['caches']['Component.mapping']['hits'] == after['Component.mapping'].hits
+
+
+def test_clear_caches():
+    cfg = EnigmaConfig.config_enigma_from_string('B-I-III-I EMO UX.MO.AY 13.04.11')
+    assert cfg.enigma_encoding('TESTING') == 'OZQKPFL'
+    stats.reset()
+    before = stats.cache_info()
+    stats.clear_caches()
+    after = stats.cache_info()
+    assert after['Component.mapping'] == (0, 0, 0, before['Component.mapping'].size)
+    assert after['engine.Engine'].size == 0
+    # The component registry is never cleared
+    assert after['components'].size == before['components'].size and after['components'].evictions == 0
+    # Everything is recomputed as needed
+    assert cfg.enigma_encoding('TESTING') == 'OZQKPFL'
+    assert cfg.enigma_encoding_bytes(b'TESTING') == b'OZQKPFL'
+    assert stats.cache_info()['Component.mapping'].misses > 0
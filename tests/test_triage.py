@@ -0,0 +1,56 @@
+#!/usr/bin/env python
+# encoding: utf8
+from __future__ import (absolute_import, print_function, division, unicode_literals)
+
+''' Simple test file for debugging and testing at the shell. To use simply
+        python test.py
+    or
+        ./test.py
+    or run 'test' in PyCharm.
+'''
+
+import random
+from collections import defaultdict
+
+from crypto_enigma.triage import *
+
+
+# Tests of triage of a series of stops that includes the true key
+
+_PLAIN = EnigmaConfig.make_message('OBERKOMMANDODERWEHRMACHT AN ALLE STOP FOLGENDES IST SOFORT BEKANNTZUGEBEN STOP '
+                                   'ICH HABE BEFEHL ERHALTEN DEN FUEHRER HAUPTQUARTIER ZU MELDEN STOP')
+_KEY = 'B-I-II-III CQX AY.BE.KL.MO.RT.UX 03.09.17'
+_CYPHER = EnigmaConfig.config_enigma_from_string(_KEY).enigma_encoding(_PLAIN)
+
+
+def _stops():
+    rnd = random.Random(0)
+    stops = [Stop('B-I-II-III', ''.join(rnd.choice(LETTERS) for _ in range(3)), '03.09.17', 'UX') for _ in range(20)]
+    stops.insert(7, ('B-I-II-III', 'CQX', '03.09.17', 'UX'))
+    return stops
+
+
+def test_triage():
+    # A long crib eliminates every false stop, and determines the plugboard
+    verdicts = triage(iter(_stops()), _CYPHER, crib='OBERKOMMANDODERWEHRMACHT', processes=1)
+    assert verdicts == [Verdict(verdicts[0].score, _KEY, _PLAIN, 24)]
+    # With a short crib, the true stop is completed by hill-climbing
+    tbl = ngram_table(_PLAIN, 3)
+    verdicts = triage(_stops(), _CYPHER, crib='OBERKO', ngrams=tbl, processes=1)
+    assert (verdicts[0].config, verdicts[0].plain) == (_KEY, _PLAIN)
+    assert triage(_stops(), _CYPHER, crib='OBERKO', ngrams=tbl, top=3, processes=2) == verdicts[:3]
+    # A contradictory partial plugboard is rejected
+    assert triage([('B-I-II-III', 'CQX', '03.09.17', 'UX.UY')], _CYPHER, processes=1) == []
+    assert triage([('B-I-II-III', 'CQX', '03.09.17', 'OA')], _CYPHER, crib='OBERKOMMANDO', processes=1) == []
+
+
+def test_propagate():
+    # A crib pair (A, C) at a step whose rotors swap D and E
+    mapping = tuple([0, 1, 2, 4, 3] + list(range(5, 26)))
+    links = defaultdict(list, {0: [(mapping, 2)], 2: [(mapping, 0)]})
+    stecker = [3, None, None, 0] + [None] * 22
+    assert propagate(stecker, links) and stecker[2] == 4 and stecker[4] == 2
+    stecker = [3, None, 4, 0, 2] + [None] * 21
+    assert propagate(stecker, links)
+    stecker = [3, None, 5, 0, None, 2] + [None] * 20
+    assert not propagate(stecker, links)
@@ -9,6 +9,10 @@ from __future__ import (absolute_import, print_function, division, unicode_liter
     or run 'test' in PyCharm.
 '''
 
+import io
+
+import pytest
+
 from crypto_enigma.machine import *
 
 # Test utilities and internals
@@ -36,4 +40,67 @@ def test_make_message():
     assert EnigmaConfig.make_message("AHDuRI WDHUWYR dDUSHS BBqDyXJ") == "AHDURIWDHUWYRDDUSHSBBQDYXJ"
     assert EnigmaConfig.make_message("AγH*D+uRI WDHβUγWYR dDβ*USHS BBγqDyXJ") == "AHDURIWDHUWYRDDUSHSBBQDYXJ"
     assert EnigmaConfig.make_message("AγH*D+uRI WDHβUγWYR dDβ*USHS BBγqDyXJ") == "AHDURIWDHUWYRDDUSHSBBQDYXJ"
-    assert EnigmaConfig.make_message("AγH*D+uRI WDHβUγWYR dDβ*USHS BBγqDy!'") == "AHDURIWDHUWYRDDUSHSBBQDYXJ"
\ No newline at end of file
+    assert EnigmaConfig.make_message("AγH*D+uRI WDHβUγWYR dDβ*USHS BBγqDy!'") == "AHDURIWDHUWYRDDUSHSBBQDYXJ"
+    assert EnigmaConfig.make_message("Testing, testing? 1 2") == "TESTINGYTESTINGUDYQYW"
+    assert EnigmaConfig.make_message("(a-b): c'd") == "KKAYYBKKXXCJD"
+    assert EnigmaConfig.make_message("ıé中ß") == "I"
+    chunks = ["Testing, ", "testing? 1 2", "", "AγH*D+uRI\n"]
+    assert ''.join(EnigmaConfig.make_message_chunks(chunks)) == EnigmaConfig.make_message(''.join(chunks))
+
+
+def test_grouped_lines():
+    msg = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ' * 7
+    for n in [0, 1, 4, 5, 47, 48, 49, 182]:
+        assert list(grouped_lines(iter(msg[:n]))) == chunk_of(' '.join(chunk_of(msg[:n], 4)), 60)
+        assert list(grouped_lines(msg[:n], 5, 12)) == chunk_of(' '.join(chunk_of(msg[:n], 5)), 12)
+    assert list(grouped_lines(msg[:26], 5, 12, numbered=True)) == ['0001  ABCDE FGHIJ ', '0003  KLMNO PQRST ',
+                                                                    '0005  UVWXY Z']
+    out = io.StringIO()
+    write_groups(msg[:10], out, 4, 60)
+    assert out.getvalue() == 'ABCD EFGH IJ\n'
+    out = io.StringIO()
+    write_groups('', out)
+    assert out.getvalue() == '\n'
+    with pytest.raises(EnigmaValueError):
+        list(grouped_lines(msg, 0))
+
+
+class _Output(io.StringIO):
+
+    def __init__(self):
+        io.StringIO.__init__(self)
+        self.writes = 0
+
+    def write(self, s):
+        self.writes += 1
+        return io.StringIO.write(self, s)
+
+
+def test_animation():
+    now = [0.0]
+    out = _Output()
+    animation = Animation(fps=10, file=out, clock=lambda: now[0])
+    animation.show('A\nB\nC')
+    assert out.getvalue() == '\033[2KA\n\033[2KB\n\033[2KC\n' and out.writes == 1
+    # Frames shown before the next is due are skipped, except the last
+    animation.show('A\nX\nC')
+    animation.show('A\nY\nC')
+    assert out.writes == 1 and not animation.poll() and 0 < animation.due() <= 0.1
+    now[0] = 0.1
+    assert animation.poll() and out.writes == 2
+    assert out.getvalue().endswith('\033[3F\n\033[2KY\n\n')
+    now[0] = 0.15
+    animation.show('Z')
+    assert out.writes == 2
+    animation.close()
+    assert out.writes == 3 and out.getvalue().endswith('\033[3F\033[2KZ\n\033[J')
+
+
+def test_animation_unlimited():
+    # Without a frame rate, every frame is drawn
+    out = _Output()
+    animation = Animation(fps=None, file=out, clock=lambda: 0.0)
+    for frame in ['A', 'B', 'C']:
+        animation.show(frame)
+    animation.close()
+    assert out.writes == 3 and out.getvalue().endswith('\033[1F\033[2KC\n')